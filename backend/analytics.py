@@ -0,0 +1,310 @@
+"""
+Backend analítico en memoria para /api/compras/charts/*.
+
+Las tablas de compras solo cambian al importar. load() carga las columnas que
+usan los gráficos una vez por generación de datos (data_generations): las de
+texto como códigos categóricos (pd.factorize, -1 = NULL) y las numéricas como
+arreglos float64 (NaN = NULL). Cada gráfico de CHARTS replica la consulta
+SQLite del router con group-bys vectorizados (np.bincount sobre los códigos)
+y devuelve el mismo diccionario "data".
+
+El backend se elige con LOGISTICA_ANALYTICS (sqlite por defecto) o por
+petición con ?backend=memoria|sqlite; /api/admin/analytics/compare corre
+ambos caminos y compara resultados y latencia.
+"""
+import numpy as np
+import pandas as pd
+
+from .config import ANALYTICS_BACKEND
+from .database import get_db, get_generations
+
+BACKENDS = ["sqlite", "memoria"]
+
+# tabla -> (columnas de texto, columnas numéricas)
+TABLES = {
+    "traza_req_oc": (
+        ["req_usuario_autorizador", "oc_usuario", "oc_usuario_autorizacion",
+         "entrega_servicio_usuario", "entrega_almacen_usuario", "oc_estado", "oc_numero", "oc_mes"],
+        ["dias_aprobar_rq", "dias_generar_oc", "dias_aprobacion_oc",
+         "dias_recepcion_servicio", "dias_entrada_almacen", "req_pendiente", "oc_pendiente"],
+    ),
+    "oc_descuentos": (
+        ["proceso", "documento_num", "tercero_nombre"],
+        ["porcentaje_descuento", "total_dcto", "total"],
+    ),
+}
+
+# Columnas calculadas: nombre -> expresión SQL (la misma que usa el router)
+EXPRESSIONS = {
+    "oc_mes": "strftime('%Y-%m', oc_fecha)",
+}
+
+_frames = {}
+
+
+class Frame:
+    """Columnas de una tabla: categóricas (códigos + categorías) y numéricas"""
+
+    def __init__(self, df, text_columns, numeric_columns):
+        self.rows = len(df)
+        self.codes = {}
+        self.categories = {}
+        for column in text_columns:
+            codes, uniques = pd.factorize(df[column], use_na_sentinel=True)
+            self.codes[column] = codes
+            self.categories[column] = np.asarray(uniques, dtype=object)
+        self.values = {
+            column: pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            for column in numeric_columns
+        }
+
+
+def _read(conn, table):
+    text_columns, numeric_columns = TABLES[table]
+    columns = [f"{EXPRESSIONS[c]} AS {c}" if c in EXPRESSIONS else c for c in text_columns + numeric_columns]
+    df = pd.read_sql(f"SELECT {', '.join(columns)} FROM {table}", conn)
+    return Frame(df, text_columns, numeric_columns)
+
+
+def load(conn, table):
+    """Frame de la tabla para la generación de datos actual"""
+    generacion = get_generations(conn, [table]).get(table, 0)
+    cached = _frames.get(table)
+    if cached is None or cached[0] != generacion:
+        cached = (generacion, _read(conn, table))
+        _frames[table] = cached
+    return cached[1]
+
+
+def invalidate(table=None):
+    """Descartar los frames cargados (de una tabla o todos); el próximo load() relee"""
+    if table is None:
+        _frames.clear()
+    else:
+        _frames.pop(table, None)
+
+
+def resolve(backend=None):
+    """Backend pedido o el configurado; ValueError si no existe"""
+    backend = backend or ANALYTICS_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend analítico desconocido: {backend}")
+    return backend
+
+
+# ==================== GROUP-BYS VECTORIZADOS ====================
+def _valid(frame, key, mask=None):
+    valid = frame.codes[key] >= 0
+    return valid if mask is None else valid & mask
+
+
+def _count(frame, key, mask=None):
+    codes = frame.codes[key]
+    valid = _valid(frame, key, mask)
+    return np.bincount(codes[valid], minlength=len(frame.categories[key]))
+
+
+def _sum(frame, key, column, mask=None):
+    """SUM(COALESCE(column, 0)) y COUNT(column) por grupo"""
+    codes = frame.codes[key]
+    values = frame.values[column]
+    valid = _valid(frame, key, mask)
+    k = len(frame.categories[key])
+    sums = np.bincount(codes[valid], weights=np.nan_to_num(values[valid]), minlength=k)
+    counts = np.bincount(codes[valid & ~np.isnan(values)], minlength=k)
+    return sums, counts
+
+
+def _distinct(frame, key, column, mask=None):
+    """COUNT(DISTINCT column) por grupo"""
+    valid = _valid(frame, key, mask) & (frame.codes[column] >= 0)
+    n_values = len(frame.categories[column])
+    pairs = np.unique(frame.codes[key][valid].astype(np.int64) * n_values + frame.codes[column][valid])
+    return np.bincount(pairs // max(n_values, 1), minlength=len(frame.categories[key]))
+
+
+def _top(measure, present, limit=10):
+    """Índices de grupo (presentes) ordenados por measure DESC"""
+    groups = np.flatnonzero(present)
+    order = np.argsort(-measure[groups], kind="stable")
+    return groups[order][:limit]
+
+
+def _avg_by(frame, key, column, limit=10):
+    """AVG(column) por key con key y column no nulos, top por promedio"""
+    mask = ~np.isnan(frame.values[column])
+    sums, counts = _sum(frame, key, column, mask)
+    avg = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+    idx = _top(avg, counts > 0, limit)
+    return frame.categories[key][idx].tolist(), [round(float(v), 1) for v in avg[idx]]
+
+
+def _pending_by(frame, key, flag):
+    counts = _count(frame, key, frame.values[flag] == 1)
+    idx = _top(counts, counts > 0)
+    return frame.categories[key][idx].tolist(), [int(v) for v in counts[idx]]
+
+
+# ==================== GRÁFICOS ====================
+def oc_vs_items_by_process(conn):
+    f = load(conn, "oc_descuentos")
+    items = _count(f, "proceso")
+    ocs = _distinct(f, "proceso", "documento_num")
+    idx = _top(items, items > 0)
+    total_items = [int(v) for v in items[idx]]
+    return {
+        "procesos": [p or 'Sin Proceso' for p in f.categories["proceso"][idx].tolist()],
+        "totalOC": [int(v) for v in ocs[idx]],
+        "totalItems": total_items,
+        "total": sum(total_items),
+    }
+
+
+def percent_discounts_by_process(conn):
+    f = load(conn, "oc_descuentos")
+    sums, _ = _sum(f, "proceso", "porcentaje_descuento")
+    rows = _count(f, "proceso")
+    avg = np.divide(sums, rows, out=np.zeros_like(sums), where=rows > 0)
+    idx = _top(avg, rows > 0)
+    pct = f.values["porcentaje_descuento"]
+    return {
+        "procesos": [p or 'Sin Proceso' for p in f.categories["proceso"][idx].tolist()],
+        "percentages": [round(float(v), 2) for v in avg[idx]],
+        "average": round(float(np.nan_to_num(pct).mean()), 2) if f.rows else 0,
+    }
+
+
+def top_suppliers_discounts(conn):
+    f = load(conn, "oc_descuentos")
+    sums, _ = _sum(f, "tercero_nombre", "total_dcto")
+    total_general = float(np.nan_to_num(f.values["total_dcto"]).sum()) or 1
+    idx = _top(sums, _count(f, "tercero_nombre") > 0)
+    montos = [float(v) for v in sums[idx]]
+    return {
+        "proveedores": f.categories["tercero_nombre"][idx].tolist(),
+        "montos": montos,
+        "percentages": [(m / total_general * 100) if total_general > 0 else 0 for m in montos],
+    }
+
+
+def avg_approval_days(conn):
+    aprobadores, promedios = _avg_by(load(conn, "traza_req_oc"), "req_usuario_autorizador", "dias_aprobar_rq")
+    return {"aprobadores": aprobadores, "promedios": promedios}
+
+
+def avg_generation_days(conn):
+    aprobadores, promedios = _avg_by(load(conn, "traza_req_oc"), "oc_usuario", "dias_generar_oc")
+    return {"aprobadores": aprobadores, "promedios": promedios}
+
+
+def avg_approval_management_days(conn):
+    aprobadores, promedios = _avg_by(load(conn, "traza_req_oc"), "oc_usuario_autorizacion", "dias_aprobacion_oc")
+    return {"aprobadores": aprobadores, "promedios": promedios}
+
+
+def avg_reception_service_days(conn):
+    usuarios, promedios = _avg_by(load(conn, "traza_req_oc"), "entrega_servicio_usuario", "dias_recepcion_servicio")
+    return {"usuarios": usuarios, "promedios": promedios}
+
+
+def avg_warehouse_entry_days(conn):
+    usuarios, promedios = _avg_by(load(conn, "traza_req_oc"), "entrega_almacen_usuario", "dias_entrada_almacen")
+    return {"usuarios": usuarios, "promedios": promedios}
+
+
+def pending_approve_rq(conn):
+    aprobadores, cantidades = _pending_by(load(conn, "traza_req_oc"), "req_usuario_autorizador", "req_pendiente")
+    return {"aprobadores": aprobadores, "cantidades": cantidades}
+
+
+def pending_approve_oc(conn):
+    aprobadores, cantidades = _pending_by(load(conn, "traza_req_oc"), "oc_usuario_autorizacion", "oc_pendiente")
+    return {"aprobadores": aprobadores, "cantidades": cantidades}
+
+
+def oc_by_state(conn):
+    f = load(conn, "traza_req_oc")
+    counts = _count(f, "oc_estado")
+    idx = _top(counts, counts > 0, limit=None)
+    return {"states": f.categories["oc_estado"][idx].tolist(), "counts": [int(v) for v in counts[idx]]}
+
+
+def trend_oc(conn):
+    f = load(conn, "traza_req_oc")
+    ocs = _distinct(f, "oc_mes", "oc_numero")
+    meses = f.categories["oc_mes"]
+    # Los 12 meses más recientes, en orden ascendente
+    idx = np.argsort(meses.astype(str), kind="stable")[-12:]
+    return {"months": meses[idx].tolist(), "counts": [int(ocs[i]) for i in idx]}
+
+
+def discounts_by_process(conn):
+    f = load(conn, "oc_descuentos")
+    sums, _ = _sum(f, "proceso", "total_dcto")
+    idx = _top(sums, _count(f, "proceso") > 0)
+    return {"processes": f.categories["proceso"][idx].tolist(), "discounts": [float(v) for v in sums[idx]]}
+
+
+def top_suppliers(conn):
+    f = load(conn, "oc_descuentos")
+    sums, _ = _sum(f, "tercero_nombre", "total")
+    idx = _top(sums, _count(f, "tercero_nombre") > 0)
+    return {"suppliers": f.categories["tercero_nombre"][idx].tolist(), "amounts": [float(v) for v in sums[idx]]}
+
+
+def days_by_stage(conn):
+    f = load(conn, "traza_req_oc")
+    columns = ["dias_aprobar_rq", "dias_generar_oc", "dias_aprobacion_oc", "dias_recepcion_servicio", "dias_entrada_almacen"]
+    return {
+        "stages": ["Aprobar RQ", "Generar OC", "Aprobación OC", "Recepción Servicio", "Entrada Almacén"],
+        "days": [round(float(np.nan_to_num(f.values[c]).mean()), 1) if f.rows else 0 for c in columns],
+    }
+
+
+def spend_by_process(conn):
+    f = load(conn, "oc_descuentos")
+    sums, _ = _sum(f, "proceso", "total")
+    idx = _top(sums, _count(f, "proceso") > 0)
+    return {"processes": f.categories["proceso"][idx].tolist(), "amounts": [float(v) for v in sums[idx]]}
+
+
+# Ruta /api/compras/charts/<nombre> -> gráfico en memoria
+CHARTS = {
+    "oc-vs-items-by-process": oc_vs_items_by_process,
+    "percent-discounts-by-process": percent_discounts_by_process,
+    "top-suppliers-discounts": top_suppliers_discounts,
+    "avg-approval-days": avg_approval_days,
+    "avg-generation-days": avg_generation_days,
+    "avg-approval-management-days": avg_approval_management_days,
+    "avg-reception-service-days": avg_reception_service_days,
+    "avg-warehouse-entry-days": avg_warehouse_entry_days,
+    "pending-approve-rq": pending_approve_rq,
+    "pending-approve-oc": pending_approve_oc,
+    "oc-by-state": oc_by_state,
+    "trend-oc": trend_oc,
+    "discounts-by-process": discounts_by_process,
+    "top-suppliers": top_suppliers,
+    "days-by-stage": days_by_stage,
+    "spend-by-process": spend_by_process,
+}
+
+
+def chart(name, backend=None):
+    """Respuesta del gráfico en memoria, o None si el backend es sqlite"""
+    if resolve(backend) != "memoria":
+        return None
+    with get_db() as conn:
+        return {"success": True, "data": CHARTS[name](conn)}
+
+
+def diferencias(a, b, ruta=""):
+    """Rutas de las claves cuyo valor difiere entre dos resultados (floats con tolerancia relativa)"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return [d for k in sorted(set(a) | set(b)) for d in diferencias(a.get(k), b.get(k), f"{ruta}.{k}")]
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            return [ruta]
+        return [d for i, (x, y) in enumerate(zip(a, b)) for d in diferencias(x, y, f"{ruta}[{i}]")]
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return [] if abs(a - b) <= 1e-9 * max(abs(a), abs(b), 1) else [ruta]
+    return [] if a == b else [ruta]
@@ -1,16 +1,25 @@
 """
 API FastAPI para Logística HESEGO
 """
-from fastapi import FastAPI
+import secrets
+import statistics
+import time
+from typing import List, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from pydantic import BaseModel
 
 from .database import get_db, init_db
-from .config import BASE_DIR
+from .config import BASE_DIR, IMPORT_WORKER, IMPORT_WEBHOOK_SECRET, IMPORT_TRUST_LOOPBACK, READ_REPLICA
+from . import analytics, assets, replica, tables, timing
+from .compression import CACHE_IMG, CACHE_IMMUTABLE, CompressionMiddleware, precompress, static_response
+from .import_worker import worker as import_worker
 
 # Importar routers
-from .routes import costos, operatividad, compras, indicadores, fiscal_ru, brigadas, errores, programados, gestion
+from .routes import costos, operatividad, compras, indicadores, fiscal_ru, brigadas, errores, programados, gestion, facets, search, events, snapshots, export, query, historico
 
 # Rutas de carpetas
 FRONTEND_DIR = BASE_DIR / "frontend"
@@ -20,9 +29,18 @@ DATA_DIR = BASE_DIR / "data"
 app = FastAPI(
     title="Logística HESEGO API",
     description="API para dashboards de logística",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=timing.TimedJSONResponse
 )
 
+# Comprimir respuestas (brotli/gzip) desde compression.MINIMUM_SIZE bytes. Va
+# antes que timing para quedar por dentro: recibe el cuerpo completo y puede
+# aplicar el umbral de tamaño
+app.add_middleware(CompressionMiddleware)
+
+# Tiempos por fase en el header Server-Timing de cada respuesta
+app.middleware("http")(timing.timing_middleware)
+
 # CORS para permitir requests desde el frontend
 app.add_middleware(
     CORSMiddleware,
@@ -30,14 +48,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Query-Source"],
 )
 
-# Servir archivos estáticos (solo si existen los directorios)
-if IMG_DIR.exists():
-    app.mount("/img", StaticFiles(directory=str(IMG_DIR)), name="img")
+# Servir archivos estáticos (solo si existen los directorios); img/ y las
+# páginas HTML van por static_response (variantes precomprimidas)
 if DATA_DIR.exists():
     app.mount("/data", StaticFiles(directory=str(DATA_DIR)), name="data")
 
+# Filtros con formato inválido (fechas, listas): 400 en vez de 500
+@app.exception_handler(tables.FiltroInvalido)
+async def filtro_invalido_handler(request: Request, exc: tables.FiltroInvalido):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 # Incluir routers de API
 app.include_router(costos.router)
 app.include_router(operatividad.router)
@@ -48,44 +72,74 @@ app.include_router(brigadas.router)
 app.include_router(errores.router)
 app.include_router(programados.router)
 app.include_router(gestion.router)
+app.include_router(facets.router)
+app.include_router(search.router)
+app.include_router(events.router)
+app.include_router(snapshots.router)
+app.include_router(export.router)
+app.include_router(query.router)
+app.include_router(historico.router)
 
 
 @app.on_event("startup")
 async def startup():
     """Inicializar BD al arrancar"""
     init_db()
+    if READ_REPLICA and replica.stale():
+        replica.publish()
+    precompress([FRONTEND_DIR, IMG_DIR])
+    if assets.stale():
+        try:
+            assets.build()
+        except OSError as e:
+            print(f"⚠️ No se pudieron construir los assets, se sirven las páginas originales: {e}")
+    if IMPORT_WORKER:
+        import_worker.start()
 
 
-# ============== ENDPOINTS PARA ARCHIVOS HTML ==============
+@app.on_event("shutdown")
+async def shutdown():
+    import_worker.stop()
 
-@app.get("/")
-async def root():
-    return FileResponse(str(FRONTEND_DIR / "index.html"))
 
+# ============== ENDPOINTS PARA ARCHIVOS HTML ==============
 
-@app.get("/index.html")
-async def index():
-    return FileResponse(str(FRONTEND_DIR / "index.html"))
+PAGES = ["index.html", "costos_mensuales.html", "operatividad_vehiculos.html", "compras.html", "indicadores.html"]
 
 
-@app.get("/costos_mensuales.html")
-async def costos_mensuales_page():
-    return FileResponse(str(FRONTEND_DIR / "costos_mensuales.html"))
+@app.get("/")
+async def root(request: Request):
+    return static_response(request, assets.page_path("index.html"))
 
 
-@app.get("/operatividad_vehiculos.html")
-async def operatividad_vehiculos_page():
-    return FileResponse(str(FRONTEND_DIR / "operatividad_vehiculos.html"))
+@app.get("/{page}.html")
+async def html_page(page: str, request: Request):
+    if f"{page}.html" not in PAGES:
+        raise HTTPException(status_code=404, detail="Página no encontrada")
+    return static_response(request, assets.page_path(f"{page}.html"))
 
 
-@app.get("/compras.html")
-async def compras_page():
-    return FileResponse(str(FRONTEND_DIR / "compras.html"))
+@app.get("/img/{nombre:path}")
+async def img_file(nombre: str, request: Request):
+    path = (IMG_DIR / nombre).resolve()
+    if not path.is_file() or IMG_DIR.resolve() not in path.parents or path.suffix in (".gz", ".br"):
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+    return static_response(request, path, CACHE_IMG)
 
 
-@app.get("/indicadores.html")
-async def indicadores_page():
-    return FileResponse(str(FRONTEND_DIR / "indicadores.html"))
+@app.get("/static/{nombre}")
+async def static_asset(nombre: str, request: Request):
+    """JS/CSS extraídos de las páginas: el nombre lleva el hash del contenido"""
+    path = assets.STATIC_DIR / nombre
+    if "/" in nombre or path.suffix in (".gz", ".br"):
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+    if not path.is_file():
+        # Páginas sin construir: scripts compartidos de frontend/static/ sin hash, se revalidan
+        path = assets.SHARED_DIR / nombre
+        if not path.is_file():
+            raise HTTPException(status_code=404, detail="Archivo no encontrado")
+        return static_response(request, path)
+    return static_response(request, path, CACHE_IMMUTABLE)
 
 
 # ============== ENDPOINTS DE ADMINISTRACIÓN ==============
@@ -109,6 +163,93 @@ async def get_admin_stats():
         return stats
 
 
+@app.get("/api/admin/timings")
+async def get_admin_timings():
+    """Tiempos recientes por ruta: percentiles, promedio por fase e histograma"""
+    return {
+        "window": timing.WINDOW_SIZE,
+        "routes": timing.summary()
+    }
+
+
+@app.delete("/api/admin/timings")
+async def reset_admin_timings():
+    """Reiniciar las muestras de tiempos"""
+    timing.reset()
+    return {"status": "ok"}
+
+
+@app.get("/api/admin/analytics/compare")
+async def compare_analytics(rounds: int = 5):
+    """Correr cada gráfico de compras con SQLite y en memoria: latencia mediana y diferencias"""
+    with get_db() as conn:
+        start = time.perf_counter()
+        analytics.invalidate()
+        for table in analytics.TABLES:
+            analytics.load(conn, table)
+        carga_ms = (time.perf_counter() - start) * 1000
+
+    charts = {}
+    for name, handler in compras.CHART_HANDLERS.items():
+        tiempos = {}
+        resultados = {}
+        for backend in analytics.BACKENDS:
+            muestras = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                resultados[backend] = await handler(compras.FilterRequest(), backend=backend)
+                muestras.append((time.perf_counter() - start) * 1000)
+            tiempos[backend] = round(statistics.median(muestras), 3)
+        charts[name] = {
+            "ms": tiempos,
+            "speedup": round(tiempos["sqlite"] / tiempos["memoria"], 1) if tiempos["memoria"] else None,
+            "diferencias": analytics.diferencias(resultados["sqlite"]["data"], resultados["memoria"]["data"]),
+        }
+    return {
+        "backend_configurado": analytics.ANALYTICS_BACKEND,
+        "carga_ms": round(carga_ms, 1),
+        "rounds": rounds,
+        "charts": charts,
+    }
+
+
+# Clientes locales (solo con LOGISTICA_IMPORT_TRUST_LOOPBACK=1)
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+
+class ImportTrigger(BaseModel):
+    importadores: Optional[List[str]] = None
+    archivos: Optional[List[str]] = None
+
+
+@app.post("/api/admin/import/trigger")
+async def trigger_import(
+    request: Request, body: Optional[ImportTrigger] = None, x_webhook_secret: Optional[str] = Header(None)
+):
+    """Encolar una importación (webhook): por clave de importador, por nombre de archivo o todo.
+    Exige LOGISTICA_IMPORT_SECRET, o LOGISTICA_IMPORT_TRUST_LOOPBACK=1 para aceptar la misma máquina"""
+    if IMPORT_WEBHOOK_SECRET:
+        if not secrets.compare_digest(x_webhook_secret or "", IMPORT_WEBHOOK_SECRET):
+            raise HTTPException(status_code=401, detail="Secreto de webhook inválido")
+    elif not (IMPORT_TRUST_LOOPBACK and request.client is not None and request.client.host in LOOPBACK_HOSTS):
+        raise HTTPException(
+            status_code=403,
+            detail="Configure LOGISTICA_IMPORT_SECRET para disparar importaciones"
+        )
+    body = body or ImportTrigger()
+    try:
+        encolados = import_worker.trigger(body.importadores, body.archivos)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "encolado", "importadores": encolados}
+
+
+@app.get("/api/admin/import/status")
+async def get_import_status():
+    """Estado del importador en segundo plano: espera, cola, corrida actual e historial con duraciones"""
+    return import_worker.status()
+
+
 @app.get("/api/health")
 async def health_check():
     """Verificar que la API está funcionando"""
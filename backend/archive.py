@@ -0,0 +1,226 @@
+"""
+Archivo histórico por periodo.
+
+Cada importación reemplaza los años que vuelve a leer, así que la base
+caliente (logistica.db) crecería con todos los meses de todos los libros.
+freeze() corre desde derived.refresh() después de importar las tablas de
+almacenes: los periodos cerrados (todos menos los HOT_PERIODS más recientes)
+se copian a un archivo SQLite por periodo ({periodo}.db, p. ej. 2025-04.db)
+con las seis tablas, compactado con VACUUM y de solo lectura, y se borran de
+la base caliente. Si una importación vuelve a traer filas de un periodo
+archivado (correcciones en el libro de un mes cerrado), el periodo se vuelve
+a archivar: las tablas reimportadas reemplazan a las del archivo y las demás
+se conservan.
+
+include() hace consultable la historia bajo demanda: si el rango de fechas de
+una consulta toca periodos archivados, los adjunta (ATTACH, solo lectura) y
+crea una vista TEMP con el nombre de la tabla que une la base caliente con
+esos archivos. Las vistas TEMP se resuelven antes que las tablas de main, así
+que el SQL de los routers no cambia. Si el rango toca más archivos de los que
+SQLite puede adjuntar a la vez, sus filas se copian a una tabla TEMP. Sin
+rango de fechas se adjuntan todos los periodos archivados.
+
+El archivo es opcional: con HOT_PERIODS = 0 (por defecto) freeze() no
+archiva periodos nuevos y las consultas leen solo la base caliente.
+"""
+import os
+import re
+import sqlite3
+import stat
+from pathlib import Path
+
+from . import database, tables
+from .config import ARCHIVE_DIR, HOT_PERIODS
+
+TABLES = database.PARTITIONED_TABLES
+PERIODO = re.compile(r"\d{4}-\d{2}")
+
+
+def directory():
+    """Carpeta de los archivos (la de la base actual, también cuando synthetic_data cambia DB_PATH)"""
+    if ARCHIVE_DIR:
+        return Path(ARCHIVE_DIR)
+    return database.DB_PATH.parent / f"{database.DB_PATH.stem}.archivo"
+
+
+def path_for(periodo):
+    return directory() / f"{periodo}.db"
+
+
+def _uri(periodo):
+    return f"{path_for(periodo).resolve().as_uri()}?mode=ro"
+
+
+def periodos():
+    """Periodos archivados, del más viejo al más nuevo"""
+    if not directory().exists():
+        return []
+    return sorted(p.stem for p in directory().glob("*.db") if PERIODO.fullmatch(p.stem))
+
+
+def _hot_periodos(cursor):
+    union = " UNION ".join(f"SELECT DISTINCT periodo FROM main.{t} WHERE periodo IS NOT NULL" for t in TABLES)
+    cursor.execute(f"SELECT periodo FROM ({union}) ORDER BY periodo")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _write(conn, periodo):
+    """Copiar las filas del periodo a {periodo}.db: temporal, VACUUM, solo lectura y rename.
+    Si el periodo ya estaba archivado, las tablas sin filas en la base caliente salen del archivo anterior"""
+    destino = path_for(periodo)
+    tmp = destino.with_suffix(".db.tmp")
+    tmp.unlink(missing_ok=True)
+    cursor = conn.cursor()
+    anterior = destino.exists()
+    if anterior:
+        cursor.execute("ATTACH DATABASE ? AS anterior", (_uri(periodo),))
+    cursor.execute("ATTACH DATABASE ? AS congelar", (str(tmp),))
+    try:
+        for table in TABLES:
+            cursor.execute(f"SELECT 1 FROM main.{table} WHERE periodo = ? LIMIT 1", (periodo,))
+            if cursor.fetchone() or not anterior:
+                cursor.execute(f"CREATE TABLE congelar.{table} AS SELECT * FROM main.{table} WHERE periodo = ?", (periodo,))
+            else:
+                cursor.execute(f"CREATE TABLE congelar.{table} AS SELECT * FROM anterior.{table}")
+        conn.commit()
+    finally:
+        cursor.execute("DETACH DATABASE congelar")
+        if anterior:
+            cursor.execute("DETACH DATABASE anterior")
+    archivo = sqlite3.connect(str(tmp))
+    try:
+        archivo.execute("VACUUM")
+    finally:
+        archivo.close()
+    os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    tmp.replace(destino)
+
+
+def freeze(conn, keep=HOT_PERIODS):
+    """Archivar los periodos cerrados y sacarlos de la base caliente; devuelve {tabla: filas movidas}"""
+    cursor = conn.cursor()
+    calientes = _hot_periodos(cursor)
+    archivados = set(periodos())
+    # Vigentes: los keep más recientes entre la base caliente y el archivo (todos si keep = 0:
+    # archivo desactivado, solo se actualizan los periodos que ya estaban archivados)
+    vigentes = sorted(set(calientes) | archivados)[-keep:] if keep > 0 else sorted(calientes)
+    cerrados = [p for p in calientes if p < min(vigentes, default="9999-99") or p in archivados]
+    if not cerrados:
+        return {}
+
+    directory().mkdir(parents=True, exist_ok=True)
+    movidas = {}
+    for periodo in cerrados:
+        _write(conn, periodo)
+        accion = "vuelto a archivar con las filas reimportadas" if periodo in archivados else "archivado"
+        print(f"🧊 Periodo {periodo} {accion} en {path_for(periodo)} ({path_for(periodo).stat().st_size:,} B)")
+        for table in TABLES:
+            cursor.execute(f"DELETE FROM main.{table} WHERE periodo = ?", (periodo,))
+            if cursor.rowcount:
+                movidas[table] = movidas.get(table, 0) + cursor.rowcount
+        conn.commit()
+    return movidas
+
+
+def _schema(periodo):
+    return "h_" + periodo.replace("-", "_")
+
+
+def _columns(cursor, schema, table):
+    cursor.execute(f"PRAGMA {schema}.table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _select(cursor, schema, table, columnas):
+    propias = set(_columns(cursor, schema, table))
+    lista = ", ".join(c if c in propias else f"NULL AS {c}" for c in columnas)
+    return f"SELECT {lista} FROM {schema}.{table}"
+
+
+def include(conn, table, fecha_inicio=None, fecha_fin=None):
+    """Adjuntar los periodos archivados que toca el rango (todos si no hay fechas) y hacer que
+    `table` los incluya (vista TEMP sobre main + archivos); devuelve los periodos adjuntados"""
+    if table not in TABLES:
+        return []
+    cursor = conn.cursor()
+    # Una vista de una consulta anterior en la misma conexión (p. ej. /api/query/batch) no se reutiliza
+    cursor.execute(f"DROP VIEW IF EXISTS temp.{table}")
+    inicio, fin = tables.parse_fecha(fecha_inicio), tables.parse_fecha(fecha_fin, fin=True)
+    desde = inicio.isoformat()[:7] if inicio else ""
+    hasta = fin.isoformat()[:7] if fin else "9999-99"
+    pedidos = [p for p in periodos() if desde <= p <= hasta]
+    if not pedidos:
+        return []
+    # Columnas de la tabla caliente; las que un archivo viejo no tenga salen NULL
+    columnas = _columns(cursor, "main", table)
+    selects = [f"SELECT {', '.join(columnas)} FROM main.{table}"]
+    cursor.execute("PRAGMA database_list")
+    adjuntos = {row[1] for row in cursor.fetchall()} - {"main", "temp"}
+    if len(set(map(_schema, pedidos)) | adjuntos) <= conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED):
+        for periodo in pedidos:
+            if _schema(periodo) not in adjuntos:
+                cursor.execute(f"ATTACH DATABASE ? AS {_schema(periodo)}", (_uri(periodo),))
+            selects.append(_select(cursor, _schema(periodo), table, columnas))
+    else:
+        # Más periodos que bases adjuntables a la vez (SQLITE_LIMIT_ATTACHED, 10 por defecto):
+        # se copian de a uno a una tabla TEMP de esta conexión
+        copia = f"historico_{table}"
+        cursor.execute(f"DROP TABLE IF EXISTS temp.{copia}")
+        cursor.execute(f"CREATE TEMP TABLE {copia} AS SELECT {', '.join(columnas)} FROM main.{table} WHERE 0")
+        for periodo in pedidos:
+            esquema = _schema(periodo) if _schema(periodo) in adjuntos else "copiar"
+            if esquema == "copiar":
+                cursor.execute("ATTACH DATABASE ? AS copiar", (_uri(periodo),))
+            cursor.execute(f"INSERT INTO temp.{copia} {_select(cursor, esquema, table, columnas)}")
+            conn.commit()
+            if esquema == "copiar":
+                cursor.execute("DETACH DATABASE copiar")
+        selects.append(f"SELECT {', '.join(columnas)} FROM temp.{copia}")
+    union = " UNION ALL ".join(selects)
+    cursor.execute(f"CREATE TEMP VIEW {table} AS {union}")
+    return pedidos
+
+
+def release(conn):
+    """Deshacer include(): borrar las vistas y copias TEMP y separar los archivos adjuntos"""
+    cursor = conn.cursor()
+    for table in TABLES:
+        cursor.execute(f"DROP VIEW IF EXISTS temp.{table}")
+        cursor.execute(f"DROP TABLE IF EXISTS temp.historico_{table}")
+    conn.commit()
+    cursor.execute("PRAGMA database_list")
+    for esquema in [row[1] for row in cursor.fetchall()]:
+        if esquema.startswith("h_"):
+            cursor.execute(f"DETACH DATABASE {esquema}")
+
+
+def counts():
+    """Filas por periodo y tabla: base caliente y archivos, con el tamaño de cada archivo"""
+    resultado = {}
+    with database.get_db() as conn:
+        cursor = conn.cursor()
+        for table in TABLES:
+            cursor.execute(f"SELECT periodo, COUNT(*) FROM {table} WHERE periodo IS NOT NULL GROUP BY periodo")
+            for periodo, filas in cursor.fetchall():
+                resultado.setdefault(periodo, {"fuente": "caliente", "tablas": {}})["tablas"][table] = filas
+    for periodo in periodos():
+        archivo = sqlite3.connect(_uri(periodo), uri=True)
+        try:
+            resultado[periodo] = {
+                "fuente": "archivo",
+                "bytes": path_for(periodo).stat().st_size,
+                "tablas": {
+                    table: archivo.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLES
+                },
+            }
+        finally:
+            archivo.close()
+    return dict(sorted(resultado.items()))
+
+
+if __name__ == "__main__":
+    # Archivar a mano y compactar la base caliente
+    with database.get_db(primary=True) as conn:
+        movidas = freeze(conn)
+        conn.execute("VACUUM")
+    print(f"✅ Archivo histórico: {sum(movidas.values()):,} filas movidas, {len(periodos())} periodos en {directory()}")
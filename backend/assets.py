@@ -0,0 +1,139 @@
+"""
+Build de los assets del frontend.
+
+Las páginas de frontend/ traen todo su JS y CSS en línea, así cada visita
+vuelve a descargar cientos de KB aunque nada haya cambiado. build() separa
+cada <script> y <style> en línea a build/static/ con el hash del contenido en
+el nombre ({pagina}-{n}.{hash}.js/css) y escribe en build/ la página reducida
+que los referencia (/static/...). Las referencias a img/ quedan versionadas
+con ?v={hash}. Los scripts compartidos entre páginas viven en frontend/static/
+y las páginas los referencian como /static/{nombre}.js: se copian con el hash
+en el nombre ({nombre}.{hash}.js) y se reescriben sus referencias. Como el
+nombre cambia con el contenido, /static/ se sirve como immutable y solo la
+página (pocos KB) se revalida en cada visita.
+
+Corre en el build (python -m backend.assets) y al arrancar la API si alguna
+página es más nueva que su versión construida.
+"""
+import hashlib
+import json
+import re
+
+from .config import BASE_DIR
+from .compression import precompress
+
+FRONTEND_DIR = BASE_DIR / "frontend"
+SHARED_DIR = FRONTEND_DIR / "static"
+IMG_DIR = BASE_DIR / "img"
+BUILD_DIR = BASE_DIR / "build"
+STATIC_DIR = BUILD_DIR / "static"
+MANIFEST = BUILD_DIR / "manifest.json"
+
+HASH_LENGTH = 12
+
+# <script> sin src y <style>, con sus atributos
+INLINE_SCRIPT = re.compile(r"<script(?P<attrs>(?:(?!\bsrc=)[^>])*)>(?P<body>.*?)</script>", re.S | re.I)
+INLINE_STYLE = re.compile(r"<style(?P<attrs>[^>]*)>(?P<body>.*?)</style>", re.S | re.I)
+# <script src="/static/x.js"> de un script compartido de frontend/static/
+SHARED_REF = re.compile(r"""(?P<prefix>\bsrc=["'])/static/(?P<nombre>[\w.-]+\.js)(?=["'])""")
+IMG_REF = re.compile(r"""(?P<prefix>["'(])(?P<path>/?img/[^"'()?#\s]+)""")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def _img_versions():
+    return {
+        path.name: content_hash(path.read_bytes())
+        for path in IMG_DIR.glob("*") if path.is_file() and path.suffix not in (".gz", ".br")
+    } if IMG_DIR.exists() else {}
+
+
+def _build_shared(escritos):
+    """Copiar los scripts de frontend/static/ con el hash en el nombre; devuelve {nombre: nombre con hash}"""
+    compartidos = {}
+    for path in sorted(SHARED_DIR.glob("*.js")) if SHARED_DIR.exists() else []:
+        data = path.read_bytes()
+        nombre = f"{path.stem}.{content_hash(data)}{path.suffix}"
+        destino = STATIC_DIR / nombre
+        if not destino.exists():
+            destino.write_bytes(data)
+        escritos.add(nombre)
+        compartidos[path.name] = nombre
+    return compartidos
+
+
+def _build_page(page, img_versions, compartidos, escritos):
+    html = page.read_text(encoding="utf-8")
+    html = SHARED_REF.sub(
+        lambda m: f"{m.group('prefix')}/static/{compartidos.get(m.group('nombre'), m.group('nombre'))}", html
+    )
+    contador = {"js": 0, "css": 0}
+
+    def extraer(ext, match):
+        body = match.group("body")
+        if not body.strip():
+            return match.group(0)
+        contador[ext] += 1
+        data = body.strip("\n").encode("utf-8") + b"\n"
+        nombre = f"{page.stem}-{contador[ext]}.{content_hash(data)}.{ext}"
+        destino = STATIC_DIR / nombre
+        if not destino.exists():
+            destino.write_bytes(data)
+        escritos.add(nombre)
+        attrs = match.group("attrs")
+        if ext == "js":
+            return f'<script{attrs} src="/static/{nombre}"></script>'
+        return f'<link rel="stylesheet"{attrs} href="/static/{nombre}">'
+
+    def versionar(match):
+        path = match.group("path")
+        version = img_versions.get(path.rsplit("/", 1)[-1])
+        return match.group(0) + (f"?v={version}" if version else "")
+
+    html = INLINE_STYLE.sub(lambda m: extraer("css", m), html)
+    html = INLINE_SCRIPT.sub(lambda m: extraer("js", m), html)
+    html = IMG_REF.sub(versionar, html)
+    (BUILD_DIR / page.name).write_text(html, encoding="utf-8")
+    return contador
+
+
+def build():
+    """Construir todas las páginas; borra los assets que ya no usa ninguna"""
+    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+    img_versions = _img_versions()
+    escritos = set()
+    compartidos = _build_shared(escritos)
+    manifest = {}
+    for page in sorted(FRONTEND_DIR.glob("*.html")):
+        manifest[page.name] = _build_page(page, img_versions, compartidos, escritos)
+    for viejo in STATIC_DIR.iterdir():
+        if viejo.name.removesuffix(".gz").removesuffix(".br") not in escritos:
+            viejo.unlink()
+    manifest = {"paginas": manifest, "compartidos": compartidos, "assets": sorted(escritos), "img": img_versions}
+    MANIFEST.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    precompress([BUILD_DIR], patterns=("*.html",))
+    precompress([STATIC_DIR])
+    print(f"✅ Assets: {len(manifest['paginas'])} páginas, {len(escritos)} archivos en {STATIC_DIR}")
+    return manifest
+
+
+def stale():
+    """True si falta el build o alguna página/script compartido/imagen es más nueva que él"""
+    if not MANIFEST.exists():
+        return True
+    construido = MANIFEST.stat().st_mtime_ns
+    fuentes = list(FRONTEND_DIR.glob("*.html")) + list(SHARED_DIR.glob("*.js"))
+    fuentes += list(IMG_DIR.glob("*")) if IMG_DIR.exists() else []
+    return any(p.stat().st_mtime_ns > construido for p in fuentes if p.suffix not in (".gz", ".br"))
+
+
+def page_path(nombre):
+    """Página construida si existe, si no la original de frontend/"""
+    construida = BUILD_DIR / nombre
+    return construida if construida.exists() else FRONTEND_DIR / nombre
+
+
+if __name__ == "__main__":
+    build()
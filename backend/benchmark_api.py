@@ -0,0 +1,229 @@
+"""
+Benchmark de la API con la mezcla de peticiones de cada dashboard.
+
+Levanta backend.api:app en el mismo proceso sobre una BD sintética
+(synthetic_data.py) y reproduce las llamadas que hace cada página HTML al
+cargar. Reporta throughput, latencias p50/p95/p99 por endpoint y RSS pico,
+y guarda el resultado en JSON para comparar ramas antes de desplegar.
+
+Uso:
+    python -m backend.benchmark_api --scale 1 --rounds 20 --concurrency 4 --output bench.json
+    python -m backend.benchmark_api --db /tmp/sintetica.db --compare bench_main.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from . import database
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Cuerpo que envía compras.html al cargar (sin filtros seleccionados)
+COMPRAS_FILTERS = {"dateStart": "", "dateEnd": "", "processes": [], "suppliers": []}
+
+COMPRAS_CHARTS = [
+    "oc-vs-items-by-process", "percent-discounts-by-process", "top-suppliers-discounts",
+    "avg-generation-days", "avg-approval-management-days", "pending-approve-rq",
+    "avg-reception-service-days", "pending-approve-oc", "avg-warehouse-entry-days",
+    "avg-approval-days", "oc-by-state", "trend-oc", "discounts-by-process",
+    "top-suppliers", "days-by-stage", "spend-by-process",
+]
+
+# Llamadas (método, ruta, query, body) que hace cada página al cargar
+PAGE_MIXES = {
+    "compras.html": [
+        ("GET", "/api/compras/load", None, None),
+        ("GET", "/api/compras/filters", None, None),
+        ("POST", "/api/compras/kpis", None, COMPRAS_FILTERS),
+    ] + [("POST", f"/api/compras/charts/{chart}", None, COMPRAS_FILTERS) for chart in COMPRAS_CHARTS],
+    "indicadores.html": [
+        ("GET", "/api/indicadores/filtros", None, None),
+        ("GET", "/api/fiscal-ru/filtros", None, None),
+        ("GET", "/api/errores/filtros", None, None),
+        ("GET", "/api/programados/filtros", None, None),
+        ("GET", "/api/gestion/filtros", None, None),
+        ("GET", "/api/indicadores/kpis", {}, None),
+        ("GET", "/api/indicadores/grafico/inventario-por-sede", {}, None),
+        ("GET", "/api/fiscal-ru/grafico/por-sede", {}, None),
+        ("GET", "/api/brigadas/grafico/por-sede", {}, None),
+        ("GET", "/api/errores/grafico/por-error", {}, None),
+        ("GET", "/api/programados/grafico/por-sede", {}, None),
+        ("GET", "/api/gestion/grafico/por-sede", {}, None),
+    ],
+    "costos_mensuales.html": [
+        ("GET", "/api/costos/datos", {"limit": 50000}, None),
+        ("GET", "/api/admin/stats", None, None),
+    ],
+    "operatividad_vehiculos.html": [
+        ("GET", "/api/operatividad/datos", {"limit": 100000}, None),
+        ("GET", "/api/admin/stats", None, None),
+    ],
+}
+
+
+def percentile(values, pct):
+    """Percentil por interpolación lineal (values ordenados)"""
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def peak_rss_mb():
+    """RSS pico del proceso en MB (None si la plataforma no lo expone)"""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _run_page(client, mix, rounds, concurrency):
+    """Reproducir la mezcla de una página con N usuarios concurrentes"""
+    samples = {}
+
+    async def usuario():
+        for _ in range(rounds):
+            for method, path, params, body in mix:
+                start = time.perf_counter()
+                response = await client.request(method, path, params=params, json=body)
+                elapsed = (time.perf_counter() - start) * 1000
+                stats = samples.setdefault(f"{method} {path}", {"latencias": [], "errores": 0, "bytes": 0})
+                stats["latencias"].append(elapsed)
+                stats["bytes"] += len(response.content)
+                if response.status_code != 200:
+                    stats["errores"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(usuario() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    endpoints = {}
+    total = 0
+    for key, stats in samples.items():
+        latencias = sorted(stats["latencias"])
+        total += len(latencias)
+        endpoints[key] = {
+            "requests": len(latencias),
+            "errors": stats["errores"],
+            "mean_ms": round(sum(latencias) / len(latencias), 2),
+            "p50_ms": round(percentile(latencias, 50), 2),
+            "p95_ms": round(percentile(latencias, 95), 2),
+            "p99_ms": round(percentile(latencias, 99), 2),
+            "bytes_per_request": stats["bytes"] // len(latencias),
+        }
+    return {
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0,
+        "page_loads_per_s": round(rounds * concurrency / elapsed, 2) if elapsed else 0,
+        "endpoints": endpoints,
+    }
+
+
+async def run_benchmark(db_path, pages, rounds, concurrency):
+    """Ejecutar el benchmark de las páginas indicadas contra db_path"""
+    database.DB_PATH = Path(db_path)
+    from .api import app
+
+    database.init_db()
+    results = {"pages": {}}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for page in pages:
+            # Una pasada de calentamiento para no medir imports ni caché fría
+            await _run_page(client, PAGE_MIXES[page], 1, 1)
+            results["pages"][page] = await _run_page(client, PAGE_MIXES[page], rounds, concurrency)
+            print(f"   {page}: {results['pages'][page]['throughput_rps']} req/s")
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def compare(actual, anterior):
+    """Imprimir la variación de p95 por endpoint contra un resultado previo"""
+    print(f"\nComparación contra {anterior.get('meta', {}).get('git_revision') or 'resultado previo'}:")
+    for page, datos in actual["pages"].items():
+        previos = anterior.get("pages", {}).get(page, {}).get("endpoints", {})
+        for key, stats in datos["endpoints"].items():
+            if key not in previos:
+                continue
+            antes = previos[key]["p95_ms"]
+            delta = ((stats["p95_ms"] - antes) / antes * 100) if antes else 0
+            marca = "⚠️" if delta > 10 else "  "
+            print(f"{marca} {page:28} {key:60} p95 {antes:9.2f} → {stats['p95_ms']:9.2f} ms ({delta:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la API por página del dashboard")
+    parser.add_argument("--db", help="BD sintética a usar (se genera si no existe)")
+    parser.add_argument("--scale", type=float, default=1, help="Factor de escala de la BD sintética generada")
+    parser.add_argument("--pages", nargs="+", choices=sorted(PAGE_MIXES), default=sorted(PAGE_MIXES))
+    parser.add_argument("--rounds", type=int, default=10, help="Cargas de página por usuario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Usuarios concurrentes")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    parser.add_argument("--compare", help="Resultado JSON previo contra el cual comparar")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(args.db) if args.db else Path(tmp) / "logistica_sintetica.db"
+        if not db_path.exists():
+            # En un subproceso para que la generación no infle el RSS medido
+            subprocess.run(
+                [sys.executable, "-m", "backend.synthetic_data", str(db_path), "--scale", str(args.scale)],
+                cwd=BASE_DIR, check=True
+            )
+
+        print(f"⏱️ Benchmark: {args.rounds} rondas × {args.concurrency} usuarios")
+        results = asyncio.run(run_benchmark(db_path, args.pages, args.rounds, args.concurrency))
+
+    results["meta"] = {
+        "git_revision": _git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "scale": args.scale,
+        "rounds": args.rounds,
+        "concurrency": args.concurrency,
+    }
+
+    for page, datos in results["pages"].items():
+        print(f"\n{page}: {datos['requests']} peticiones en {datos['elapsed_s']} s ({datos['throughput_rps']} req/s)")
+        for key, stats in sorted(datos["endpoints"].items(), key=lambda kv: -kv[1]["p95_ms"]):
+            errores = f"  ❌ {stats['errors']} errores" if stats["errors"] else ""
+            print(f"   {key:60} p50 {stats['p50_ms']:8.2f}  p95 {stats['p95_ms']:8.2f}  p99 {stats['p99_ms']:8.2f} ms{errores}")
+    print(f"\nRSS pico: {results['peak_rss_mb']} MB")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"📁 Resultado guardado en {args.output}")
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Compresión HTTP.
+
+- CompressionMiddleware: comprime las respuestas dinámicas (JSON de la API)
+  desde MINIMUM_SIZE bytes, con brotli si el navegador lo acepta y el paquete
+  está instalado, si no con gzip. Respeta lo que ya viene comprimido
+  (snapshots, Arrow/Parquet) y no toca los flujos SSE.
+- precompress(): genera variantes .br/.gz de frontend/*.html e img/* al lado
+  del original. Corre en el build (python -m backend.compression) y al
+  arrancar, regenerando solo las variantes viejas.
+- static_response(): sirve un archivo eligiendo la variante precomprimida según
+  Accept-Encoding, con ETag y 304. Las URLs versionadas (?v=...) se cachean
+  como immutable por un año.
+"""
+import gzip
+import mimetypes
+from pathlib import Path
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipMiddleware, IdentityResponder
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Respuestas más chicas que esto no se comprimen (el encabezado gzip no compensa)
+MINIMUM_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Formatos que ya vienen comprimidos
+EXCLUDED_CONTENT_TYPES = DEFAULT_EXCLUDED_CONTENT_TYPES + (
+    "application/vnd.apache.arrow.stream",
+    "application/vnd.apache.parquet",
+)
+
+# Variantes precomprimidas: se guardan solo si ahorran al menos este porcentaje
+MIN_SAVINGS = 0.1
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_IMG = "public, max-age=604800"
+CACHE_HTML = "no-cache"
+
+
+def accepted_encodings(request_headers):
+    """Codificaciones aceptadas (sin las que vienen con q=0)"""
+    aceptadas = set()
+    for parte in request_headers.get("accept-encoding", "").split(","):
+        nombre, _, params = parte.partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            aceptadas.add(nombre.strip().lower())
+    return aceptadas
+
+
+# ============== MIDDLEWARE ==============
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size, quality=BROTLI_QUALITY, *, exclude_content_types=EXCLUDED_CONTENT_TYPES):
+        super().__init__(app, minimum_size, exclude_content_types=exclude_content_types)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body, *, more_body):
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        if more_body:
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware de Starlette que prefiere brotli cuando está disponible"""
+
+    def __init__(self, app, minimum_size=MINIMUM_SIZE, compresslevel=GZIP_LEVEL):
+        super().__init__(app, minimum_size, compresslevel, exclude_content_types=EXCLUDED_CONTENT_TYPES)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and brotli is not None and "br" in accepted_encodings(Headers(scope=scope)):
+            responder = BrotliResponder(self.app, self.minimum_size, exclude_content_types=self.exclude_content_types)
+            await responder(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# ============== ARCHIVOS PRECOMPRIMIDOS ==============
+
+def _variants(path):
+    """(codificación, ruta) en orden de preferencia"""
+    variantes = [("gzip", path.with_name(path.name + ".gz"))]
+    if brotli is not None:
+        variantes.insert(0, ("br", path.with_name(path.name + ".br")))
+    return variantes
+
+
+def _fresh(variante, path):
+    return variante.exists() and variante.stat().st_mtime_ns >= path.stat().st_mtime_ns
+
+
+def _compress(encoding, data):
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def precompress(directories, patterns=("*",)):
+    """Generar las variantes .br/.gz que falten o estén viejas; devuelve cuántas escribió"""
+    escritas = 0
+    for directory in directories:
+        directory = Path(directory)
+        if not directory.exists():
+            continue
+        for pattern in patterns:
+            for path in sorted(directory.glob(pattern)):
+                if not path.is_file() or path.suffix in (".gz", ".br"):
+                    continue
+                data = None
+                for encoding, variante in _variants(path):
+                    if _fresh(variante, path):
+                        continue
+                    data = data if data is not None else path.read_bytes()
+                    comprimido = _compress(encoding, data)
+                    try:
+                        if len(comprimido) <= len(data) * (1 - MIN_SAVINGS):
+                            variante.write_bytes(comprimido)
+                            escritas += 1
+                        elif variante.exists():
+                            variante.unlink()
+                    except OSError as e:
+                        print(f"⚠️ No se pudo escribir {variante.name}: {e}")
+    return escritas
+
+
+def static_response(request: Request, path: Path, cache_control=CACHE_HTML):
+    """Servir un archivo con la mejor variante precomprimida que acepte el navegador.
+    cache_control aplica a la URL sin versión; con ?v=... es immutable."""
+    if "v" in request.query_params:
+        cache_control = CACHE_IMMUTABLE
+    stat = path.stat()
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    aceptadas = accepted_encodings(request.headers)
+
+    servido, encoding = path, None
+    for candidata, variante in _variants(path):
+        if candidata in aceptadas and _fresh(variante, path):
+            servido, encoding = variante, candidata
+            break
+
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(str(servido), media_type=media_type, headers=headers)
+
+
+if __name__ == "__main__":
+    from .config import BASE_DIR
+    n = precompress([BASE_DIR / "frontend", BASE_DIR / "img"])
+    print(f"✅ Variantes precomprimidas generadas: {n}")
@@ -1,12 +1,43 @@
 import os
+import re
 from pathlib import Path
 
 # Rutas base
 BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_DIR = BASE_DIR / "data"
-DB_PATH = BASE_DIR / "backend" / "logistica.db"
+DATA_DIR = Path(os.environ.get("LOGISTICA_DATA_DIR", BASE_DIR / "data"))
+DB_PATH = Path(os.environ.get("LOGISTICA_DB_PATH", BASE_DIR / "backend" / "logistica.db"))
 
-# Configuración de archivos Excel
+# Backend de /api/compras/charts/*: "sqlite" o "memoria" (ver analytics.py)
+ANALYTICS_BACKEND = os.environ.get("LOGISTICA_ANALYTICS", "sqlite")
+
+# Snapshots precompilados de los datasets de transporte (ver snapshots.py). Sin
+# LOGISTICA_SNAPSHOT_DIR van en {base}.snapshots/ al lado de la base de datos
+SNAPSHOT_DIR = os.environ.get("LOGISTICA_SNAPSHOT_DIR")
+
+# Réplica de lectura (ver replica.py): la API lee de una copia inmutable de la base que se
+# publica después de cada importación; las importaciones escriben solo en DB_PATH
+READ_REPLICA = os.environ.get("LOGISTICA_READ_REPLICA", "1") == "1"
+REPLICA_MMAP_SIZE = int(os.environ.get("LOGISTICA_REPLICA_MMAP_MB", "256")) * 1024 * 1024
+
+# Archivo histórico de periodos cerrados (ver archive.py). Sin LOGISTICA_ARCHIVE_DIR
+# los archivos van en {base}.archivo/ al lado de la base de datos
+ARCHIVE_DIR = os.environ.get("LOGISTICA_ARCHIVE_DIR")
+# Periodos (meses) más recientes que se quedan en la base caliente; 0 desactiva el archivo.
+# Las consultas sin fechas adjuntan todos los archivos (más de 10 se copian a una tabla TEMP)
+HOT_PERIODS = int(os.environ.get("LOGISTICA_HOT_PERIODS", "0"))
+
+# Importador en segundo plano (ver import_worker.py)
+IMPORT_WORKER = os.environ.get("LOGISTICA_IMPORT_WORKER", "0") == "1"
+IMPORT_DEBOUNCE_SECONDS = float(os.environ.get("LOGISTICA_IMPORT_DEBOUNCE", "10"))
+# POST /api/admin/import/trigger exige el header X-Webhook-Secret con este valor; sin
+# secreto se rechaza, salvo que LOGISTICA_IMPORT_TRUST_LOOPBACK=1 acepte pedidos desde la
+# misma máquina (no usar detrás de un proxy local: todo llega desde 127.0.0.1)
+IMPORT_WEBHOOK_SECRET = os.environ.get("LOGISTICA_IMPORT_SECRET")
+IMPORT_TRUST_LOOPBACK = os.environ.get("LOGISTICA_IMPORT_TRUST_LOOPBACK", "0") == "1"
+
+# Configuración de archivos Excel. Los libros de almacenes son uno por año:
+# "{anio}" en el nombre se busca como INDICADORES 2025.xlsx, INDICADORES 2026.xlsx...
+ALMACENES_DIR = DATA_DIR / "ALMACENES"
 EXCEL_FILES = {
     "costos_mensuales": {
         "path": DATA_DIR / "TRANSPORTE" / "Costos mensuales - Vehiculos.xlsx",
@@ -25,31 +56,47 @@ EXCEL_FILES = {
         }
     },
     "indicadores": {
-        "path": DATA_DIR / "ALMACENES" / "INDICADORES 2025.xlsx",
+        "path": ALMACENES_DIR / "INDICADORES {anio}.xlsx",
         "sheet": "OYMM"
     },
     "fiscal_ru": {
-        "path": DATA_DIR / "ALMACENES" / "INDICADORES 2025.xlsx",
+        "path": ALMACENES_DIR / "INDICADORES {anio}.xlsx",
         "sheet": "FISCAL-RU"
     },
     "brigadas": {
-        "path": DATA_DIR / "ALMACENES" / "INDICADORES 2025.xlsx",
+        "path": ALMACENES_DIR / "INDICADORES {anio}.xlsx",
         "sheet": "BRIGADAS "
     },
     "errores": {
-        "path": DATA_DIR / "ALMACENES" / "INDICADORES 2025.xlsx",
+        "path": ALMACENES_DIR / "INDICADORES {anio}.xlsx",
         "sheet": "ERRORES "
     },
     "programados_ejecutados": {
-        "path": DATA_DIR / "ALMACENES" / "INDICADORES 2025.xlsx",
+        "path": ALMACENES_DIR / "INDICADORES {anio}.xlsx",
         "sheet": "PRO VS EJECU"
     },
     "gestion": {
-        "path": DATA_DIR / "ALMACENES" / "INDICADORES 2025.xlsx",
+        "path": ALMACENES_DIR / "INDICADORES {anio}.xlsx",
         "sheet": "GESTION "
     }
 }
 
+
+def workbooks(key):
+    """[(año, ruta)] de una entrada de EXCEL_FILES: los libros anuales que existen si la
+    ruta lleva {anio}, si no [(None, ruta)]"""
+    path = EXCEL_FILES[key]["path"]
+    if "{anio}" not in path.name:
+        return [(None, path)]
+    patron = re.compile(re.escape(path.name).replace(re.escape("{anio}"), r"(\d{4})") + "$")
+    encontrados = []
+    for candidato in sorted(path.parent.glob(path.name.replace("{anio}", "*"))):
+        match = patron.match(candidato.name)
+        if match:
+            encontrados.append((int(match.group(1)), candidato))
+    return encontrados
+
+
 # Configuración del servidor
 API_HOST = "0.0.0.0"
 API_PORT = 8000
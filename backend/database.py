@@ -1,25 +1,105 @@
 import sqlite3
+import time
 from contextlib import contextmanager
-from .config import DB_PATH
+from .config import DB_PATH, READ_REPLICA, REPLICA_MMAP_SIZE
+from .import_profile import stage
+from .tables import MESES
+from .timing import TimedConnection, record
 
-def get_connection():
-    """Obtener conexión a la base de datos"""
-    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+def replica_path():
+    """Réplica de lectura de la base actual ({base}.lectura.db, ver replica.py)"""
+    return DB_PATH.with_name(f"{DB_PATH.stem}.lectura.db")
+
+
+def get_connection(primary=False):
+    """Obtener conexión a la base de datos.
+
+    Las lecturas van a la réplica publicada (solo lectura, immutable=1: SQLite no
+    toma locks ni revisa cambios, y con mmap las páginas se comparten entre
+    workers). primary=True, o si todavía no hay réplica, abre la base principal:
+    importaciones, migraciones y lecturas que deben ver lo último que se escribió.
+    """
+    start = time.perf_counter()
+    replica = replica_path()
+    if READ_REPLICA and not primary and replica.exists():
+        conn = sqlite3.connect(
+            f"{replica.resolve().as_uri()}?mode=ro&immutable=1",
+            uri=True, check_same_thread=False, factory=TimedConnection
+        )
+        conn.execute(f"PRAGMA mmap_size = {REPLICA_MMAP_SIZE}")
+    else:
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, factory=TimedConnection)
     conn.row_factory = sqlite3.Row
+    record("acquire", time.perf_counter() - start)
     return conn
 
 @contextmanager
-def get_db():
-    """Context manager para conexión a BD"""
-    conn = get_connection()
+def get_db(primary=False):
+    """Context manager para conexión a BD (primary=True para escribir)"""
+    conn = get_connection(primary)
     try:
         yield conn
     finally:
         conn.close()
 
+def estado_pendiente(estado):
+    """1 si un estado de RQ/OC es pendiente (PENDIENTE, PEND. APROBACION...), si no 0"""
+    return 1 if isinstance(estado, str) and "PEND" in estado.upper() else 0
+
+
+def _add_pending_flags(cursor):
+    """Agregar req_pendiente/oc_pendiente a BD creadas antes de existir las columnas"""
+    cursor.execute("PRAGMA table_info(traza_req_oc)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if "req_pendiente" in columns:
+        return
+    cursor.execute("ALTER TABLE traza_req_oc ADD COLUMN req_pendiente INTEGER DEFAULT 0")
+    cursor.execute("ALTER TABLE traza_req_oc ADD COLUMN oc_pendiente INTEGER DEFAULT 0")
+    cursor.execute('''
+        UPDATE traza_req_oc SET
+            req_pendiente = COALESCE(req_estado LIKE '%PEND%', 0),
+            oc_pendiente = COALESCE(oc_estado LIKE '%PEND%', 0)
+    ''')
+    print("🔧 traza_req_oc: columnas req_pendiente/oc_pendiente agregadas")
+
+
+# Tablas de almacenes con mes en texto: cada fila lleva el año de su libro
+# (anio) y periodo 'YYYY-MM', que es la clave de partición por la que filtran
+# las fechas (índice idx_{tabla}_periodo)
+PARTITIONED_TABLES = ["indicadores", "fiscal_ru", "brigadas", "errores", "programados_ejecutados", "gestion"]
+# Año de los datos importados antes de existir anio/periodo (todo venía de INDICADORES 2025.xlsx)
+LEGACY_YEAR = 2025
+
+
+def _add_partitions(cursor):
+    """Agregar anio/periodo a BD creadas antes de existir las columnas y crear los índices de periodo"""
+    numero_mes = " ".join(f"WHEN '{mes}' THEN {i + 1}" for i, mes in enumerate(MESES))
+    agregadas = []
+    for table in PARTITIONED_TABLES:
+        cursor.execute(f"PRAGMA table_info({table})")
+        if "periodo" not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN anio INTEGER")
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN periodo TEXT")
+            cursor.execute(f'''
+                UPDATE {table} SET anio = ?, periodo = (
+                    SELECT printf('%04d-%02d', ?, n) FROM (SELECT CASE UPPER(TRIM(mes)) {numero_mes} END AS n) WHERE n IS NOT NULL
+                )
+            ''', (LEGACY_YEAR, LEGACY_YEAR))
+            agregadas.append(table)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_periodo ON {table}(periodo)")
+    if agregadas:
+        # Los resúmenes de estas tablas guardaban el nombre del mes: se borran y el planificador
+        # responde desde la tabla base hasta la próxima importación
+        from .rollups import ROLLUPS
+        for name, (table, _) in ROLLUPS.items():
+            if table in agregadas:
+                cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        print(f"🔧 Columnas anio/periodo agregadas ({LEGACY_YEAR}): {', '.join(agregadas)}")
+
+
 def init_db():
     """Inicializar tablas de la base de datos"""
-    with get_db() as conn:
+    with get_db(primary=True) as conn:
         cursor = conn.cursor()
         
         # Tabla para Costos Mensuales
@@ -118,6 +198,8 @@ def init_db():
                 dias_entrada_almacen REAL,
                 mes REAL,
                 suma_rq INTEGER,
+                req_pendiente INTEGER DEFAULT 0,
+                oc_pendiente INTEGER DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
@@ -204,6 +286,8 @@ def init_db():
             CREATE TABLE IF NOT EXISTS indicadores (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 mes TEXT,
+                anio INTEGER,
+                periodo TEXT,
                 sede TEXT,
                 responsable TEXT,
                 codigo INTEGER,
@@ -236,6 +320,10 @@ def init_db():
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_traza_oc_fecha ON traza_req_oc(oc_fecha)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_traza_req_estado ON traza_req_oc(req_estado)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_traza_oc_estado ON traza_req_oc(oc_estado)')
+        _add_pending_flags(cursor)
+        # Índices parciales: solo las filas pendientes, por aprobador
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traza_req_pendiente ON traza_req_oc(req_usuario_autorizador) WHERE req_pendiente = 1')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traza_oc_pendiente ON traza_req_oc(oc_usuario_autorizacion) WHERE oc_pendiente = 1')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_oc_desc_fecha ON oc_descuentos(fecha)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_oc_desc_proceso ON oc_descuentos(proceso)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_oc_desc_tercero ON oc_descuentos(tercero_nombre)')
@@ -252,6 +340,8 @@ def init_db():
             CREATE TABLE IF NOT EXISTS fiscal_ru (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 mes TEXT,
+                anio INTEGER,
+                periodo TEXT,
                 item TEXT,
                 descripcion TEXT,
                 bodega TEXT,
@@ -281,6 +371,8 @@ def init_db():
             CREATE TABLE IF NOT EXISTS brigadas (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 mes TEXT,
+                anio INTEGER,
+                periodo TEXT,
                 sede TEXT,
                 item_codigo INTEGER,
                 descripcion TEXT,
@@ -307,6 +399,8 @@ def init_db():
             CREATE TABLE IF NOT EXISTS errores (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 mes TEXT,
+                anio INTEGER,
+                periodo TEXT,
                 sede TEXT,
                 error TEXT,
                 bodega TEXT,
@@ -335,6 +429,8 @@ def init_db():
             CREATE TABLE IF NOT EXISTS programados_ejecutados (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 mes TEXT,
+                anio INTEGER,
+                periodo TEXT,
                 sede TEXT,
                 tipo_inventario TEXT,
                 programados REAL,
@@ -352,6 +448,8 @@ def init_db():
             CREATE TABLE IF NOT EXISTS gestion (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 mes TEXT,
+                anio INTEGER,
+                periodo TEXT,
                 sede TEXT,
                 tipo_inventario TEXT,
                 almacenista TEXT,
@@ -372,13 +470,213 @@ def init_db():
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_gestion_tipo ON gestion(tipo_inventario)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_gestion_responsable ON gestion(responsable)')
         
+        # ========== TABLAS DERIVADAS (se reconstruyen al importar, ver derived.py) ==========
+        
+        # Ciclo de vida: una fila por requisición/OC (lifecycle.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS traza_documentos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                req_numero INTEGER,
+                oc_numero INTEGER,
+                req_fecha TEXT,
+                oc_fecha TEXT,
+                req_estado TEXT,
+                oc_estado TEXT,
+                oc_tercero_nombre TEXT,
+                proceso TEXT,
+                items INTEGER,
+                dias_aprobar_rq REAL,
+                dias_generar_oc REAL,
+                dias_aprobacion_oc REAL,
+                dias_recepcion_servicio REAL,
+                dias_entrada_almacen REAL,
+                etapa_actual TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traza_doc_fecha ON traza_documentos(req_fecha)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traza_doc_etapa ON traza_documentos(etapa_actual)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traza_doc_tercero ON traza_documentos(oc_tercero_nombre)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_traza_doc_proceso ON traza_documentos(proceso)')
+        
+        # Sketches HyperLogLog por tabla, columna, mes y valor de dimensión (hll.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hll_sketches (
+                tabla TEXT NOT NULL,
+                columna TEXT NOT NULL,
+                dimension TEXT NOT NULL,
+                valor TEXT NOT NULL,
+                mes TEXT NOT NULL,
+                registros BLOB NOT NULL,
+                PRIMARY KEY (tabla, columna, dimension, valor, mes)
+            )
+        ''')
+        
+        # Cubo de conteos por mes y dimensiones para las facetas de filtros (facets.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS facet_counts (
+                fuente TEXT NOT NULL,
+                mes TEXT NOT NULL,
+                d1 TEXT,
+                d2 TEXT,
+                d3 TEXT,
+                conteo INTEGER NOT NULL,
+                fecha_min TEXT,
+                fecha_max TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_facet_counts_fuente ON facet_counts(fuente, mes)')
+
+        # Terceros de las 3 tablas de compras con índices de texto completo (search.py):
+        # terceros_fts por palabras (prefijos, sin tildes) y terceros_trigram para coincidencia aproximada
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS terceros (
+                id INTEGER PRIMARY KEY,
+                nombre TEXT NOT NULL UNIQUE,
+                nombre_norm TEXT NOT NULL,
+                registros INTEGER NOT NULL DEFAULT 0,
+                fuentes TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS terceros_fts USING fts5(
+                nombre, content='terceros', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+            )
+        ''')
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS terceros_trigram USING fts5(
+                nombre_norm, content='terceros', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS terceros_trigram_vocab USING fts5vocab(terceros_trigram, row)")
+
+        # Scorecard de proveedores por fuente, mes y tercero; mes = 'TOTAL' acumula todos los meses (scorecard.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS proveedor_scorecard (
+                fuente TEXT NOT NULL,
+                mes TEXT NOT NULL,
+                tercero_nombre TEXT,
+                tercero_id TEXT,
+                ocs INTEGER,
+                items INTEGER,
+                cantidad REAL,
+                gasto REAL,
+                descuento REAL,
+                pct_descuento_suma REAL,
+                pct_descuento_n INTEGER,
+                dias_entrega_suma REAL,
+                dias_entrega_n INTEGER,
+                dias_entrega_min REAL,
+                dias_entrega_max REAL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scorecard_gasto ON proveedor_scorecard(fuente, mes, gasto DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scorecard_descuento ON proveedor_scorecard(fuente, mes, descuento DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scorecard_tercero ON proveedor_scorecard(tercero_id)')
+
+        # Descripciones y códigos de ítem de todos los módulos (search.py)
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS busqueda_fts USING fts5(
+                descripcion, codigo, tabla UNINDEXED, registros UNINDEXED,
+                fecha_min UNINDEXED, fecha_max UNINDEXED, meses UNINDEXED,
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+
+        _add_partitions(cursor)
+
+        # Generación de datos de cada tabla base: aumenta en cada importación
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS data_generations (
+                tabla TEXT PRIMARY KEY,
+                generacion INTEGER NOT NULL DEFAULT 0,
+                actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         conn.commit()
         print("✅ Base de datos inicializada correctamente")
 
 def clear_table(table_name: str):
     """Limpiar una tabla antes de reimportar"""
-    with get_db() as conn:
+    with get_db(primary=True) as conn:
         cursor = conn.cursor()
         cursor.execute(f'DELETE FROM {table_name}')
         conn.commit()
         print(f"🗑️ Tabla {table_name} limpiada")
+
+
+def clear_years(table_name: str, anios):
+    """Borrar solo las particiones (años) que se van a reimportar; los demás años se conservan"""
+    anios = sorted(set(anios))
+    with get_db(primary=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DELETE FROM {table_name} WHERE anio IN ({','.join('?' * len(anios))})", anios)
+        conn.commit()
+        print(f"🗑️ Tabla {table_name}: años {', '.join(map(str, anios))} limpiados")
+
+
+def bump_generations(conn, tables):
+    """Aumentar la generación de datos de las tablas importadas"""
+    cursor = conn.cursor()
+    for table in tables:
+        cursor.execute('''
+            INSERT INTO data_generations (tabla, generacion, actualizado) VALUES (?, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT(tabla) DO UPDATE SET generacion = generacion + 1, actualizado = CURRENT_TIMESTAMP
+        ''', (table,))
+    conn.commit()
+
+
+def get_generations(conn, tables=None):
+    """Generación actual por tabla ({tabla: generacion})"""
+    cursor = conn.cursor()
+    if tables:
+        cursor.execute(
+            f"SELECT tabla, generacion FROM data_generations WHERE tabla IN ({','.join('?' for _ in tables)})",
+            list(tables)
+        )
+    else:
+        cursor.execute("SELECT tabla, generacion FROM data_generations")
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def drop_indexes(table_name: str):
+    """Eliminar los índices de una tabla antes de una carga masiva.
+
+    Devuelve el SQL de cada índice para recrearlos con create_indexes().
+    """
+    with get_db(primary=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table_name,)
+        )
+        indexes = cursor.fetchall()
+        for index in indexes:
+            cursor.execute(f'DROP INDEX IF EXISTS {index["name"]}')
+        conn.commit()
+        return [index["sql"] for index in indexes]
+
+
+def create_indexes(index_sqls):
+    """Recrear índices eliminados con drop_indexes()"""
+    with get_db(primary=True) as conn:
+        cursor = conn.cursor()
+        for sql in index_sqls:
+            cursor.execute(sql)
+        conn.commit()
+
+
+@contextmanager
+def indexes_dropped(table_name: str):
+    """Carga masiva sin los índices de la tabla (etapa "index" de import_profile al recrearlos).
+
+    Los índices se recrean al salir aunque la carga falle: sin ellos cada
+    consulta a la tabla la recorre completa hasta la próxima importación.
+    """
+    index_sqls = drop_indexes(table_name)
+    try:
+        yield
+    finally:
+        with stage(table_name, "index"):
+            create_indexes(index_sqls)
@@ -0,0 +1,81 @@
+"""
+Datos derivados que se reconstruyen después de importar.
+
+Cada constructor recibe una conexión y reconstruye sus tablas a partir de las
+tablas base de las que depende. refresh() corre solo los constructores cuyas
+tablas base cambiaron y luego aumenta la generación de datos de esas tablas
+(data_generations); lo llaman import_data.py y synthetic_data.py. Antes, si
+cambió alguna tabla de almacenes, archive.freeze() saca de la base caliente
+los periodos cerrados (las tablas que pierden filas cuentan como cambiadas) y
+archive.include() adjunta el archivo, así los constructores leen la historia
+completa y no solo la base caliente. Los
+publicadores (PUBLISHERS) corren después del aumento porque sus archivos se
+nombran con la generación nueva. Al final se publica la réplica de lectura
+(replica.publish), así la API ve de una vez las tablas base, los derivados y
+las generaciones nuevas.
+"""
+from functools import partial
+
+from .config import READ_REPLICA
+from .database import get_db, bump_generations
+from .import_profile import stage
+from . import archive, facets, hll, lifecycle, replica, rollups, scorecard, search, snapshots
+
+# (tablas base, nombre, constructor)
+BUILDERS = [
+    (("traza_req_oc", "oc_descuentos"), "traza_documentos", lifecycle.rebuild_documentos),
+    (tuple(t for t, _, _ in search.TERCEROS_SOURCES), "terceros", search.rebuild_terceros),
+] + [
+    ((table,), f"hll_sketches[{table}]", partial(hll.rebuild, table=table))
+    for table in hll.SKETCHES
+] + [
+    ((table,), f"facet_counts[{fuente}]", partial(facets.rebuild, fuente=fuente))
+    for fuente, (table, _, _) in facets.FACETS.items()
+] + [
+    ((table,), f"proveedor_scorecard[{fuente}]", partial(scorecard.rebuild, fuente=fuente))
+    for fuente, (table, _) in scorecard.SOURCES.items()
+] + [
+    ((table,), f"busqueda_fts[{table}]", partial(search.rebuild_items, table=table))
+    for table in search.ITEM_SOURCES
+] + [
+    ((table,), name, partial(rollups.rebuild, name=name))
+    for name, (table, _) in rollups.ROLLUPS.items()
+]
+
+# (tabla base, nombre, publicador)
+PUBLISHERS = [
+    (table, f"snapshot[{dataset}]", partial(snapshots.publish, dataset=dataset))
+    for dataset, (table, _, _) in snapshots.DATASETS.items()
+]
+
+
+def refresh(tables):
+    """Reconstruir los datos derivados de las tablas base indicadas"""
+    changed = set(tables)
+    counts = {}
+    with get_db(primary=True) as conn:
+        if changed & set(archive.TABLES):
+            with stage("archivo", "derive") as s:
+                movidas = archive.freeze(conn)
+                s["rows"] = sum(movidas.values())
+            changed |= set(movidas)
+            # Los derivados (búsqueda, rollups) cubren también los periodos archivados
+            for table in sorted(changed & set(archive.TABLES)):
+                archive.include(conn, table)
+        for sources, name, builder in BUILDERS:
+            if changed & set(sources):
+                with stage(name, "derive") as s:
+                    counts[name] = builder(conn)
+                    s["rows"] = counts[name]
+                print(f"🔁 {name}: {counts[name]:,} registros derivados")
+        # VACUUM INTO (réplica) resolvería los índices de las tablas contra las vistas TEMP
+        archive.release(conn)
+        bump_generations(conn, sorted(changed))
+        for table, name, publisher in PUBLISHERS:
+            if table in changed:
+                with stage(name, "derive"):
+                    publisher(conn)
+        if READ_REPLICA:
+            with stage("replica", "derive"):
+                replica.publish(conn)
+    return counts
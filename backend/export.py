@@ -0,0 +1,107 @@
+"""
+Exportación masiva en Apache Arrow (IPC stream) y Parquet.
+
+stream() lee la consulta con fetchmany() en bloques de CHUNK_ROWS filas y
+escribe cada bloque como un record batch (Arrow) o un row group (Parquet),
+ambos comprimidos con zstd, entregando los bytes apenas se escriben: la
+memoria queda acotada al bloque aunque la tabla tenga cientos de miles de
+filas. El esquema sale de los tipos
+declarados en la tabla (PRAGMA table_info); las fechas quedan como texto
+'YYYY-MM-DD', igual que en /datos.
+
+pyarrow es opcional: sin él, AVAILABLE es False y las rutas responden 501.
+"""
+from . import archive
+from .database import get_db
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+AVAILABLE = pa is not None
+
+CHUNK_ROWS = 50000
+
+FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _arrow_type(declarado):
+    declarado = (declarado or "").upper()
+    if "INT" in declarado:
+        return pa.int64()
+    if any(t in declarado for t in ("REAL", "FLOA", "DOUB", "NUM")):
+        return pa.float64()
+    return pa.string()
+
+
+def _coerce(values, tipo):
+    """SQLite no impone tipos: lo que no calza con la columna se exporta como nulo"""
+    if tipo == pa.int64():
+        return [v if isinstance(v, int) else int(v) if isinstance(v, float) and v.is_integer() else None for v in values]
+    if tipo == pa.float64():
+        return [float(v) if isinstance(v, (int, float)) else None for v in values]
+    return [v if v is None or isinstance(v, str) else str(v) for v in values]
+
+
+def schema(conn, table):
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA main.table_info({table})")
+    return pa.schema([(row[1], _arrow_type(row[2])) for row in cursor.fetchall()])
+
+
+class _Buffer:
+    """Destino de escritura que acumula los bytes hasta que stream() los entrega"""
+
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def stream(table, where_clause, params, formato, chunk_rows=CHUNK_ROWS, fecha_inicio=None, fecha_fin=None):
+    """Generador de bytes con la tabla filtrada en formato arrow o parquet"""
+    with get_db() as conn:
+        # Tablas de almacenes: adjuntar los periodos archivados que toca el rango
+        archive.include(conn, table, fecha_inicio, fecha_fin)
+        esquema = schema(conn, table)
+        buffer = _Buffer()
+        sink = pa.PythonFile(buffer, mode="w")
+        if formato == "arrow":
+            writer = pa.ipc.new_stream(sink, esquema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+            write = writer.write_batch
+        else:
+            writer = pq.ParquetWriter(sink, esquema, compression="zstd")
+            write = lambda batch: writer.write_table(pa.Table.from_batches([batch]))
+
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(esquema.names)} FROM {table} {where_clause}", params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            columnas = zip(*rows)
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(_coerce(list(valores), campo.type), type=campo.type)
+                 for valores, campo in zip(columnas, esquema)],
+                schema=esquema
+            )
+            write(batch)
+            yield buffer.take()
+        writer.close()
+        yield buffer.take()
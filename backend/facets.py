@@ -0,0 +1,124 @@
+"""
+Facetas de filtros con conteos.
+
+Por cada fuente se precalcula en facet_counts el conteo de filas por mes y
+combinación de dimensiones (un cubo pequeño). compute() lee el cubo de la
+fuente en una sola consulta y devuelve, para cada dimensión, sus valores con
+el conteo bajo los demás filtros aplicados (la dimensión no se filtra a sí
+misma, para que se puedan seguir agregando valores). Las fechas se aplican a
+nivel de mes. Los resultados se guardan en caché por generación de datos.
+"""
+from collections import OrderedDict
+
+from .database import get_generations
+from . import tables
+
+# fuente -> (tabla, columna fecha, {parámetro de filtro: columna})
+FACETS = {
+    "compras-traza": ("traza_req_oc", "req_fecha", {
+        "estados_req": "req_estado", "estados_oc": "oc_estado", "terceros": "oc_tercero_nombre",
+    }),
+    "compras-descuentos": ("oc_descuentos", "fecha", {
+        "terceros": "tercero_nombre", "estados": "estado",
+    }),
+    "compras-base": ("base_oc_generadas", "fecha", {
+        "terceros": "tercero_nombre", "tipos": "documento_tipo", "estados": "estado",
+    }),
+    "operatividad": ("operatividad_vehiculos", "fecha_ejecucion", {
+        "sedes": "sede", "estados": "estado_vehiculo", "placas": "placa",
+    }),
+    "costos": ("costos_mensuales", "fecha", {
+        "catalogos": "catalogo", "ciudades": "ciudad", "terceros": "tercero",
+    }),
+}
+
+CACHE_SIZE = 256
+_cache = OrderedDict()
+
+
+def rebuild(conn, fuente):
+    """Reconstruir el cubo de conteos de una fuente"""
+    table, fecha_col, dims = FACETS[fuente]
+    columns = list(dims.values())
+    d_cols = [f"d{i + 1}" for i in range(len(columns))]
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM facet_counts WHERE fuente = ?", (fuente,))
+    cursor.execute(f'''
+        INSERT INTO facet_counts (fuente, mes, {', '.join(d_cols)}, conteo, fecha_min, fecha_max)
+        SELECT ?, COALESCE(substr({fecha_col}, 1, 7), ''), {', '.join(columns)},
+            COUNT(*), MIN({fecha_col}), MAX({fecha_col})
+        FROM {table}
+        GROUP BY 2, {', '.join(str(i + 3) for i in range(len(columns)))}
+    ''', (fuente,))
+    conn.commit()
+    cursor.execute("SELECT COUNT(*) FROM facet_counts WHERE fuente = ?", (fuente,))
+    return cursor.fetchone()[0]
+
+
+def compute(conn, fuente, fecha_inicio=None, fecha_fin=None, filtros=None):
+    """Valores con conteo de cada dimensión de la fuente bajo los filtros.
+
+    filtros: {parámetro: 'a,b,c'} con los mismos nombres que el router.
+    """
+    table, _, dims = FACETS[fuente]
+    seleccion = {
+        param: set(valores)
+        for param in dims if (valores := tables.split_values((filtros or {}).get(param)))
+    }
+    generacion = get_generations(conn, [table]).get(table, 0)
+    key = (fuente, generacion, fecha_inicio, fecha_fin, tuple(sorted((p, tuple(sorted(v))) for p, v in seleccion.items())))
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    params_list = list(dims)
+    d_cols = [f"d{i + 1}" for i in range(len(params_list))]
+    where = "fuente = ?"
+    params = [fuente]
+    if fecha_inicio:
+        where += " AND mes >= ? AND mes != ''"
+        params.append(fecha_inicio[:7])
+    if fecha_fin:
+        where += " AND mes <= ? AND mes != ''"
+        params.append(fecha_fin[:7])
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(d_cols)}, conteo, fecha_min, fecha_max FROM facet_counts WHERE {where}", params)
+    rows = cursor.fetchall()
+
+    n = len(params_list)
+    conteos = {param: {} for param in params_list}
+    total = 0
+    fecha_min = fecha_max = None
+    for row in rows:
+        # Filtros que no cumple la fila (por índice de dimensión)
+        fallos = [i for i, param in enumerate(params_list) if param in seleccion and row[i] not in seleccion[param]]
+        if len(fallos) > 1:
+            continue
+        conteo = row[n]
+        if not fallos:
+            total += conteo
+            if row[n + 1] and (fecha_min is None or row[n + 1] < fecha_min):
+                fecha_min = row[n + 1]
+            if row[n + 2] and (fecha_max is None or row[n + 2] > fecha_max):
+                fecha_max = row[n + 2]
+        # Cada dimensión cuenta con todos los filtros excepto el suyo
+        for i, param in enumerate(params_list):
+            if row[i] is None or (fallos and fallos != [i]):
+                continue
+            conteos[param][row[i]] = conteos[param].get(row[i], 0) + conteo
+
+    result = {
+        "fuente": fuente,
+        "generacion": generacion,
+        "total": total,
+        "fecha_min": fecha_min,
+        "fecha_max": fecha_max,
+        "facetas": {
+            param: [{"valor": v, "conteo": c} for v, c in sorted(valores.items(), key=lambda kv: str(kv[0]))]
+            for param, valores in conteos.items()
+        },
+    }
+    _cache[key] = result
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return result
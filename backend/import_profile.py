@@ -0,0 +1,109 @@
+"""
+Instrumentación del importador por etapas.
+
+Cada hoja se importa en etapas (read, transform, write, index). Con el modo
+instrumentado activo, stage() registra tiempo real, tiempo de CPU, filas/s y
+memoria pico de cada etapa; desactivado no agrega costo.
+
+Uso desde import_data.py:
+    with stage("costos_mensuales", "read") as s:
+        df = pd.read_excel(...)
+        s["rows"] = len(df)
+"""
+import json
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+STAGES = ["read", "transform", "write", "index"]
+
+_enabled = False
+_records = []
+
+
+def enable():
+    """Activar el registro de etapas (reinicia registros previos)"""
+    global _enabled
+    _enabled = True
+    _records.clear()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+@contextmanager
+def stage(table, name):
+    """Medir una etapa de la importación de una tabla"""
+    info = {"rows": None}
+    if not _enabled:
+        yield info
+        return
+
+    tracemalloc.reset_peak()
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    try:
+        yield info
+    finally:
+        wall = time.perf_counter() - start_wall
+        cpu = time.process_time() - start_cpu
+        _, peak = tracemalloc.get_traced_memory()
+        rows = info["rows"]
+        _records.append({
+            "table": table,
+            "stage": name,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "rows": rows,
+            "rows_per_s": round(rows / wall, 1) if rows and wall else None,
+            "peak_mem_mb": round(peak / (1024 * 1024), 2),
+        })
+
+
+def records():
+    return list(_records)
+
+
+def summary():
+    """Totales por tabla y por etapa"""
+    tables = {}
+    for r in _records:
+        t = tables.setdefault(r["table"], {"wall_s": 0.0, "cpu_s": 0.0, "rows": 0, "peak_mem_mb": 0.0, "stages": {}})
+        t["wall_s"] = round(t["wall_s"] + r["wall_s"], 4)
+        t["cpu_s"] = round(t["cpu_s"] + r["cpu_s"], 4)
+        t["rows"] = max(t["rows"], r["rows"] or 0)
+        t["peak_mem_mb"] = max(t["peak_mem_mb"], r["peak_mem_mb"])
+        t["stages"][r["stage"]] = r
+    return tables
+
+
+def print_report():
+    print(f"{'Tabla':26} {'Etapa':10} {'Real (s)':>9} {'CPU (s)':>9} {'Filas':>9} {'Filas/s':>10} {'Mem (MB)':>9}")
+    for r in _records:
+        rows = r["rows"] if r["rows"] is not None else "-"
+        rate = r["rows_per_s"] if r["rows_per_s"] is not None else "-"
+        print(f"{r['table']:26} {r['stage']:10} {r['wall_s']:9.3f} {r['cpu_s']:9.3f} {rows:>9} {rate:>10} {r['peak_mem_mb']:9.2f}")
+
+
+def write_report(path, extra=None):
+    """Guardar el reporte en JSON"""
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            **(extra or {}),
+        },
+        "stages": records(),
+        "tables": summary(),
+    }
+    Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return report
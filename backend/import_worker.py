@@ -0,0 +1,241 @@
+"""
+Importador en segundo plano.
+
+Vigila los Excel de EXCEL_FILES dentro de DATA_DIR (revisando mtime y tamaño
+cada POLL_SECONDS, sin dependencias extra) o recibe avisos por webhook. Los
+libros anuales de almacenes se vuelven a buscar en cada vuelta, así un
+INDICADORES 2026.xlsx nuevo se detecta solo. Un archivo se encola cuando
+deja de cambiar durante IMPORT_DEBOUNCE_SECONDS, así
+una ráfaga de copias (Power Automate sube varios archivos, o uno por partes)
+produce una sola importación. La cola se atiende en un hilo: corre solo los
+importadores cuyo archivo cambió (varios avisos pendientes se juntan en una
+corrida) y guarda el historial con la duración de cada importador.
+
+Al arrancar se encolan los archivos modificados después de la última
+importación de sus tablas (data_generations).
+
+Con varios procesos (uvicorn --workers N) cada uno tiene su ImportWorker:
+solo el que toma el lock {base}.watcher.lock vigila los archivos, y cada
+corrida toma {base}.import.lock, así una importación pedida por webhook a
+otro proceso espera a la que está en curso en vez de correr a la vez sobre
+la misma base. Sin fcntl (Windows) no hay locks: se asume un solo proceso.
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from . import database
+from .config import EXCEL_FILES, IMPORT_DEBOUNCE_SECONDS, workbooks
+from .database import get_db
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+POLL_SECONDS = 2
+HISTORY_SIZE = 50
+
+
+def _signature(path):
+    """(mtime, tamaño) del archivo, o None si no existe"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _lock_file(nombre, esperar=True):
+    """Archivo {base}.{nombre}.lock con lock exclusivo (se libera al cerrarlo);
+    None si no espera y otro proceso lo tiene"""
+    path = database.DB_PATH.with_name(f"{database.DB_PATH.stem}.{nombre}.lock")
+    archivo = open(path, "a")
+    if fcntl is not None:
+        try:
+            fcntl.flock(archivo, fcntl.LOCK_EX | (0 if esperar else fcntl.LOCK_NB))
+        except BlockingIOError:
+            archivo.close()
+            return None
+    return archivo
+
+
+def _files():
+    """archivo -> claves de importador que lo leen (un libro puede alimentar varias hojas);
+    una entrada anual sin libros queda vigilada por su nombre con {anio}"""
+    files = {}
+    for key, config in EXCEL_FILES.items():
+        for _, path in workbooks(key) or [(None, config["path"])]:
+            files.setdefault(path, []).append(key)
+    return files
+
+
+class ImportWorker:
+    def __init__(self, debounce=IMPORT_DEBOUNCE_SECONDS, poll=POLL_SECONDS):
+        self.debounce = debounce
+        self.poll = poll
+        self.files = _files()
+        self._seen = {}
+        self._changed = {}
+        self._pending = {}
+        self._running = None
+        self._history = deque(maxlen=HISTORY_SIZE)
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._runner = None
+        self._leader = None
+
+    # ---------- ciclo de vida ----------
+    def start(self, watch=True):
+        """Arrancar el hilo de importación y, si watch, el de vigilancia de archivos"""
+        self._stop.clear()
+        self._ensure_runner()
+        if watch and (self._watcher is None or not self._watcher.is_alive()):
+            self._leader = self._leader or _lock_file("watcher", esperar=False)
+            if self._leader is None:
+                print("👀 Otro proceso ya vigila los archivos Excel")
+                return
+            self._seen = {path: _signature(path) for path in self.files}
+            self._enqueue_stale()
+            self._watcher = threading.Thread(target=self._watch, name="import-watcher", daemon=True)
+            self._watcher.start()
+            print(f"👀 Vigilando {len(self.files)} archivos Excel (espera {self.debounce:g} s)")
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            self._lock.notify_all()
+        if self._leader is not None:
+            self._leader.close()
+            self._leader = None
+
+    def _ensure_runner(self):
+        if self._runner is None or not self._runner.is_alive():
+            self._runner = threading.Thread(target=self._run, name="import-runner", daemon=True)
+            self._runner.start()
+
+    # ---------- cola ----------
+    def trigger(self, keys=None, archivos=None, origen="webhook"):
+        """Encolar importadores por clave o por nombre de archivo (todos si no se indica nada)"""
+        seleccion = set(keys or [])
+        for nombre in archivos or []:
+            seleccion.update(k for path, ks in self.files.items() if path.name == nombre for k in ks)
+        if not keys and not archivos:
+            seleccion = set(EXCEL_FILES)
+        desconocidas = seleccion - set(EXCEL_FILES)
+        if desconocidas:
+            raise ValueError(f"Importadores desconocidos: {', '.join(sorted(desconocidas))}")
+        self._enqueue(seleccion, origen)
+        self._ensure_runner()
+        return sorted(seleccion)
+
+    def _enqueue(self, keys, origen):
+        if not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._pending.setdefault(key, origen)
+            self._lock.notify_all()
+        print(f"📥 Importación encolada ({origen}): {', '.join(sorted(keys))}")
+
+    def _enqueue_stale(self):
+        """Encolar los archivos más nuevos que la última importación de sus tablas"""
+        from .import_data import IMPORTERS
+        with get_db(primary=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT tabla, actualizado FROM data_generations")
+            actualizado = {
+                tabla: datetime.strptime(fecha, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+                for tabla, fecha in cursor.fetchall() if fecha
+            }
+        stale = set()
+        for key, _, _, tablas in IMPORTERS:
+            signatures = [s for _, path in workbooks(key) if (s := _signature(path))]
+            ultima = min((actualizado.get(t, 0) for t in tablas), default=0)
+            if signatures and max(s[0] for s in signatures) / 1e9 > ultima:
+                stale.add(key)
+        self._enqueue(stale, "arranque")
+
+    # ---------- hilos ----------
+    def _watch(self):
+        while not self._stop.wait(self.poll):
+            now = time.monotonic()
+            self.files = _files()
+            for path in self.files:
+                signature = _signature(path)
+                if signature != self._seen.get(path):
+                    self._seen[path] = signature
+                    if signature is not None:
+                        # Cada cambio reinicia la espera del archivo
+                        self._changed[path] = now
+            for path, changed in list(self._changed.items()):
+                if now - changed >= self.debounce:
+                    del self._changed[path]
+                    self._enqueue(self.files.get(path, []), f"archivo {path.name}")
+
+    def _run(self):
+        from .import_data import run_importers
+        while not self._stop.is_set():
+            with self._lock:
+                while not self._pending and not self._stop.is_set():
+                    self._lock.wait()
+                if self._stop.is_set():
+                    return
+                pendientes, self._pending = self._pending, {}
+                self._running = {"claves": sorted(pendientes), "inicio": _now()}
+            start = time.perf_counter()
+            # Una sola importación a la vez entre todos los procesos
+            cerrojo = _lock_file("import")
+            try:
+                results = run_importers(set(pendientes))
+                error = None
+            except Exception as e:
+                results, error = [], str(e)
+                print(f"❌ Error en la importación en segundo plano: {e}")
+            finally:
+                cerrojo.close()
+            with self._lock:
+                self._history.appendleft({
+                    **self._running,
+                    "fin": _now(),
+                    "segundos": round(time.perf_counter() - start, 3),
+                    "origen": sorted(set(pendientes.values())),
+                    "importadores": results,
+                    "error": error,
+                })
+                self._running = None
+
+    # ---------- estado ----------
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "vigilando": self._watcher is not None and self._watcher.is_alive(),
+                # False con el worker arrancado: otro proceso tiene el lock de vigilancia
+                "lider": self._leader is not None,
+                "activo": self._runner is not None and self._runner.is_alive(),
+                "espera_segundos": self.debounce,
+                "en_espera": {
+                    path.name: round(max(self.debounce - (now - changed), 0), 1)
+                    for path, changed in self._changed.items()
+                },
+                "pendientes": sorted(self._pending),
+                "en_curso": self._running,
+                "historial": list(self._history),
+                "archivos": {
+                    path.name: {
+                        "importadores": keys,
+                        "existe": self._seen.get(path, _signature(path)) is not None,
+                    }
+                    for path, keys in self.files.items()
+                },
+            }
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+worker = ImportWorker()
@@ -0,0 +1,90 @@
+"""
+Ciclo de vida requisición → OC → recepción → entrada a almacén.
+
+traza_req_oc tiene una fila por ítem. rebuild_documentos() la colapsa en
+traza_documentos (una fila por par requisición/OC) con la duración de cada
+etapa y la etapa en la que está detenido el documento. Las consultas de
+percentiles y embudo leen solo esa tabla compacta.
+"""
+import math
+
+# Etapas con duración: (clave, nombre, columna en traza_documentos)
+STAGES = [
+    ("aprobar_rq", "Aprobar RQ", "dias_aprobar_rq"),
+    ("generar_oc", "Generar OC", "dias_generar_oc"),
+    ("aprobacion_oc", "Aprobación OC", "dias_aprobacion_oc"),
+    ("recepcion_servicio", "Recepción Servicio", "dias_recepcion_servicio"),
+    ("entrada_almacen", "Entrada Almacén", "dias_entrada_almacen"),
+]
+
+# Etapa actual de cada documento, en orden del embudo
+ETAPAS_ACTUALES = [
+    ("RQ_POR_APROBAR", "RQ por aprobar"),
+    ("OC_POR_GENERAR", "OC por generar"),
+    ("OC_POR_APROBAR", "OC por aprobar"),
+    ("POR_RECIBIR", "Por recibir"),
+    ("POR_INGRESAR_ALMACEN", "Por ingresar a almacén"),
+    ("COMPLETADO", "Completado"),
+    ("ANULADO", "Anulado"),
+]
+
+PERCENTILES = [50, 90, 99]
+
+
+def rebuild_documentos(conn):
+    """Reconstruir traza_documentos a partir de traza_req_oc"""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM traza_documentos")
+    # Duración de una etapa del documento = la del ítem más lento (MAX), solo si todos
+    # los ítems la alcanzaron: con algún NULL (etapa no alcanzada) queda NULL
+    etapas = ",\n                ".join(
+        f"CASE WHEN COUNT({col}) = COUNT(*) THEN MAX({col}) END AS {col}" for _, _, col in STAGES
+    )
+    cursor.execute(f'''
+        INSERT INTO traza_documentos
+        (req_numero, oc_numero, req_fecha, oc_fecha, req_estado, oc_estado,
+         oc_tercero_nombre, proceso, items,
+         dias_aprobar_rq, dias_generar_oc, dias_aprobacion_oc,
+         dias_recepcion_servicio, dias_entrada_almacen, etapa_actual)
+        SELECT d.req_numero, d.oc_numero, d.req_fecha, d.oc_fecha, d.req_estado, d.oc_estado,
+            d.oc_tercero_nombre, p.proceso, d.items,
+            d.dias_aprobar_rq, d.dias_generar_oc, d.dias_aprobacion_oc,
+            d.dias_recepcion_servicio, d.dias_entrada_almacen,
+            CASE
+                WHEN d.req_estado LIKE '%ANULAD%' OR d.oc_estado LIKE '%ANULAD%' THEN 'ANULADO'
+                WHEN d.req_pendiente = 1 OR d.req_fecha_autorizada IS NULL THEN 'RQ_POR_APROBAR'
+                WHEN d.oc_numero IS NULL THEN 'OC_POR_GENERAR'
+                WHEN d.oc_pendiente = 1 OR d.oc_fecha_autorizacion IS NULL THEN 'OC_POR_APROBAR'
+                WHEN d.dias_recepcion_servicio IS NULL THEN 'POR_RECIBIR'
+                WHEN d.dias_entrada_almacen IS NULL THEN 'POR_INGRESAR_ALMACEN'
+                ELSE 'COMPLETADO'
+            END
+        FROM (
+            SELECT req_numero, oc_numero, MIN(req_fecha) AS req_fecha, MIN(oc_fecha) AS oc_fecha,
+                MAX(req_estado) AS req_estado, MAX(oc_estado) AS oc_estado,
+                MAX(oc_tercero_nombre) AS oc_tercero_nombre, COUNT(*) AS items,
+                {etapas},
+                MAX(req_pendiente) AS req_pendiente, MAX(oc_pendiente) AS oc_pendiente,
+                MAX(req_fecha_autorizada) AS req_fecha_autorizada,
+                MAX(oc_fecha_autorizacion) AS oc_fecha_autorizacion
+            FROM traza_req_oc
+            WHERE req_numero IS NOT NULL
+            GROUP BY req_numero, oc_numero
+        ) d
+        LEFT JOIN (
+            SELECT documento_num, MAX(proceso) AS proceso
+            FROM oc_descuentos
+            GROUP BY documento_num
+        ) p ON p.documento_num = d.oc_numero
+    ''')
+    conn.commit()
+    cursor.execute("SELECT COUNT(*) FROM traza_documentos")
+    return cursor.fetchone()[0]
+
+
+def percentile(values, pct):
+    """Percentil por rango más cercano (values ordenados)"""
+    if not values:
+        return None
+    k = max(math.ceil(pct / 100 * len(values)) - 1, 0)
+    return values[k]
@@ -0,0 +1,358 @@
+"""
+Verificación de planes de consulta de todas las rutas de la API.
+
+Construye una BD sintética a escala de producción (synthetic_data.py),
+llama cada endpoint de backend/routes/* con combinaciones representativas
+de filtros, captura el SQL ejecutado y su EXPLAIN QUERY PLAN, y falla cuando:
+- una consulta hace SCAN completo de una tabla grande que la línea base
+  (query_plan_baseline.json) no tiene registrado para esa ruta y esa
+  sentencia, o
+- una consulta supera el presupuesto de latencia.
+
+Uso:
+    python -m backend.query_plan_check                      # verificar
+    python -m backend.query_plan_check --update-baseline    # aceptar planes actuales
+    python -m backend.query_plan_check --db /tmp/sintetica.db --budget-ms 300
+"""
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from . import database, replica, synthetic_data
+from .config import READ_REPLICA, REPLICA_MMAP_SIZE
+
+BASELINE_PATH = Path(__file__).resolve().parent / "query_plan_baseline.json"
+
+# Tablas con al menos este número de filas se consideran grandes
+LARGE_TABLE_ROWS = 5000
+DEFAULT_BUDGET_MS = 500
+
+# Sentencias propias de la conexión de la petición (archivo histórico: ATTACH, vistas y
+# tablas TEMP, ver archive.include): no se repiten en la conexión de análisis, así los
+# SELECT sobre esas vistas se analizan contra la tabla de la base caliente
+SESSION_STATEMENT = re.compile(
+    r"^\s*(ATTACH|DETACH|CREATE\s+TEMP|DROP\s+\w+\s+IF\s+EXISTS\s+temp\.|INSERT\s+INTO\s+temp\.|PRAGMA\s+\w+\.)",
+    re.I
+)
+
+# Valores de ejemplo por nombre de parámetro (existen en la BD sintética)
+DATE_PARAMS = {
+    "fecha_inicio": "2025-03",
+    "fecha_fin": "2025-06",
+}
+PARAM_SAMPLES = {
+    "sedes": ",".join(synthetic_data.SEDES[:2]),
+    "ciudades": ",".join(synthetic_data.SEDES[:2]),
+    "catalogos": synthetic_data.CATALOGOS[0],
+    "terceros": "PROVEEDOR 00001 S.A.S,PROVEEDOR 00002 S.A.S",
+    "estados": "APROBADA",
+    "estado": "CUADRADO",
+    "estados_req": "APROBADA",
+    "estados_oc": "APROBADA",
+    "tipos": "OC",
+    "responsables": "ALMACENISTA 01",
+    "errores": "Si",
+    "tipo_inventario": "ROTATIVO",
+    "tipos_inventario": "ROTATIVO",
+}
+# Parámetros fijos en todas las variantes: las descargas /datos se verifican
+# con una página acotada para que la latencia mida el plan y no el JSON
+FIXED_PARAMS = {
+    "limit": "1000",
+    "q": "proveedor",
+}
+# Valores de parámetros de ruta ({fuente}...): se verifica cada uno
+PATH_SAMPLES = {
+    "fuente": ["compras-traza", "operatividad"],
+    "tercero_id": ["900000001"],
+    "dataset": ["costos_mensuales", "operatividad_vehiculos"],
+}
+# Flujos que no terminan (SSE), rutas con efectos (importar) o exportaciones que
+# leen la tabla completa a propósito: no se verifican
+SKIP_PATHS = {"/api/events", "/api/admin/import/trigger", "/api/export/{table}.{formato}"}
+FILTER_BODY = {
+    "dateStart": "2025-03-01",
+    "dateEnd": "2025-06-30",
+    "processes": synthetic_data.PROCESOS[:2],
+    "suppliers": ["PROVEEDOR 00001 S.A.S"],
+    "states": ["APROBADA"],
+}
+# Cuerpos propios de las rutas POST que no usan FILTER_BODY
+POST_BODIES = {
+    "/api/query": [
+        {"table": "costos_mensuales", "metrics": ["registros"], "dimensions": ["ciudad", "mes"],
+         "filters": DATE_PARAMS},
+        {"table": "operatividad_vehiculos", "metrics": ["sum(vehiculos_operativos)", "count_distinct(placa)"],
+         "dimensions": ["sede"], "filters": {**DATE_PARAMS, "sedes": PARAM_SAMPLES["sedes"]}, "top_n": 5},
+        {"table": "indicadores", "metrics": ["sum(costo_diferencia)"], "dimensions": ["mes"],
+         "filters": DATE_PARAMS},
+    ],
+}
+POST_BODIES["/api/query/batch"] = [{"consultas": POST_BODIES["/api/query"]}]
+
+
+class PlanCursor(sqlite3.Cursor):
+    """Cursor que registra cada sentencia ejecutada"""
+
+    def execute(self, sql, parameters=()):
+        self.connection.statements.append((sql, tuple(parameters)))
+        return super().execute(sql, parameters)
+
+
+class PlanConnection(sqlite3.Connection):
+    """Conexión cuyos cursores registran el SQL ejecutado"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements = []
+        PlanConnection.opened.append(self)
+
+    def cursor(self, factory=PlanCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+
+PlanConnection.opened = []
+
+
+def _connect(primary=False, factory=sqlite3.Connection):
+    """Abrir la base como database.get_connection(): las lecturas van a la réplica
+    inmutable (solo lectura, mmap), así los planes, los tiempos y los ATTACH del
+    archivo histórico se verifican sobre la misma conexión que usa la API"""
+    path = database.replica_path()
+    if READ_REPLICA and not primary and path.exists():
+        conn = sqlite3.connect(
+            f"{path.resolve().as_uri()}?mode=ro&immutable=1",
+            uri=True, check_same_thread=False, factory=factory
+        )
+        conn.execute(f"PRAGMA mmap_size = {REPLICA_MMAP_SIZE}")
+        return conn
+    return sqlite3.connect(str(database.DB_PATH), check_same_thread=False, factory=factory)
+
+
+def _get_plan_connection(primary=False):
+    conn = _connect(primary, factory=PlanConnection)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def iter_api_routes(routes):
+    """Recorrer las rutas /api de la app, incluyendo las de routers incluidos"""
+    for route in routes:
+        if isinstance(route, APIRoute):
+            if route.path.startswith("/api/"):
+                yield route
+        elif hasattr(route, "original_router"):
+            # FastAPI reciente conserva los routers incluidos sin aplanar
+            yield from iter_api_routes(route.original_router.routes)
+
+
+def build_cases(app):
+    """Generar las llamadas (método, ruta, query, body) para cada endpoint /api"""
+    cases = []
+    for route in iter_api_routes(app.routes):
+        if route.path in SKIP_PATHS:
+            continue
+        for path in _expand_path(route):
+            cases.extend(_route_cases(route, path))
+    return cases
+
+
+def _expand_path(route):
+    """Ruta con los parámetros de ruta reemplazados por PATH_SAMPLES"""
+    paths = [route.path]
+    for param in route.dependant.path_params:
+        paths = [p.replace(f"{{{param.name}}}", str(v)) for p in paths for v in PATH_SAMPLES.get(param.name, [])]
+    return paths
+
+
+def _route_cases(route, path):
+    """Variantes de parámetros o cuerpo para una ruta concreta"""
+    cases = []
+    for method in sorted(route.methods):
+        if method == "GET":
+            names = [p.name for p in route.dependant.query_params]
+            fijos = {k: v for k, v in FIXED_PARAMS.items() if k in names}
+            fechas = {k: v for k, v in DATE_PARAMS.items() if k in names}
+            filtros = {k: v for k, v in PARAM_SAMPLES.items() if k in names and v}
+            variantes = [fijos]
+            if fechas:
+                variantes.append({**fijos, **fechas})
+            if filtros:
+                variantes.append({**fijos, **fechas, **filtros})
+            for params in variantes:
+                cases.append((method, path, params, None))
+        elif method == "POST":
+            for body in POST_BODIES.get(route.path, ({}, FILTER_BODY)):
+                cases.append((method, path, {}, body))
+    return cases
+
+
+def _table_sizes(conn):
+    tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables}
+
+
+def _partial_indexes(conn):
+    """Índices parciales (CREATE INDEX ... WHERE): recorrerlos solo lee las filas indexadas"""
+    rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+    return {name for name, sql in rows if " WHERE " in sql.upper()}
+
+
+def _scanned_tables(conn, sql, params, large_tables, partial_indexes=frozenset()):
+    """Tablas grandes recorridas completas según EXPLAIN QUERY PLAN"""
+    scanned = set()
+    details = []
+    for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+        detail = row[-1]
+        details.append(detail)
+        parts = detail.split()
+        # "SCAN tabla" (SQLite >= 3.36) o "SCAN TABLE tabla" (versiones anteriores)
+        if parts and parts[0] == "SCAN":
+            name = parts[2] if len(parts) > 2 and parts[1] == "TABLE" else parts[1]
+            if "INDEX" in parts and parts[parts.index("INDEX") + 1] in partial_indexes:
+                continue
+            # FTS5 con MATCH: "VIRTUAL TABLE INDEX 0:M..." usa el índice invertido
+            if "VIRTUAL" in parts and ":M" in parts[-1]:
+                continue
+            if name in large_tables:
+                scanned.add(name)
+    return scanned, details
+
+
+def _time_query(conn, sql, params):
+    start = time.perf_counter()
+    conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_checks(db_path, budget_ms=DEFAULT_BUDGET_MS):
+    """Ejecutar todas las rutas y devolver el resultado por ruta"""
+    from .api import app
+
+    database.DB_PATH = Path(db_path)
+    original_get_connection = database.get_connection
+    database.get_connection = _get_plan_connection
+
+    if READ_REPLICA and replica.stale():
+        replica.publish()
+    plan_conn = _connect()
+    sizes = _table_sizes(plan_conn)
+    large_tables = {t for t, n in sizes.items() if n >= LARGE_TABLE_ROWS}
+    partial_indexes = _partial_indexes(plan_conn)
+    # Las placas sintéticas son aleatorias: tomar dos reales de la BD
+    placas = [r[0] for r in plan_conn.execute("SELECT DISTINCT placa FROM operatividad_vehiculos LIMIT 2")]
+    PARAM_SAMPLES["placas"] = ",".join(placas)
+
+    results = {}
+    try:
+        with TestClient(app, raise_server_exceptions=False) as client:
+            for method, path, params, body in build_cases(app):
+                key = f"{method} {path}"
+                result = results.setdefault(key, {"scans": {}, "errors": [], "slow": [], "plans": {}})
+                PlanConnection.opened.clear()
+                response = client.request(method, path, params=params, json=body)
+                if response.status_code != 200:
+                    result["errors"].append(f"HTTP {response.status_code} con {params or body}")
+                    continue
+                for conn in PlanConnection.opened:
+                    for sql, sql_params in conn.statements:
+                        if SESSION_STATEMENT.match(sql):
+                            continue
+                        sentencia = " ".join(sql.split())
+                        scanned, details = _scanned_tables(plan_conn, sql, sql_params, large_tables, partial_indexes)
+                        if scanned:
+                            result["scans"].setdefault(sentencia, set()).update(scanned)
+                        result["plans"][sentencia] = details
+                        elapsed = _time_query(plan_conn, sql, sql_params)
+                        if elapsed > budget_ms:
+                            result["slow"].append(f"{elapsed:.0f} ms > {budget_ms} ms: {sentencia[:120]}")
+    finally:
+        database.get_connection = original_get_connection
+        plan_conn.close()
+    return results, sizes
+
+
+def load_baseline():
+    if BASELINE_PATH.exists():
+        return json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_baseline(results):
+    baseline = {
+        key: {sql: sorted(tables) for sql, tables in sorted(r["scans"].items())}
+        for key, r in sorted(results.items())
+    }
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def find_regressions(results, baseline):
+    """Lista de fallos (ruta, motivo) comparando contra la línea base"""
+    failures = []
+    for key, result in sorted(results.items()):
+        for error in result["errors"]:
+            failures.append((key, error))
+        permitidos = baseline.get(key, {})
+        for sql, tables in sorted(result["scans"].items()):
+            for table in sorted(tables - set(permitidos.get(sql, []))):
+                failures.append((key, f"SCAN completo de {table} no registrado en la línea base: {sql[:120]}"))
+        for slow in result["slow"]:
+            failures.append((key, slow))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verificar planes de consulta de la API")
+    parser.add_argument("--db", help="BD sintética a usar (se genera si no existe)")
+    parser.add_argument("--scale", type=float, default=1, help="Factor de escala de la BD sintética generada")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Presupuesto de latencia por consulta")
+    parser.add_argument("--update-baseline", action="store_true", help="Guardar los planes actuales como línea base")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar el plan de cada consulta")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(args.db) if args.db else Path(tmp) / "logistica_sintetica.db"
+        if not db_path.exists():
+            print(f"🧪 Generando BD sintética en {db_path}...")
+            synthetic_data.generate_database(db_path, args.scale)
+
+        results, sizes = run_checks(db_path, args.budget_ms)
+
+    if args.verbose:
+        for key, result in sorted(results.items()):
+            print(f"\n{key}")
+            for sql, details in result["plans"].items():
+                print(f"   {sql[:140]}")
+                for detail in details:
+                    print(f"      {detail}")
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"✅ Línea base actualizada: {BASELINE_PATH}")
+        return 0
+
+    failures = find_regressions(results, load_baseline())
+    print("=" * 60)
+    print(f"Rutas verificadas: {len(results)}")
+    if failures:
+        for key, motivo in failures:
+            print(f"❌ {key}: {motivo}")
+        print(f"❌ {len(failures)} regresiones de planes de consulta")
+        return 1
+    print("✅ Sin regresiones de planes de consulta")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Réplica de lectura de la base de datos.
+
+Importaciones y lecturas compartían un solo archivo: mientras un importador
+borra, inserta y recrea índices, las consultas de la API esperan sus locks o
+leen tablas a medio cargar. Ahora las importaciones escriben solo en la base
+principal (DB_PATH) y, al terminar, publish() genera una copia compacta con
+VACUUM INTO en un archivo temporal y la publica con un rename atómico sobre
+{base}.lectura.db. Como el archivo publicado nunca se modifica (cada versión
+es un archivo nuevo), database.get_connection() lo abre en solo lectura con
+immutable=1 y mmap: sin locks ni chequeos de cambios, así varios workers de
+uvicorn escalan las lecturas sin competir con la importación. Las conexiones
+abiertas siguen leyendo la versión anterior hasta cerrarse; las nuevas ven
+la publicada.
+
+derived.refresh() publica después de cada importación y la API publica al
+arrancar si la base principal es más nueva que la réplica (migraciones,
+importaciones con la réplica desactivada). LOGISTICA_READ_REPLICA=0 vuelve a
+leer de la base principal.
+"""
+import os
+
+from . import database
+
+
+def stale():
+    """True si falta la réplica o la base principal cambió después de publicarla"""
+    replica = database.replica_path()
+    if not replica.exists():
+        return True
+    return database.DB_PATH.stat().st_mtime_ns > replica.stat().st_mtime_ns
+
+
+def publish(conn=None):
+    """Copiar la base principal a la réplica (VACUUM INTO + rename atómico); devuelve su tamaño"""
+    replica = database.replica_path()
+    # Nombre temporal por proceso: varios workers pueden publicar al arrancar
+    tmp = replica.with_name(f"{replica.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    if conn is None:
+        with database.get_db(primary=True) as conn:
+            conn.execute("VACUUM INTO ?", (str(tmp),))
+    else:
+        conn.execute("VACUUM INTO ?", (str(tmp),))
+    tmp.replace(replica)
+    tamano = replica.stat().st_size
+    print(f"📖 Réplica de lectura publicada: {replica} ({tamano:,} B)")
+    return tamano
+
+
+if __name__ == "__main__":
+    publish()
@@ -0,0 +1,182 @@
+"""
+Resúmenes precalculados (rollups) y planificador de agregados.
+
+Cada rollup de ROLLUPS es una tabla rollup_* con una fila por mes y
+combinación de sus dimensiones: registros (COUNT(*)) y, por cada columna
+numérica de tables.NUMERIC, suma, conteo no nulo, mínimo y máximo. Con eso se
+recombinan count, sum, avg, min y max sobre cualquier subconjunto de sus
+dimensiones; count_distinct solo de una dimensión del rollup. rebuild() corre
+desde derived.refresh() al importar la tabla base.
+
+plan() recibe una consulta de /api/query y elige el rollup más grueso (menos
+dimensiones, menos filas) que cubre las dimensiones pedidas, las columnas
+filtradas y todas las medidas; en tablas con fecha diaria además las fechas
+deben caer en meses completos. El cubo de conteos de facetas (facet_counts)
+entra como candidato para count(*). Si ninguno cubre la consulta, responde la
+tabla base. Las fuentes elegidas se cuentan por tabla (hits()) para ver la
+tasa de aciertos.
+"""
+import calendar
+from collections import Counter
+
+from . import facets, tables
+
+# nombre de la tabla resumen -> (tabla base, dimensiones)
+ROLLUPS = {
+    "rollup_costos_mes": ("costos_mensuales", ()),
+    "rollup_costos_ciudad": ("costos_mensuales", ("ciudad",)),
+    "rollup_costos_catalogo_ciudad": ("costos_mensuales", ("catalogo", "ciudad")),
+    "rollup_operatividad_mes": ("operatividad_vehiculos", ()),
+    "rollup_operatividad_sede": ("operatividad_vehiculos", ("sede",)),
+    "rollup_operatividad_sede_estado": ("operatividad_vehiculos", ("sede", "estado_vehiculo")),
+    "rollup_descuentos_mes": ("oc_descuentos", ()),
+    "rollup_descuentos_estado": ("oc_descuentos", ("estado",)),
+    "rollup_descuentos_tercero_estado": ("oc_descuentos", ("tercero_nombre", "estado")),
+    "rollup_indicadores_sede": ("indicadores", ("sede",)),
+    "rollup_indicadores_sede_responsable": ("indicadores", ("sede", "responsable")),
+    "rollup_fiscal_ru_sede": ("fiscal_ru", ("sede", "estado", "tipo_inventario")),
+    "rollup_brigadas_sede": ("brigadas", ("sede",)),
+    "rollup_errores_sede": ("errores", ("sede", "error")),
+    "rollup_programados_sede": ("programados_ejecutados", ("sede", "tipo_inventario")),
+    "rollup_gestion_sede": ("gestion", ("sede", "tipo_inventario", "responsable")),
+}
+
+_hits = {}
+
+
+def _columns(table, dims):
+    """(nombre, expresión) de las columnas del rollup"""
+    columnas = [("mes", tables.mes_expr(table)), *((d, d) for d in dims), ("registros", "COUNT(*)")]
+    for c in tables.NUMERIC[table]:
+        columnas += [(f"{c}_sum", f"SUM({c})"), (f"{c}_n", f"COUNT({c})"),
+                     (f"{c}_min", f"MIN({c})"), (f"{c}_max", f"MAX({c})")]
+    return columnas
+
+
+def rebuild(conn, name):
+    """Reconstruir un rollup desde su tabla base"""
+    table, dims = ROLLUPS[name]
+    columnas = _columns(table, dims)
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({name})")
+    if [row[1] for row in cursor.fetchall()] != [c for c, _ in columnas]:
+        # Tabla nueva o con columnas de una versión anterior del registro
+        cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        cursor.execute(f"CREATE TABLE {name} ({', '.join(c for c, _ in columnas)})")
+        cursor.execute(f"CREATE INDEX idx_{name}_mes ON {name}(mes)")
+    cursor.execute(f"DELETE FROM {name}")
+    cursor.execute(f'''
+        INSERT INTO {name}
+        SELECT {', '.join(expr for _, expr in columnas)}
+        FROM {table}
+        GROUP BY {', '.join(str(i + 1) for i in range(len(dims) + 1))}
+    ''')
+    conn.commit()
+    cursor.execute(f"SELECT COUNT(*) FROM {name}")
+    return cursor.fetchone()[0]
+
+
+# ============== PLANIFICADOR ==============
+
+def _measure(funcion, columna, dims, numericas):
+    """Expresión de la medida sobre un rollup, o None si el rollup no la puede responder"""
+    if funcion == "count" and columna == "*":
+        return "COALESCE(SUM(registros), 0)"
+    if funcion == "count_distinct" and columna in dims:
+        return f"COUNT(DISTINCT {columna})"
+    if columna not in numericas:
+        return None
+    return {
+        "count": f"COALESCE(SUM({columna}_n), 0)",
+        "sum": f"SUM({columna}_sum)",
+        "avg": f"SUM({columna}_sum) * 1.0 / SUM({columna}_n)",
+        "min": f"MIN({columna}_min)",
+        "max": f"MAX({columna}_max)",
+    }.get(funcion)
+
+
+def _candidates(conn, table):
+    """(nombre, origen SQL, parámetros del origen, dimensiones, numéricas) de los resúmenes de la tabla,
+    del más grueso al más fino; solo los que ya fueron construidos"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'rollup_%'")
+    existentes = {row[0] for row in cursor.fetchall()}
+    candidatos = [
+        (nombre, nombre, [], dims, tables.NUMERIC[table])
+        for nombre, (t, dims) in ROLLUPS.items() if t == table and nombre in existentes
+    ]
+    for fuente, (facet_table, _, dims) in facets.FACETS.items():
+        if facet_table == table:
+            # El cubo de facetas guarda las dimensiones como d1..d3 y los meses sin fecha como ''
+            columnas = ", ".join(f"d{i + 1} AS {c}" for i, c in enumerate(dims.values()))
+            origen = f"(SELECT NULLIF(mes, '') AS mes, {columnas}, conteo AS registros FROM facet_counts WHERE fuente = ?)"
+            candidatos.append(("facet_counts", origen, [fuente], tuple(dims.values()), []))
+    return sorted(candidatos, key=lambda c: len(c[3]))
+
+
+def _whole_months(inicio, fin):
+    return (inicio is None or inicio.day == 1) and (
+        fin is None or fin.day == calendar.monthrange(fin.year, fin.month)[1]
+    )
+
+
+def _conditions(table, filtros):
+    """Condiciones de los filtros sobre un rollup (columnas con el mismo nombre que en la tabla base),
+    o None si las fechas no se pueden resolver por mes"""
+    filtros = dict(filtros)
+    fecha_inicio, fecha_fin = filtros.pop("fecha_inicio", None), filtros.pop("fecha_fin", None)
+    inicio, fin = tables.parse_fecha(fecha_inicio), tables.parse_fecha(fecha_fin, fin=True)
+    # Las tablas de almacenes ya son mensuales (periodo): cualquier fecha se resuelve por mes
+    if tables.TABLES[table][0][1] == "dia" and not _whole_months(inicio, fin):
+        return None
+    conds, params = tables.conditions(table, **filtros)
+    if inicio:
+        conds.insert(0, "mes >= ?")
+        params.insert(0, inicio.isoformat()[:7])
+    if fin:
+        conds.insert(1 if inicio else 0, "mes <= ?")
+        params.insert(1 if inicio else 0, fin.isoformat()[:7])
+    return conds, params
+
+
+def plan(conn, table, medidas, dimensiones=(), filtros=None, top_n=None):
+    """(fuente que responde, sql, params): el rollup más grueso que cubre la consulta o la tabla base"""
+    filtros = {k: v for k, v in (filtros or {}).items() if v}
+    medidas_fc, dims = tables.validate(table, medidas, dimensiones)
+    filtradas = {tables.TABLES[table][1][p] for p in filtros if p in tables.TABLES[table][1]}
+    pedidas = {expr for d, expr in dims if d != "mes"} | filtradas
+
+    for nombre, origen, origen_params, rollup_dims, numericas in _candidates(conn, table):
+        if not pedidas <= set(rollup_dims):
+            continue
+        exprs = [_measure(f, c, rollup_dims, numericas) for f, c in medidas_fc]
+        condiciones = _conditions(table, filtros) if None not in exprs else None
+        if condiciones is None:
+            continue
+        conds, params = condiciones
+        where_clause = " AND ".join(["WHERE 1=1", *conds])
+        sql, params = tables.select(
+            [(d, "mes" if d == "mes" else expr) for d, expr in dims], exprs,
+            origen, where_clause, origen_params + params, top_n
+        )
+        _record(table, nombre)
+        return nombre, sql, params
+
+    _record(table, table)
+    return (table, *tables.aggregate(table, medidas, dimensiones, filtros, top_n))
+
+
+def _record(table, fuente):
+    _hits.setdefault(table, Counter())[fuente] += 1
+
+
+def hits():
+    """Consultas por tabla y fuente que las respondió, con la tasa de aciertos en resúmenes"""
+    return {
+        table: {
+            "consultas": sum(fuentes.values()),
+            "tasa_resumen": round(1 - fuentes.get(table, 0) / sum(fuentes.values()), 3),
+            "fuentes": dict(fuentes.most_common()),
+        }
+        for table, fuentes in sorted(_hits.items())
+    }
@@ -4,59 +4,20 @@ Rutas para el módulo de Brigadas
 from fastapi import APIRouter, Query
 from typing import Optional
 from backend.database import get_db
+from backend import archive, tables
 
 router = APIRouter(prefix="/api/brigadas", tags=["brigadas"])
 
-# Mapeo de meses en español a números
-MESES_MAP = {
-    "ENERO": 1, "FEBRERO": 2, "MARZO": 3, "ABRIL": 4,
-    "MAYO": 5, "JUNIO": 6, "JULIO": 7, "AGOSTO": 8,
-    "SEPTIEMBRE": 9, "OCTUBRE": 10, "NOVIEMBRE": 11, "DICIEMBRE": 12
-}
-
-def build_where_clause(fecha_inicio: Optional[str], fecha_fin: Optional[str], sedes: Optional[str]):
-    """Construir cláusula WHERE dinámica"""
-    conditions = []
-    params = []
-    
-    # Filtro de tiempo por fecha YYYY-MM
-    if fecha_inicio and fecha_fin:
-        try:
-            # Convertir YYYY-MM a rango de meses
-            year_inicio, mes_inicio = map(int, fecha_inicio.split('-'))
-            year_fin, mes_fin = map(int, fecha_fin.split('-'))
-            
-            # Para simplificar, asumimos que todos los datos están en el mismo año
-            # y filtramos por nombre del mes
-            meses_incluidos = []
-            for mes_num in range(mes_inicio, mes_fin + 1):
-                for mes_nombre, num in MESES_MAP.items():
-                    if num == mes_num:
-                        meses_incluidos.append(mes_nombre)
-            
-            if meses_incluidos:
-                placeholders = ','.join('?' * len(meses_incluidos))
-                # Comparar sin espacios
-                conditions.append(f"TRIM(mes) IN ({placeholders})")
-                params.extend(meses_incluidos)
-        except:
-            pass
-    
-    # Filtro de sedes
-    if sedes:
-        sedes_list = [s.strip() for s in sedes.split(',')]
-        placeholders = ','.join('?' * len(sedes_list))
-        conditions.append(f"sede IN ({placeholders})")
-        params.extend(sedes_list)
-    
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
-    return where_clause, params
+def build_where_clause(fecha_inicio, fecha_fin, sedes):
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["brigadas"])"""
+    return tables.where("brigadas", fecha_inicio, fecha_fin, sedes=sedes)
 
 
 @router.get("/filtros")
 def get_filtros():
     """Obtener valores únicos para filtros"""
     with get_db() as conn:
+        archive.include(conn, "brigadas")
         cursor = conn.cursor()
         
         # Sedes
@@ -83,6 +44,7 @@ def get_kpis(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes)
     
     with get_db() as conn:
+        archive.include(conn, "brigadas", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         # Costo Total
@@ -94,7 +56,7 @@ def get_kpis(
                 COUNT(DISTINCT item_codigo) as items_unicos,
                 COUNT(*) as total_registros
             FROM brigadas
-            WHERE {where_clause}
+            {where_clause}
         '''
         
         cursor.execute(query, params)
@@ -119,6 +81,7 @@ def get_por_sede(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes)
     
     with get_db() as conn:
+        archive.include(conn, "brigadas", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         query = f'''
@@ -128,7 +91,7 @@ def get_por_sede(
                 COALESCE(SUM(costo_diferencia), 0) as costo_diferencia,
                 COALESCE(AVG(desviacion), 0) as desviacion
             FROM brigadas
-            WHERE {where_clause}
+            {where_clause}
             GROUP BY sede
             ORDER BY sede
         '''
@@ -5,10 +5,11 @@ Columnas reales según la BD:
 - oc_descuentos: estado, tercero_nombre, fecha, total_dcto, porcentaje_descuento, etc.
 - base_oc_generadas: estado, tercero_nombre, fecha, documento_tipo, total, etc.
 """
-from fastapi import APIRouter, Query
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional, Dict, Any, Literal
 from pydantic import BaseModel
 from ..database import get_db
+from .. import analytics, hll, lifecycle, scorecard, search, tables
 
 router = APIRouter(prefix="/api/compras", tags=["Compras"])
 
@@ -70,29 +71,23 @@ async def get_filters():
         return {"success": True, "filters": filters}
 
 
+@router.get("/terceros/search")
+async def search_terceros(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(default=20, ge=1, le=1000),
+    fuente: Optional[str] = Query(None, pattern="^(traza|descuentos|base)$")
+):
+    """Buscar terceros por nombre (prefijos sin tildes y coincidencia aproximada).
+    Sin el límite de 500 de los endpoints /filtros."""
+    with get_db() as conn:
+        results = search.search_terceros(conn, q, limit, fuente)
+        return {"success": True, "q": q, "total": len(results), "data": results}
+
+
 # ==================== TRAZA REQ OC ====================
 def build_traza_where(fecha_inicio, fecha_fin, estados_req, estados_oc, terceros):
-    where_clause = "WHERE 1=1"
-    params = []
-    if fecha_inicio:
-        where_clause += " AND req_fecha >= ?"
-        params.append(fecha_inicio)
-    if fecha_fin:
-        where_clause += " AND req_fecha <= ?"
-        params.append(fecha_fin)
-    if estados_req:
-        lista = estados_req.split(",")
-        where_clause += f" AND req_estado IN ({','.join(['?' for _ in lista])})"
-        params.extend(lista)
-    if estados_oc:
-        lista = estados_oc.split(",")
-        where_clause += f" AND oc_estado IN ({','.join(['?' for _ in lista])})"
-        params.extend(lista)
-    if terceros:
-        lista = terceros.split(",")
-        where_clause += f" AND oc_tercero_nombre IN ({','.join(['?' for _ in lista])})"
-        params.extend(lista)
-    return where_clause, params
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["traza_req_oc"])"""
+    return tables.where("traza_req_oc", fecha_inicio, fecha_fin, estados_req=estados_req, estados_oc=estados_oc, terceros=terceros)
 
 
 @router.get("/traza/datos")
@@ -127,43 +122,38 @@ async def get_traza_filtros():
 @router.get("/traza/kpis")
 async def get_traza_kpis(
     fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None,
-    estados_req: Optional[str] = None, estados_oc: Optional[str] = None, terceros: Optional[str] = None
+    estados_req: Optional[str] = None, estados_oc: Optional[str] = None, terceros: Optional[str] = None,
+    approx: bool = False
 ):
     with get_db() as conn:
         cursor = conn.cursor()
         where_clause, params = build_traza_where(fecha_inicio, fecha_fin, estados_req, estados_oc, terceros)
-        cursor.execute(f'''SELECT COUNT(*), COUNT(DISTINCT req_numero), COUNT(DISTINCT oc_numero),
+        aproximado = None
+        if approx:
+            filtros = {"req_estado": tables.split_values(estados_req) or None, "oc_estado": tables.split_values(estados_oc) or None,
+                       "oc_tercero_nombre": tables.split_values(terceros) or None}
+            aproximado = hll.approx_counts(conn, "traza_req_oc", ["req_numero", "oc_numero"], fecha_inicio, fecha_fin, filtros)
+        distintos = "NULL, NULL" if aproximado else "COUNT(DISTINCT req_numero), COUNT(DISTINCT oc_numero)"
+        cursor.execute(f'''SELECT COUNT(*), {distintos},
             AVG(dias_aprobar_rq), AVG(dias_generar_oc)
             FROM traza_req_oc {where_clause}''', params)
         row = cursor.fetchone()
-        return {
+        result = {
             "total_registros": row[0], 
-            "requisiciones": row[1], 
-            "ordenes_compra": row[2],
+            "requisiciones": aproximado["req_numero"]["valor"] if aproximado else row[1], 
+            "ordenes_compra": aproximado["oc_numero"]["valor"] if aproximado else row[2],
             "dias_promedio_aprobar": round(row[3] or 0, 1),
             "dias_promedio_generar_oc": round(row[4] or 0, 1)
         }
+        if approx:
+            result["aproximado"] = aproximado
+        return result
 
 
 # ==================== OC DESCUENTOS ====================
 def build_descuentos_where(fecha_inicio, fecha_fin, terceros, estados):
-    where_clause = "WHERE 1=1"
-    params = []
-    if fecha_inicio:
-        where_clause += " AND fecha >= ?"
-        params.append(fecha_inicio)
-    if fecha_fin:
-        where_clause += " AND fecha <= ?"
-        params.append(fecha_fin)
-    if terceros:
-        lista = terceros.split(",")
-        where_clause += f" AND tercero_nombre IN ({','.join(['?' for _ in lista])})"
-        params.extend(lista)
-    if estados:
-        lista = estados.split(",")
-        where_clause += f" AND estado IN ({','.join(['?' for _ in lista])})"
-        params.extend(lista)
-    return where_clause, params
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["oc_descuentos"])"""
+    return tables.where("oc_descuentos", fecha_inicio, fecha_fin, terceros=terceros, estados=estados)
 
 
 @router.get("/descuentos/datos")
@@ -196,49 +186,39 @@ async def get_descuentos_filtros():
 @router.get("/descuentos/kpis")
 async def get_descuentos_kpis(
     fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None,
-    terceros: Optional[str] = None, estados: Optional[str] = None
+    terceros: Optional[str] = None, estados: Optional[str] = None,
+    approx: bool = False
 ):
     with get_db() as conn:
         cursor = conn.cursor()
         where_clause, params = build_descuentos_where(fecha_inicio, fecha_fin, terceros, estados)
+        aproximado = None
+        if approx:
+            filtros = {"tercero_nombre": tables.split_values(terceros) or None, "estado": tables.split_values(estados) or None}
+            aproximado = hll.approx_counts(conn, "oc_descuentos", ["documento_num", "tercero_nombre"], fecha_inicio, fecha_fin, filtros)
+        distintos = "NULL, NULL" if aproximado else "COUNT(DISTINCT documento_num), COUNT(DISTINCT tercero_nombre)"
         cursor.execute(f'''SELECT COUNT(*), SUM(COALESCE(total_dcto, 0)), SUM(COALESCE(total, 0)),
-            COUNT(DISTINCT documento_num), COUNT(DISTINCT tercero_nombre),
+            {distintos},
             AVG(COALESCE(porcentaje_descuento, 0))
             FROM oc_descuentos {where_clause}''', params)
         row = cursor.fetchone()
-        return {
+        result = {
             "total_registros": row[0], 
             "total_descuentos": row[1] or 0,
             "total_compras": row[2] or 0,
-            "ordenes_compra": row[3], 
-            "proveedores": row[4],
+            "ordenes_compra": aproximado["documento_num"]["valor"] if aproximado else row[3], 
+            "proveedores": aproximado["tercero_nombre"]["valor"] if aproximado else row[4],
             "pct_descuento_promedio": round(row[5] or 0, 2)
         }
+        if approx:
+            result["aproximado"] = aproximado
+        return result
 
 
 # ==================== BASE OC GENERADAS ====================
 def build_base_where(fecha_inicio, fecha_fin, terceros, tipos, estados):
-    where_clause = "WHERE 1=1"
-    params = []
-    if fecha_inicio:
-        where_clause += " AND fecha >= ?"
-        params.append(fecha_inicio)
-    if fecha_fin:
-        where_clause += " AND fecha <= ?"
-        params.append(fecha_fin)
-    if terceros:
-        lista = terceros.split(",")
-        where_clause += f" AND tercero_nombre IN ({','.join(['?' for _ in lista])})"
-        params.extend(lista)
-    if tipos:
-        lista = tipos.split(",")
-        where_clause += f" AND documento_tipo IN ({','.join(['?' for _ in lista])})"
-        params.extend(lista)
-    if estados:
-        lista = estados.split(",")
-        where_clause += f" AND estado IN ({','.join(['?' for _ in lista])})"
-        params.extend(lista)
-    return where_clause, params
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["base_oc_generadas"])"""
+    return tables.where("base_oc_generadas", fecha_inicio, fecha_fin, terceros=terceros, tipos=tipos, estados=estados)
 
 
 @router.get("/base/datos")
@@ -273,22 +253,33 @@ async def get_base_filtros():
 @router.get("/base/kpis")
 async def get_base_kpis(
     fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None,
-    terceros: Optional[str] = None, tipos: Optional[str] = None, estados: Optional[str] = None
+    terceros: Optional[str] = None, tipos: Optional[str] = None, estados: Optional[str] = None,
+    approx: bool = False
 ):
     with get_db() as conn:
         cursor = conn.cursor()
         where_clause, params = build_base_where(fecha_inicio, fecha_fin, terceros, tipos, estados)
-        cursor.execute(f'''SELECT COUNT(*), COUNT(DISTINCT documento_num), 
-            SUM(COALESCE(total, 0)), COUNT(DISTINCT tercero_nombre), COUNT(DISTINCT documento_tipo)
+        aproximado = None
+        if approx:
+            filtros = {"tercero_nombre": tables.split_values(terceros) or None, "documento_tipo": tables.split_values(tipos) or None,
+                       "estado": tables.split_values(estados) or None}
+            aproximado = hll.approx_counts(conn, "base_oc_generadas", ["documento_num", "tercero_nombre"], fecha_inicio, fecha_fin, filtros)
+        documentos = "NULL" if aproximado else "COUNT(DISTINCT documento_num)"
+        proveedores = "NULL" if aproximado else "COUNT(DISTINCT tercero_nombre)"
+        cursor.execute(f'''SELECT COUNT(*), {documentos}, 
+            SUM(COALESCE(total, 0)), {proveedores}, COUNT(DISTINCT documento_tipo)
             FROM base_oc_generadas {where_clause}''', params)
         row = cursor.fetchone()
-        return {
+        result = {
             "total_registros": row[0], 
-            "ordenes_compra": row[1], 
+            "ordenes_compra": aproximado["documento_num"]["valor"] if aproximado else row[1], 
             "valor_total": row[2] or 0, 
-            "proveedores": row[3], 
+            "proveedores": aproximado["tercero_nombre"]["valor"] if aproximado else row[3], 
             "tipos_doc": row[4]
         }
+        if approx:
+            result["aproximado"] = aproximado
+        return result
 
 
 # ==================== GRÁFICOS COMBINADOS ====================
@@ -315,6 +306,11 @@ async def get_compras_por_tercero(
     limit: int = 15
 ):
     with get_db() as conn:
+        # Scorecard si los filtros son meses completos y terceros
+        if not tipos and not estados:
+            rows = scorecard.top(conn, "base", "gasto", limit, fecha_inicio, fecha_fin, tables.split_values(terceros) or None)
+            if rows is not None:
+                return [{"tercero": r[0], "cantidad": r[4], "valor": r[1] or 0} for r in rows]
         cursor = conn.cursor()
         where_clause, params = build_base_where(fecha_inicio, fecha_fin, terceros, tipos, estados)
         cursor.execute(f'''
@@ -362,6 +358,10 @@ async def get_descuentos_por_tercero(
     limit: int = 15
 ):
     with get_db() as conn:
+        if not estados:
+            rows = scorecard.top(conn, "descuentos", "descuento", limit, fecha_inicio, fecha_fin, tables.split_values(terceros) or None)
+            if rows is not None:
+                return [{"tercero": r[0], "descuento": r[2] or 0, "cantidad": r[4]} for r in rows]
         cursor = conn.cursor()
         where_clause, params = build_descuentos_where(fecha_inicio, fecha_fin, terceros, estados)
         cursor.execute(f'''
@@ -372,44 +372,59 @@ async def get_descuentos_por_tercero(
         return [{"tercero": row[0], "descuento": row[1] or 0, "cantidad": row[2]} for row in cursor.fetchall()]
 
 
+# ==================== SCORECARD DE PROVEEDORES ====================
+@router.get("/proveedores/{tercero_id}")
+async def get_proveedor(tercero_id: str):
+    """Scorecard de un proveedor: totales y serie mensual en descuentos y base OC"""
+    with get_db() as conn:
+        result = scorecard.detalle(conn, tercero_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"Proveedor no encontrado: {tercero_id}")
+        return {"success": True, "data": result}
+
+
 # ==================== ENDPOINTS POST PARA DASHBOARD ====================
 
 @router.post("/kpis")
-async def get_kpis_post(filters: FilterRequest):
-    """KPIs combinados para el dashboard"""
+async def get_kpis_post(filters: FilterRequest, approx: bool = False):
+    """KPIs combinados para el dashboard (approx=true: RQ/OC distintas con HyperLogLog)"""
     with get_db() as conn:
         cursor = conn.cursor()
+        aproximado = hll.approx_counts(conn, "traza_req_oc", ["req_numero", "oc_numero"]) if approx else None
         
         # KPIs de traza_req_oc
-        cursor.execute('''SELECT COUNT(*), COUNT(DISTINCT req_numero), COUNT(DISTINCT oc_numero),
+        distintos = "NULL, NULL" if aproximado else "COUNT(DISTINCT req_numero), COUNT(DISTINCT oc_numero)"
+        cursor.execute(f'''SELECT COUNT(*), {distintos},
             AVG(COALESCE(dias_aprobar_rq, 0)), AVG(COALESCE(dias_generar_oc, 0)),
             AVG(COALESCE(dias_aprobacion_oc, 0)), AVG(COALESCE(dias_recepcion_servicio, 0)),
             AVG(COALESCE(dias_entrada_almacen, 0))
             FROM traza_req_oc''')
         traza = cursor.fetchone()
+        total_rq = aproximado["req_numero"]["valor"] if aproximado else traza[1]
+        total_oc = aproximado["oc_numero"]["valor"] if aproximado else traza[2]
         
         # KPIs de oc_descuentos
         cursor.execute('''SELECT COUNT(*), SUM(COALESCE(total_dcto, 0)), SUM(COALESCE(total, 0)),
-            COUNT(DISTINCT documento_num), AVG(COALESCE(porcentaje_descuento, 0))
+            AVG(COALESCE(porcentaje_descuento, 0))
             FROM oc_descuentos''')
         desc = cursor.fetchone()
         
         # Pendientes por aprobar RQ
-        cursor.execute("SELECT COUNT(*) FROM traza_req_oc WHERE req_estado = 'PENDIENTE' OR req_estado LIKE '%PEND%'")
+        cursor.execute("SELECT COUNT(*) FROM traza_req_oc WHERE req_pendiente = 1")
         pendientes_rq = cursor.fetchone()[0]
         
         # Pendientes por aprobar OC
-        cursor.execute("SELECT COUNT(*) FROM traza_req_oc WHERE oc_estado = 'PENDIENTE' OR oc_estado LIKE '%PEND%'")
+        cursor.execute("SELECT COUNT(*) FROM traza_req_oc WHERE oc_pendiente = 1")
         pendientes_oc = cursor.fetchone()[0]
         
-        return {
+        result = {
             "success": True,
             "kpis": {
-                "totalRQ": traza[1] or 0,
-                "totalOC": traza[2] or 0,
+                "totalRQ": total_rq or 0,
+                "totalOC": total_oc or 0,
                 "totalItems": traza[0] or 0,
                 "totalSpend": desc[2] or 0,
-                "percentDispatched": round(desc[4] or 0, 2),
+                "percentDispatched": round(desc[3] or 0, 2),
                 "diasPromedioAprobarRQ": round(traza[3] or 0, 1),
                 "diasPromedioGenerarOC": round(traza[4] or 0, 1),
                 "diasPromedioAprobacionOC": round(traza[5] or 0, 1),
@@ -420,11 +435,17 @@ async def get_kpis_post(filters: FilterRequest):
                 "pendientesAprobarOC": pendientes_oc
             }
         }
+        if approx:
+            result["aproximado"] = aproximado
+        return result
 
 
 @router.post("/charts/oc-vs-items-by-process")
-async def chart_oc_vs_items(filters: FilterRequest):
+async def chart_oc_vs_items(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Gráfico OC vs Items por proceso"""
+    memoria = analytics.chart("oc-vs-items-by-process", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -450,8 +471,11 @@ async def chart_oc_vs_items(filters: FilterRequest):
 
 
 @router.post("/charts/percent-discounts-by-process")
-async def chart_percent_discounts(filters: FilterRequest):
+async def chart_percent_discounts(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Gráfico porcentaje descuentos por proceso"""
+    memoria = analytics.chart("percent-discounts-by-process", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -477,24 +501,18 @@ async def chart_percent_discounts(filters: FilterRequest):
 
 
 @router.post("/charts/top-suppliers-discounts")
-async def chart_top_suppliers_discounts(filters: FilterRequest):
+async def chart_top_suppliers_discounts(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Top proveedores por descuentos"""
+    memoria = analytics.chart("top-suppliers-discounts", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
-        cursor = conn.cursor()
-        # Obtener total de descuentos para calcular porcentaje
-        cursor.execute('SELECT SUM(COALESCE(total_dcto, 0)) FROM oc_descuentos')
-        total_general = cursor.fetchone()[0] or 1
-        
-        cursor.execute('''
-            SELECT tercero_nombre, SUM(COALESCE(total_dcto, 0)) as total_desc
-            FROM oc_descuentos
-            WHERE tercero_nombre IS NOT NULL
-            GROUP BY tercero_nombre ORDER BY total_desc DESC LIMIT 10
-        ''')
-        rows = cursor.fetchall()
+        # Total de descuentos para calcular porcentaje
+        total_general = scorecard.total(conn, "descuentos", "descuento") or 1
+        rows = scorecard.top(conn, "descuentos", "descuento", 10, excluir_nulos=True)
         
         proveedores = [r[0] for r in rows]
-        montos = [r[1] or 0 for r in rows]
+        montos = [r[2] or 0 for r in rows]
         percentages = [(m / total_general * 100) if total_general > 0 else 0 for m in montos]
         
         return {
@@ -508,8 +526,11 @@ async def chart_top_suppliers_discounts(filters: FilterRequest):
 
 
 @router.post("/charts/avg-approval-days")
-async def chart_avg_approval_days(filters: FilterRequest):
+async def chart_avg_approval_days(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Días promedio aprobación RQ por aprobador"""
+    memoria = analytics.chart("avg-approval-days", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -530,8 +551,11 @@ async def chart_avg_approval_days(filters: FilterRequest):
 
 
 @router.post("/charts/avg-generation-days")
-async def chart_avg_generation_days(filters: FilterRequest):
+async def chart_avg_generation_days(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Días promedio generación OC por comprador"""
+    memoria = analytics.chart("avg-generation-days", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -552,8 +576,11 @@ async def chart_avg_generation_days(filters: FilterRequest):
 
 
 @router.post("/charts/avg-approval-management-days")
-async def chart_avg_approval_management(filters: FilterRequest):
+async def chart_avg_approval_management(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Días promedio aprobación gerencial OC por aprobador"""
+    memoria = analytics.chart("avg-approval-management-days", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -574,8 +601,11 @@ async def chart_avg_approval_management(filters: FilterRequest):
 
 
 @router.post("/charts/avg-reception-service-days")
-async def chart_avg_reception_service(filters: FilterRequest):
+async def chart_avg_reception_service(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Días promedio recepción servicio por usuario"""
+    memoria = analytics.chart("avg-reception-service-days", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -596,8 +626,11 @@ async def chart_avg_reception_service(filters: FilterRequest):
 
 
 @router.post("/charts/avg-warehouse-entry-days")
-async def chart_avg_warehouse_entry(filters: FilterRequest):
+async def chart_avg_warehouse_entry(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Días promedio entrada almacén por usuario"""
+    memoria = analytics.chart("avg-warehouse-entry-days", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -618,14 +651,17 @@ async def chart_avg_warehouse_entry(filters: FilterRequest):
 
 
 @router.post("/charts/pending-approve-rq")
-async def chart_pending_rq(filters: FilterRequest):
+async def chart_pending_rq(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Pendientes por aprobar RQ por aprobador"""
+    memoria = analytics.chart("pending-approve-rq", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT req_usuario_autorizador, COUNT(*) as cantidad
             FROM traza_req_oc
-            WHERE (req_estado = 'PENDIENTE' OR req_estado LIKE '%PEND%') 
+            WHERE req_pendiente = 1
             AND req_usuario_autorizador IS NOT NULL
             GROUP BY req_usuario_autorizador ORDER BY cantidad DESC LIMIT 10
         ''')
@@ -641,14 +677,17 @@ async def chart_pending_rq(filters: FilterRequest):
 
 
 @router.post("/charts/pending-approve-oc")
-async def chart_pending_oc(filters: FilterRequest):
+async def chart_pending_oc(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Pendientes por aprobar OC por aprobador"""
+    memoria = analytics.chart("pending-approve-oc", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT oc_usuario_autorizacion, COUNT(*) as cantidad
             FROM traza_req_oc
-            WHERE (oc_estado = 'PENDIENTE' OR oc_estado LIKE '%PEND%') 
+            WHERE oc_pendiente = 1
             AND oc_usuario_autorizacion IS NOT NULL
             GROUP BY oc_usuario_autorizacion ORDER BY cantidad DESC LIMIT 10
         ''')
@@ -664,8 +703,11 @@ async def chart_pending_oc(filters: FilterRequest):
 
 
 @router.post("/charts/oc-by-state")
-async def chart_oc_by_state(filters: FilterRequest):
+async def chart_oc_by_state(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """OC por estado"""
+    memoria = analytics.chart("oc-by-state", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -685,15 +727,18 @@ async def chart_oc_by_state(filters: FilterRequest):
 
 
 @router.post("/charts/trend-oc")
-async def chart_trend_oc(filters: FilterRequest):
+async def chart_trend_oc(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Tendencia OC por mes"""
+    memoria = analytics.chart("trend-oc", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
-            SELECT strftime('%Y-%m', oc_fecha) as mes, COUNT(DISTINCT oc_numero)
+            SELECT strftime('%Y-%m', oc_fecha) as oc_mes, COUNT(DISTINCT oc_numero)
             FROM traza_req_oc
             WHERE oc_fecha IS NOT NULL
-            GROUP BY mes ORDER BY mes DESC LIMIT 12
+            GROUP BY oc_mes ORDER BY oc_mes DESC LIMIT 12
         ''')
         rows = cursor.fetchall()
         
@@ -707,8 +752,11 @@ async def chart_trend_oc(filters: FilterRequest):
 
 
 @router.post("/charts/discounts-by-process")
-async def chart_discounts_by_process(filters: FilterRequest):
+async def chart_discounts_by_process(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Descuentos por proceso"""
+    memoria = analytics.chart("discounts-by-process", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -729,17 +777,13 @@ async def chart_discounts_by_process(filters: FilterRequest):
 
 
 @router.post("/charts/top-suppliers")
-async def chart_top_suppliers(filters: FilterRequest):
+async def chart_top_suppliers(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Top proveedores por monto"""
+    memoria = analytics.chart("top-suppliers", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT tercero_nombre, SUM(COALESCE(total, 0))
-            FROM oc_descuentos
-            WHERE tercero_nombre IS NOT NULL
-            GROUP BY tercero_nombre ORDER BY SUM(total) DESC LIMIT 10
-        ''')
-        rows = cursor.fetchall()
+        rows = scorecard.top(conn, "descuentos", "gasto", 10, excluir_nulos=True)
         
         return {
             "success": True,
@@ -751,8 +795,11 @@ async def chart_top_suppliers(filters: FilterRequest):
 
 
 @router.post("/charts/days-by-stage")
-async def chart_days_by_stage(filters: FilterRequest):
+async def chart_days_by_stage(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Días promedio por etapa"""
+    memoria = analytics.chart("days-by-stage", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -776,8 +823,11 @@ async def chart_days_by_stage(filters: FilterRequest):
 
 
 @router.post("/charts/spend-by-process")
-async def chart_spend_by_process(filters: FilterRequest):
+async def chart_spend_by_process(filters: FilterRequest, backend: Optional[Literal["sqlite", "memoria"]] = None):
     """Gasto por proceso"""
+    memoria = analytics.chart("spend-by-process", backend)
+    if memoria:
+        return memoria
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -795,3 +845,105 @@ async def chart_spend_by_process(filters: FilterRequest):
                 "amounts": [r[1] or 0 for r in rows]
             }
         }
+
+
+# Gráfico (nombre de analytics.CHARTS) -> handler; /api/admin/analytics/compare los llama por nombre
+CHART_HANDLERS = {
+    "oc-vs-items-by-process": chart_oc_vs_items,
+    "percent-discounts-by-process": chart_percent_discounts,
+    "top-suppliers-discounts": chart_top_suppliers_discounts,
+    "avg-approval-days": chart_avg_approval_days,
+    "avg-generation-days": chart_avg_generation_days,
+    "avg-approval-management-days": chart_avg_approval_management,
+    "avg-reception-service-days": chart_avg_reception_service,
+    "avg-warehouse-entry-days": chart_avg_warehouse_entry,
+    "pending-approve-rq": chart_pending_rq,
+    "pending-approve-oc": chart_pending_oc,
+    "oc-by-state": chart_oc_by_state,
+    "trend-oc": chart_trend_oc,
+    "discounts-by-process": chart_discounts_by_process,
+    "top-suppliers": chart_top_suppliers,
+    "days-by-stage": chart_days_by_stage,
+    "spend-by-process": chart_spend_by_process,
+}
+
+
+# ==================== CICLO DE VIDA RQ → OC ====================
+def build_documentos_where(filters: FilterRequest):
+    """WHERE sobre traza_documentos (una fila por requisición/OC)"""
+    where_clause = "WHERE 1=1"
+    params = []
+    if filters.dateStart:
+        where_clause += " AND req_fecha >= ?"
+        params.append(filters.dateStart)
+    if filters.dateEnd:
+        where_clause += " AND req_fecha <= ?"
+        params.append(filters.dateEnd)
+    if filters.processes:
+        where_clause += f" AND proceso IN ({','.join(['?' for _ in filters.processes])})"
+        params.extend(filters.processes)
+    if filters.suppliers:
+        where_clause += f" AND oc_tercero_nombre IN ({','.join(['?' for _ in filters.suppliers])})"
+        params.extend(filters.suppliers)
+    if filters.states:
+        marks = ','.join(['?' for _ in filters.states])
+        where_clause += f" AND (req_estado IN ({marks}) OR oc_estado IN ({marks}))"
+        params.extend(filters.states)
+        params.extend(filters.states)
+    return where_clause, params
+
+
+@router.post("/lifecycle/stages")
+async def lifecycle_stages(filters: FilterRequest):
+    """Percentiles p50/p90/p99 de días por etapa (solo documentos que completaron la etapa)"""
+    where_clause, params = build_documentos_where(filters)
+    columns = ", ".join(column for _, _, column in lifecycle.STAGES)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {columns} FROM traza_documentos {where_clause}", params)
+        rows = cursor.fetchall()
+
+    etapas = []
+    for i, (key, nombre, _) in enumerate(lifecycle.STAGES):
+        values = sorted(r[i] for r in rows if r[i] is not None)
+        etapa = {
+            "etapa": key,
+            "nombre": nombre,
+            "documentos": len(values),
+            "promedio": round(sum(values) / len(values), 1) if values else None,
+        }
+        for pct in lifecycle.PERCENTILES:
+            etapa[f"p{pct}"] = lifecycle.percentile(values, pct)
+        etapas.append(etapa)
+
+    return {"success": True, "data": {"documentos": len(rows), "etapas": etapas}}
+
+
+@router.post("/lifecycle/funnel")
+async def lifecycle_funnel(filters: FilterRequest):
+    """Documentos detenidos en cada etapa del ciclo RQ → OC → recepción → almacén"""
+    where_clause, params = build_documentos_where(filters)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT etapa_actual, COUNT(*), SUM(items), MIN(req_fecha)
+            FROM traza_documentos {where_clause}
+            GROUP BY etapa_actual
+        ''', params)
+        por_etapa = {r[0]: r for r in cursor.fetchall()}
+
+    total = sum(r[1] for r in por_etapa.values())
+    etapas = []
+    for key, nombre in lifecycle.ETAPAS_ACTUALES:
+        row = por_etapa.get(key)
+        cantidad = row[1] if row else 0
+        etapas.append({
+            "etapa": key,
+            "nombre": nombre,
+            "documentos": cantidad,
+            "items": row[2] if row else 0,
+            "porcentaje": round(cantidad * 100 / total, 1) if total else 0,
+            "req_fecha_mas_antigua": row[3] if row else None,
+        })
+
+    return {"success": True, "data": {"documentos": total, "etapas": etapas}}
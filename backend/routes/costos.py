@@ -4,38 +4,14 @@ Rutas API para Costos Mensuales
 from fastapi import APIRouter, Query
 from typing import Optional
 from ..database import get_db
+from .. import tables
 
 router = APIRouter(prefix="/api/costos", tags=["Costos Mensuales"])
 
 
 def build_where_clause(fecha_inicio, fecha_fin, catalogos, ciudades, terceros):
-    """Construir cláusula WHERE y parámetros"""
-    where_clause = "WHERE 1=1"
-    params = []
-    
-    if fecha_inicio:
-        where_clause += " AND fecha >= ?"
-        params.append(fecha_inicio)
-    if fecha_fin:
-        where_clause += " AND fecha <= ?"
-        params.append(fecha_fin)
-    if catalogos:
-        catalogo_list = catalogos.split(",")
-        placeholders = ",".join(["?" for _ in catalogo_list])
-        where_clause += f" AND catalogo IN ({placeholders})"
-        params.extend(catalogo_list)
-    if ciudades:
-        ciudad_list = ciudades.split(",")
-        placeholders = ",".join(["?" for _ in ciudad_list])
-        where_clause += f" AND ciudad IN ({placeholders})"
-        params.extend(ciudad_list)
-    if terceros:
-        tercero_list = terceros.split(",")
-        placeholders = ",".join(["?" for _ in tercero_list])
-        where_clause += f" AND tercero IN ({placeholders})"
-        params.extend(tercero_list)
-    
-    return where_clause, params
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["costos_mensuales"])"""
+    return tables.where("costos_mensuales", fecha_inicio, fecha_fin, catalogos=catalogos, ciudades=ciudades, terceros=terceros)
 
 
 @router.get("/datos")
@@ -4,64 +4,20 @@ Rutas para el módulo de Errores Movimientos
 from fastapi import APIRouter, Query
 from typing import Optional
 from backend.database import get_db
+from backend import archive, tables
 
 router = APIRouter(prefix="/api/errores", tags=["errores"])
 
-# Mapeo de meses en español a números
-MESES_MAP = {
-    "ENERO": 1, "FEBRERO": 2, "MARZO": 3, "ABRIL": 4,
-    "MAYO": 5, "JUNIO": 6, "JULIO": 7, "AGOSTO": 8,
-    "SEPTIEMBRE": 9, "OCTUBRE": 10, "NOVIEMBRE": 11, "DICIEMBRE": 12
-}
-
-def build_where_clause(fecha_inicio: Optional[str], fecha_fin: Optional[str], sedes: Optional[str], errores: Optional[str]):
-    """Construir cláusula WHERE dinámica"""
-    conditions = []
-    params = []
-    
-    # Filtro de tiempo por fecha YYYY-MM
-    if fecha_inicio and fecha_fin:
-        try:
-            # Convertir YYYY-MM a rango de meses
-            year_inicio, mes_inicio = map(int, fecha_inicio.split('-'))
-            year_fin, mes_fin = map(int, fecha_fin.split('-'))
-            
-            # Obtener meses incluidos
-            meses_incluidos = []
-            for mes_num in range(mes_inicio, mes_fin + 1):
-                for mes_nombre, num in MESES_MAP.items():
-                    if num == mes_num:
-                        meses_incluidos.append(mes_nombre)
-            
-            if meses_incluidos:
-                placeholders = ','.join('?' * len(meses_incluidos))
-                conditions.append(f"mes IN ({placeholders})")
-                params.extend(meses_incluidos)
-        except:
-            pass
-    
-    # Filtro de sedes
-    if sedes:
-        sedes_list = [s.strip() for s in sedes.split(',')]
-        placeholders = ','.join('?' * len(sedes_list))
-        conditions.append(f"sede IN ({placeholders})")
-        params.extend(sedes_list)
-    
-    # Filtro de errores
-    if errores:
-        errores_list = [e.strip() for e in errores.split(',')]
-        placeholders = ','.join('?' * len(errores_list))
-        conditions.append(f"error IN ({placeholders})")
-        params.extend(errores_list)
-    
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
-    return where_clause, params
+def build_where_clause(fecha_inicio, fecha_fin, sedes, errores):
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["errores"])"""
+    return tables.where("errores", fecha_inicio, fecha_fin, sedes=sedes, errores=errores)
 
 
 @router.get("/filtros")
 def get_filtros():
     """Obtener valores únicos para filtros"""
     with get_db() as conn:
+        archive.include(conn, "errores")
         cursor = conn.cursor()
         
         # Sedes
@@ -89,6 +45,7 @@ def get_kpis(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, errores)
     
     with get_db() as conn:
+        archive.include(conn, "errores", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         query = f'''
@@ -99,7 +56,7 @@ def get_kpis(
                 SUM(CASE WHEN error = 'No' THEN 1 ELSE 0 END) as total_sin_error,
                 COALESCE(SUM(total), 0) as valor_total
             FROM errores
-            WHERE {where_clause}
+            {where_clause}
         '''
         
         cursor.execute(query, params)
@@ -125,6 +82,7 @@ def get_por_error(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, errores)
     
     with get_db() as conn:
+        archive.include(conn, "errores", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         query = f'''
@@ -132,7 +90,7 @@ def get_por_error(
                 error,
                 COUNT(*) as cantidad
             FROM errores
-            WHERE {where_clause}
+            {where_clause}
             GROUP BY error
             ORDER BY cantidad DESC
         '''
@@ -157,6 +115,7 @@ def get_por_sede(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, errores)
     
     with get_db() as conn:
+        archive.include(conn, "errores", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         query = f'''
@@ -166,7 +125,7 @@ def get_por_sede(
                 SUM(CASE WHEN error = 'Revisar' THEN 1 ELSE 0 END) as revisar,
                 SUM(CASE WHEN error = 'Si' THEN 1 ELSE 0 END) as con_error
             FROM errores
-            WHERE {where_clause}
+            {where_clause}
             GROUP BY sede
             ORDER BY sede
         '''
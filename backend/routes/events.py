@@ -0,0 +1,61 @@
+"""
+Rutas API para eventos del servidor (SSE): avisar a los dashboards cuando una
+importación cambia la generación de datos de una tabla (data_generations)
+"""
+import asyncio
+import json
+import time
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from ..database import get_db, get_generations
+
+router = APIRouter(prefix="/api/events", tags=["Eventos"])
+
+# Cada cuánto se revisa data_generations y cada cuánto se envía un comentario para mantener viva la conexión
+POLL_SECONDS = 2
+HEARTBEAT_SECONDS = 15
+# Tiempo de reconexión sugerido al navegador (ms)
+RETRY_MS = 5000
+
+
+def _read_generations(tablas):
+    with get_db() as conn:
+        return get_generations(conn, tablas)
+
+
+def _event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream(request: Request, tablas):
+    """snapshot con las generaciones actuales y luego un evento generation por cada cambio"""
+    actuales = _read_generations(tablas)
+    yield f"retry: {RETRY_MS}\n"
+    yield _event("snapshot", {"generaciones": actuales})
+    ultimo_envio = time.monotonic()
+    while True:
+        await asyncio.sleep(POLL_SECONDS)
+        if await request.is_disconnected():
+            break
+        nuevas = _read_generations(tablas)
+        cambios = {tabla: gen for tabla, gen in nuevas.items() if actuales.get(tabla) != gen}
+        if cambios:
+            actuales = nuevas
+            yield _event("generation", {"tablas": cambios, "generaciones": actuales})
+            ultimo_envio = time.monotonic()
+        elif time.monotonic() - ultimo_envio >= HEARTBEAT_SECONDS:
+            yield ": ping\n\n"
+            ultimo_envio = time.monotonic()
+
+
+@router.get("")
+async def get_events(request: Request, tablas: Optional[str] = None):
+    """Flujo SSE de cambios de generación de datos (opcional: tablas separadas por coma).
+    Eventos: snapshot al conectar y generation con las tablas que cambiaron."""
+    lista = tablas.split(",") if tablas else None
+    return StreamingResponse(
+        _stream(request, lista),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
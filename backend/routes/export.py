@@ -0,0 +1,50 @@
+"""
+Rutas API para exportación masiva (Arrow / Parquet) con los mismos filtros que
+el router de cada tabla (tables.TABLES)
+"""
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Literal
+from .. import export, tables
+
+router = APIRouter(prefix="/api/export", tags=["Exportación"])
+
+
+@router.get("/")
+def list_exports():
+    """Tablas exportables con los filtros que acepta cada una"""
+    return {
+        "disponible": export.AVAILABLE,
+        "formatos": list(export.FORMATS),
+        "data": {table: tables.filter_params(table) for table in tables.TABLES},
+    }
+
+
+@router.get("/{table}.{formato}")
+def export_table(
+    table: str,
+    formato: Literal["arrow", "parquet"],
+    request: Request,
+    chunk: int = Query(default=export.CHUNK_ROWS, ge=1000, le=200000)
+):
+    """Tabla completa (o filtrada) en Arrow IPC stream o Parquet, leída y enviada por bloques"""
+    if table not in tables.TABLES:
+        raise HTTPException(status_code=404, detail=f"Tabla no exportable: {table}")
+    if not export.AVAILABLE:
+        raise HTTPException(status_code=501, detail="La exportación Arrow/Parquet requiere el paquete pyarrow")
+
+    filtros = tables.filter_params(table)
+    desconocidos = set(request.query_params) - set(filtros) - {"chunk"}
+    if desconocidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Filtros no válidos para {table}: {', '.join(sorted(desconocidos))}. Aceptados: {', '.join(filtros)}"
+        )
+    valores = {f: request.query_params.get(f) for f in filtros}
+    where_clause, params = tables.where(table, **valores)
+
+    return StreamingResponse(
+        export.stream(table, where_clause, params, formato, chunk, valores.get("fecha_inicio"), valores.get("fecha_fin")),
+        media_type=export.FORMATS[formato],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{formato}"'},
+    )
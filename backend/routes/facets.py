@@ -0,0 +1,32 @@
+"""
+Rutas API para facetas de filtros: valores de cada dimensión con su conteo
+bajo los filtros aplicados
+"""
+from fastapi import APIRouter, HTTPException, Request
+from typing import Optional
+from ..database import get_db
+from .. import facets
+
+router = APIRouter(prefix="/api/facets", tags=["Facetas"])
+
+
+@router.get("/")
+async def get_fuentes():
+    """Fuentes disponibles y sus parámetros de filtro"""
+    return {
+        fuente: {"tabla": table, "filtros": list(dims)}
+        for fuente, (table, _, dims) in facets.FACETS.items()
+    }
+
+
+@router.get("/{fuente}")
+async def get_facetas(
+    fuente: str, request: Request,
+    fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None
+):
+    """Valores con conteo por dimensión. Acepta los mismos filtros que el
+    router de la fuente (sedes, terceros, estados...) separados por coma."""
+    if fuente not in facets.FACETS:
+        raise HTTPException(status_code=404, detail=f"Fuente desconocida: {fuente}")
+    with get_db() as conn:
+        return facets.compute(conn, fuente, fecha_inicio, fecha_fin, dict(request.query_params))
@@ -4,79 +4,20 @@ Rutas API para Inventario Fiscal RU
 from fastapi import APIRouter, Query
 from typing import Optional
 from ..database import get_db
+from .. import archive, tables
 
 router = APIRouter(prefix="/api/fiscal-ru", tags=["Fiscal RU"])
 
-# Mapeo de meses en español a números
-MESES_MAP = {
-    'ENERO': 1, 'FEBRERO': 2, 'MARZO': 3, 'ABRIL': 4, 'MAYO': 5, 'JUNIO': 6,
-    'JULIO': 7, 'AGOSTO': 8, 'SEPTIEMBRE': 9, 'OCTUBRE': 10, 'NOVIEMBRE': 11, 'DICIEMBRE': 12
-}
-
-def build_where_clause(fecha_inicio: Optional[str], fecha_fin: Optional[str], sedes: Optional[str], estado: Optional[str], tipo_inventario: Optional[str]):
-    """Construir cláusula WHERE y parámetros"""
-    where_clause = "WHERE 1=1"
-    params = []
-    
-    if fecha_inicio and fecha_fin:
-        from datetime import datetime
-        # Manejar formato YYYY-MM del input type="month"
-        fecha_ini_obj = datetime.strptime(fecha_inicio, "%Y-%m")
-        fecha_fin_obj = datetime.strptime(fecha_fin, "%Y-%m")
-        mes_inicio = fecha_ini_obj.month
-        mes_fin = fecha_fin_obj.month
-        
-        # Obtener meses válidos en el rango
-        meses_validos = [k for k, v in MESES_MAP.items() if mes_inicio <= v <= mes_fin]
-        if meses_validos:
-            placeholders = ",".join(["?" for _ in meses_validos])
-            where_clause += f" AND mes IN ({placeholders})"
-            params.extend(meses_validos)
-    elif fecha_inicio:
-        from datetime import datetime
-        fecha_obj = datetime.strptime(fecha_inicio, "%Y-%m")
-        mes_inicio = fecha_obj.month
-        meses_validos = [k for k, v in MESES_MAP.items() if v >= mes_inicio]
-        if meses_validos:
-            placeholders = ",".join(["?" for _ in meses_validos])
-            where_clause += f" AND mes IN ({placeholders})"
-            params.extend(meses_validos)
-    elif fecha_fin:
-        from datetime import datetime
-        fecha_obj = datetime.strptime(fecha_fin, "%Y-%m")
-        mes_fin = fecha_obj.month
-        meses_validos = [k for k, v in MESES_MAP.items() if v <= mes_fin]
-        if meses_validos:
-            placeholders = ",".join(["?" for _ in meses_validos])
-            where_clause += f" AND mes IN ({placeholders})"
-            params.extend(meses_validos)
-    
-    # Filtro de sedes
-    if sedes:
-        sedes_list = [s.strip() for s in sedes.split(',')]
-        placeholders = ','.join('?' * len(sedes_list))
-        where_clause += f" AND sede IN ({placeholders})"
-        params.extend(sedes_list)
-    
-    if estado:
-        estado_list = estado.split(",")
-        placeholders = ",".join(["?" for _ in estado_list])
-        where_clause += f" AND estado IN ({placeholders})"
-        params.extend(estado_list)
-    
-    if tipo_inventario:
-        tipo_list = tipo_inventario.split(",")
-        placeholders = ",".join(["?" for _ in tipo_list])
-        where_clause += f" AND tipo_inventario IN ({placeholders})"
-        params.extend(tipo_list)
-    
-    return where_clause, params
+def build_where_clause(fecha_inicio, fecha_fin, sedes, estado, tipo_inventario):
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["fiscal_ru"])"""
+    return tables.where("fiscal_ru", fecha_inicio, fecha_fin, sedes=sedes, estado=estado, tipo_inventario=tipo_inventario)
 
 
 @router.get("/filtros")
 async def get_filtros():
     """Obtener opciones disponibles para filtros específicos"""
     with get_db() as conn:
+        archive.include(conn, "fiscal_ru")
         cursor = conn.cursor()
         
         # Obtener estados únicos
@@ -103,6 +44,7 @@ async def get_kpis(
 ):
     """Obtener KPIs de Fiscal RU"""
     with get_db() as conn:
+        archive.include(conn, "fiscal_ru", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, estado, tipo_inventario)
         
@@ -138,6 +80,7 @@ async def get_por_sede(
 ):
     """Datos para gráfico por sede"""
     with get_db() as conn:
+        archive.include(conn, "fiscal_ru", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, estado, tipo_inventario)
         
@@ -175,6 +118,7 @@ async def get_por_estado(
 ):
     """Datos para gráfico por estado"""
     with get_db() as conn:
+        archive.include(conn, "fiscal_ru", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, estado, tipo_inventario)
         
@@ -1,74 +1,20 @@
 from fastapi import APIRouter, Query
 from typing import Optional
 from ..database import get_db
-from datetime import datetime
+from .. import archive, tables
 
 router = APIRouter(prefix="/api/gestion", tags=["gestion"])
 
-# Mapeo de nombres de mes en español a números
-MESES_MAP = {
-    "ENERO": 1, "FEBRERO": 2, "MARZO": 3, "ABRIL": 4,
-    "MAYO": 5, "JUNIO": 6, "JULIO": 7, "AGOSTO": 8,
-    "SEPTIEMBRE": 9, "OCTUBRE": 10, "NOVIEMBRE": 11, "DICIEMBRE": 12
-}
-
-def build_where_clause(
-    fecha_inicio: Optional[str] = None,
-    fecha_fin: Optional[str] = None,
-    sedes: Optional[str] = None,
-    tipos_inventario: Optional[str] = None,
-    responsables: Optional[str] = None
-):
-    """Construir cláusula WHERE con filtros opcionales"""
-    conditions = []
-    params = []
-    
-    # Filtro por rango de fechas (usando mes)
-    if fecha_inicio:
-        try:
-            fecha = datetime.strptime(fecha_inicio, '%Y-%m-%d')
-            mes_inicio = fecha.month
-            conditions.append("CAST(substr('0' || CASE mes WHEN 'ENERO' THEN 1 WHEN 'FEBRERO' THEN 2 WHEN 'MARZO' THEN 3 WHEN 'ABRIL' THEN 4 WHEN 'MAYO' THEN 5 WHEN 'JUNIO' THEN 6 WHEN 'JULIO' THEN 7 WHEN 'AGOSTO' THEN 8 WHEN 'SEPTIEMBRE' THEN 9 WHEN 'OCTUBRE' THEN 10 WHEN 'NOVIEMBRE' THEN 11 WHEN 'DICIEMBRE' THEN 12 END, -2, 2) AS INTEGER) >= ?")
-            params.append(mes_inicio)
-        except:
-            pass
-    
-    if fecha_fin:
-        try:
-            fecha = datetime.strptime(fecha_fin, '%Y-%m-%d')
-            mes_fin = fecha.month
-            conditions.append("CAST(substr('0' || CASE mes WHEN 'ENERO' THEN 1 WHEN 'FEBRERO' THEN 2 WHEN 'MARZO' THEN 3 WHEN 'ABRIL' THEN 4 WHEN 'MAYO' THEN 5 WHEN 'JUNIO' THEN 6 WHEN 'JULIO' THEN 7 WHEN 'AGOSTO' THEN 8 WHEN 'SEPTIEMBRE' THEN 9 WHEN 'OCTUBRE' THEN 10 WHEN 'NOVIEMBRE' THEN 11 WHEN 'DICIEMBRE' THEN 12 END, -2, 2) AS INTEGER) <= ?")
-            params.append(mes_fin)
-        except:
-            pass
-    
-    # Filtros por listas
-    if sedes:
-        sede_list = sedes.split(',')
-        placeholders = ','.join('?' * len(sede_list))
-        conditions.append(f"sede IN ({placeholders})")
-        params.extend(sede_list)
-    
-    if tipos_inventario:
-        tipo_list = tipos_inventario.split(',')
-        placeholders = ','.join('?' * len(tipo_list))
-        conditions.append(f"tipo_inventario IN ({placeholders})")
-        params.extend(tipo_list)
-    
-    if responsables:
-        resp_list = responsables.split(',')
-        placeholders = ','.join('?' * len(resp_list))
-        conditions.append(f"responsable IN ({placeholders})")
-        params.extend(resp_list)
-    
-    where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
-    return where_clause, params
+def build_where_clause(fecha_inicio, fecha_fin, sedes, tipos_inventario, responsables):
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["gestion"])"""
+    return tables.where("gestion", fecha_inicio, fecha_fin, sedes=sedes, tipos_inventario=tipos_inventario, responsables=responsables)
 
 
 @router.get("/filtros")
 async def get_filtros():
     """Obtener valores únicos para filtros"""
     with get_db() as conn:
+        archive.include(conn, "gestion")
         cursor = conn.cursor()
         
         sedes = [row[0] for row in cursor.execute("SELECT DISTINCT sede FROM gestion WHERE sede IS NOT NULL ORDER BY sede").fetchall()]
@@ -94,6 +40,7 @@ async def get_kpis(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, tipos_inventario, responsables)
     
     with get_db() as conn:
+        archive.include(conn, "gestion", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         # Promedio de días de inventario
@@ -136,6 +83,7 @@ async def get_por_sede(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, tipos_inventario, responsables)
     
     with get_db() as conn:
+        archive.include(conn, "gestion", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         query = f"""
@@ -183,6 +131,7 @@ async def get_por_responsable(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, tipos_inventario, responsables)
     
     with get_db() as conn:
+        archive.include(conn, "gestion", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         query = f"""
@@ -0,0 +1,50 @@
+"""
+Rutas API del archivo histórico: periodos en la base caliente y archivados
+(ver archive.py), y comparación de las medidas declaradas de una tabla de
+almacenes entre periodos
+"""
+from fastapi import APIRouter, HTTPException, Request
+from ..config import HOT_PERIODS
+from ..database import get_db
+from .. import archive, tables
+
+router = APIRouter(prefix="/api/historico", tags=["Histórico"])
+
+
+@router.get("/")
+def get_periodos():
+    """Filas por periodo y tabla, indicando si están en la base caliente o archivadas"""
+    return {
+        "periodos_calientes": HOT_PERIODS,
+        "directorio": str(archive.directory()),
+        "data": archive.counts(),
+    }
+
+
+@router.get("/{table}")
+def get_comparacion(table: str, request: Request):
+    """Medidas declaradas de la tabla por periodo (mes), con los filtros de su router;
+    fecha_inicio/fecha_fin eligen los periodos y adjuntan los archivados que toquen"""
+    if table not in archive.TABLES:
+        raise HTTPException(status_code=404, detail=f"Tabla sin histórico: {table}")
+    filtros = tables.filter_params(table)
+    desconocidos = set(request.query_params) - set(filtros)
+    if desconocidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Filtros no válidos para {table}: {', '.join(sorted(desconocidos))}. Aceptados: {', '.join(filtros)}"
+        )
+    filtros = {f: request.query_params.get(f) for f in filtros if request.query_params.get(f)}
+    medidas = list(tables.TABLES[table][2])
+
+    with get_db() as conn:
+        archivados = archive.include(conn, table, filtros.get("fecha_inicio"), filtros.get("fecha_fin"))
+        sql, params = tables.aggregate(table, medidas, ["mes"], filtros)
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        columnas = ["mes", *medidas]
+        data = [dict(zip(columnas, row)) for row in cursor.fetchall()]
+
+    for fila in data:
+        fila["fuente"] = "archivo" if fila["mes"] in archivados else "caliente"
+    return {"table": table, "columnas": columnas, "data": data}
@@ -4,66 +4,13 @@ Rutas API para Indicadores de Almacenes (OYMM)
 from fastapi import APIRouter, Query
 from typing import Optional, List
 from ..database import get_db
+from .. import archive, tables
 
 router = APIRouter(prefix="/api/indicadores", tags=["Indicadores"])
 
-# Mapeo de meses en español a números
-MESES_MAP = {
-    'ENERO': 1, 'FEBRERO': 2, 'MARZO': 3, 'ABRIL': 4, 'MAYO': 5, 'JUNIO': 6,
-    'JULIO': 7, 'AGOSTO': 8, 'SEPTIEMBRE': 9, 'OCTUBRE': 10, 'NOVIEMBRE': 11, 'DICIEMBRE': 12
-}
-
-def build_where_clause(fecha_inicio: Optional[str], fecha_fin: Optional[str], sedes: Optional[str], responsables: Optional[str]):
-    """Construir cláusula WHERE y parámetros"""
-    where_clause = "WHERE 1=1"
-    params = []
-    
-    if fecha_inicio and fecha_fin:
-        from datetime import datetime
-        # Manejar formato YYYY-MM del input type="month"
-        fecha_ini_obj = datetime.strptime(fecha_inicio, "%Y-%m")
-        fecha_fin_obj = datetime.strptime(fecha_fin, "%Y-%m")
-        mes_inicio = fecha_ini_obj.month
-        mes_fin = fecha_fin_obj.month
-        
-        # Obtener meses válidos en el rango
-        meses_validos = [k for k, v in MESES_MAP.items() if mes_inicio <= v <= mes_fin]
-        if meses_validos:
-            placeholders = ",".join(["?" for _ in meses_validos])
-            where_clause += f" AND mes IN ({placeholders})"
-            params.extend(meses_validos)
-    elif fecha_inicio:
-        from datetime import datetime
-        fecha_obj = datetime.strptime(fecha_inicio, "%Y-%m")
-        mes_inicio = fecha_obj.month
-        meses_validos = [k for k, v in MESES_MAP.items() if v >= mes_inicio]
-        if meses_validos:
-            placeholders = ",".join(["?" for _ in meses_validos])
-            where_clause += f" AND mes IN ({placeholders})"
-            params.extend(meses_validos)
-    elif fecha_fin:
-        from datetime import datetime
-        fecha_obj = datetime.strptime(fecha_fin, "%Y-%m")
-        mes_fin = fecha_obj.month
-        meses_validos = [k for k, v in MESES_MAP.items() if v <= mes_fin]
-        if meses_validos:
-            placeholders = ",".join(["?" for _ in meses_validos])
-            where_clause += f" AND mes IN ({placeholders})"
-            params.extend(meses_validos)
-    
-    if sedes:
-        sede_list = sedes.split(",")
-        placeholders = ",".join(["?" for _ in sede_list])
-        where_clause += f" AND sede IN ({placeholders})"
-        params.extend(sede_list)
-    
-    if responsables:
-        responsable_list = responsables.split(",")
-        placeholders = ",".join(["?" for _ in responsable_list])
-        where_clause += f" AND responsable IN ({placeholders})"
-        params.extend(responsable_list)
-    
-    return where_clause, params
+def build_where_clause(fecha_inicio, fecha_fin, sedes, responsables):
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["indicadores"])"""
+    return tables.where("indicadores", fecha_inicio, fecha_fin, sedes=sedes, responsables=responsables)
 
 
 @router.get("/datos")
@@ -76,6 +23,7 @@ async def get_datos(
 ):
     """Obtener datos de indicadores con filtros"""
     with get_db() as conn:
+        archive.include(conn, "indicadores", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, responsables)
         query = f"SELECT * FROM indicadores {where_clause} ORDER BY mes, sede LIMIT {limit}"
@@ -88,6 +36,7 @@ async def get_datos(
 async def get_filtros():
     """Obtener opciones disponibles para filtros"""
     with get_db() as conn:
+        archive.include(conn, "indicadores")
         cursor = conn.cursor()
         
         # Obtener sedes únicas
@@ -113,6 +62,7 @@ async def get_kpis(
 ):
     """Obtener KPIs de indicadores"""
     with get_db() as conn:
+        archive.include(conn, "indicadores", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, responsables)
         
@@ -161,6 +111,7 @@ async def get_inventario_por_sede(
 ):
     """Datos para gráfico de inventario por sede"""
     with get_db() as conn:
+        archive.include(conn, "indicadores", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, responsables)
         
@@ -187,14 +138,16 @@ async def get_inventario_por_sede(
 
 @router.get("/grafico/inventario-por-mes")
 async def get_inventario_por_mes(
-    meses: Optional[str] = None,
+    fecha_inicio: Optional[str] = None,
+    fecha_fin: Optional[str] = None,
     sedes: Optional[str] = None,
     responsables: Optional[str] = None
 ):
     """Datos para gráfico de inventario por mes (con orden correcto de meses)"""
     with get_db() as conn:
+        archive.include(conn, "indicadores", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
-        where_clause, params = build_where_clause(meses, sedes, responsables)
+        where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, responsables)
         
         # Definir el orden de los meses
         orden_meses = {
@@ -4,38 +4,14 @@ Rutas API para Operatividad de Vehículos
 from fastapi import APIRouter, Query
 from typing import Optional
 from ..database import get_db
+from .. import hll, tables
 
 router = APIRouter(prefix="/api/operatividad", tags=["Operatividad Vehículos"])
 
 
 def build_where_clause(fecha_inicio, fecha_fin, sedes, estados, placas):
-    """Construir cláusula WHERE y parámetros"""
-    where_clause = "WHERE 1=1"
-    params = []
-    
-    if fecha_inicio:
-        where_clause += " AND fecha_ejecucion >= ?"
-        params.append(fecha_inicio)
-    if fecha_fin:
-        where_clause += " AND fecha_ejecucion <= ?"
-        params.append(fecha_fin)
-    if sedes:
-        sede_list = sedes.split(",")
-        placeholders = ",".join(["?" for _ in sede_list])
-        where_clause += f" AND sede IN ({placeholders})"
-        params.extend(sede_list)
-    if estados:
-        estado_list = estados.split(",")
-        placeholders = ",".join(["?" for _ in estado_list])
-        where_clause += f" AND estado_vehiculo IN ({placeholders})"
-        params.extend(estado_list)
-    if placas:
-        placa_list = placas.split(",")
-        placeholders = ",".join(["?" for _ in placa_list])
-        where_clause += f" AND placa IN ({placeholders})"
-        params.extend(placa_list)
-    
-    return where_clause, params
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["operatividad_vehiculos"])"""
+    return tables.where("operatividad_vehiculos", fecha_inicio, fecha_fin, sedes=sedes, estados=estados, placas=placas)
 
 
 @router.get("/datos")
@@ -76,16 +52,23 @@ async def get_filtros():
 @router.get("/kpis")
 async def get_kpis(
     fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None,
-    sedes: Optional[str] = None, estados: Optional[str] = None, placas: Optional[str] = None
+    sedes: Optional[str] = None, estados: Optional[str] = None, placas: Optional[str] = None,
+    approx: bool = False
 ):
-    """Obtener KPIs de operatividad"""
+    """Obtener KPIs de operatividad (approx=true: placas únicas con HyperLogLog)"""
     with get_db() as conn:
         cursor = conn.cursor()
         where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, estados, placas)
+        aproximado = None
+        if approx:
+            filtros = {"sede": tables.split_values(sedes) or None, "estado_vehiculo": tables.split_values(estados) or None,
+                       "placa": tables.split_values(placas) or None}
+            aproximado = hll.approx_counts(conn, "operatividad_vehiculos", ["placa"], fecha_inicio, fecha_fin, filtros)
+        placas_unicas = "NULL" if aproximado else "COUNT(DISTINCT placa)"
         
         cursor.execute(f'''
             SELECT SUM(vehiculos_programados), SUM(vehiculos_operativos), SUM(dias_en_taller),
-                   COUNT(DISTINCT placa), COUNT(DISTINCT estado_vehiculo),
+                   {placas_unicas}, COUNT(DISTINCT estado_vehiculo),
                    MIN(fecha_ejecucion), MAX(fecha_ejecucion)
             FROM operatividad_vehiculos {where_clause}
         ''', params)
@@ -94,16 +77,19 @@ async def get_kpis(
         operativos = row[1] or 0
         pct_operacion = (operativos / programados * 100) if programados > 0 else 0
         
-        return {
+        result = {
             "pct_operacion": round(pct_operacion, 1),
             "vehiculos_programados": programados,
             "vehiculos_operativos": operativos,
             "dias_taller": row[2] or 0,
-            "placas_unicas": row[3] or 0,
+            "placas_unicas": aproximado["placa"]["valor"] if aproximado else row[3] or 0,
             "estados": row[4] or 0,
             "fecha_min": row[5],
             "fecha_max": row[6]
         }
+        if approx:
+            result["aproximado"] = aproximado
+        return result
 
 
 @router.get("/grafico/diario")
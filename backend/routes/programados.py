@@ -4,64 +4,20 @@ Rutas para el módulo de Programados vs Ejecutados
 from fastapi import APIRouter, Query
 from typing import Optional
 from backend.database import get_db
+from backend import archive, tables
 
 router = APIRouter(prefix="/api/programados", tags=["programados"])
 
-# Mapeo de meses en español a números
-MESES_MAP = {
-    "ENERO": 1, "FEBRERO": 2, "MARZO": 3, "ABRIL": 4,
-    "MAYO": 5, "JUNIO": 6, "JULIO": 7, "AGOSTO": 8,
-    "SEPTIEMBRE": 9, "OCTUBRE": 10, "NOVIEMBRE": 11, "DICIEMBRE": 12
-}
-
-def build_where_clause(fecha_inicio: Optional[str], fecha_fin: Optional[str], sedes: Optional[str], tipos_inventario: Optional[str]):
-    """Construir cláusula WHERE dinámica"""
-    conditions = []
-    params = []
-    
-    # Filtro de tiempo por fecha YYYY-MM
-    if fecha_inicio and fecha_fin:
-        try:
-            # Convertir YYYY-MM a rango de meses
-            year_inicio, mes_inicio = map(int, fecha_inicio.split('-'))
-            year_fin, mes_fin = map(int, fecha_fin.split('-'))
-            
-            # Obtener meses incluidos
-            meses_incluidos = []
-            for mes_num in range(mes_inicio, mes_fin + 1):
-                for mes_nombre, num in MESES_MAP.items():
-                    if num == mes_num:
-                        meses_incluidos.append(mes_nombre)
-            
-            if meses_incluidos:
-                placeholders = ','.join('?' * len(meses_incluidos))
-                conditions.append(f"mes IN ({placeholders})")
-                params.extend(meses_incluidos)
-        except:
-            pass
-    
-    # Filtro de sedes
-    if sedes:
-        sedes_list = [s.strip() for s in sedes.split(',')]
-        placeholders = ','.join('?' * len(sedes_list))
-        conditions.append(f"sede IN ({placeholders})")
-        params.extend(sedes_list)
-    
-    # Filtro de tipos de inventario
-    if tipos_inventario:
-        tipos_list = [t.strip() for t in tipos_inventario.split(',')]
-        placeholders = ','.join('?' * len(tipos_list))
-        conditions.append(f"tipo_inventario IN ({placeholders})")
-        params.extend(tipos_list)
-    
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
-    return where_clause, params
+def build_where_clause(fecha_inicio, fecha_fin, sedes, tipos_inventario):
+    """Cláusula WHERE y parámetros (filtros declarados en tables.TABLES["programados_ejecutados"])"""
+    return tables.where("programados_ejecutados", fecha_inicio, fecha_fin, sedes=sedes, tipos_inventario=tipos_inventario)
 
 
 @router.get("/filtros")
 def get_filtros():
     """Obtener valores únicos para filtros"""
     with get_db() as conn:
+        archive.include(conn, "programados_ejecutados")
         cursor = conn.cursor()
         
         # Sedes
@@ -89,6 +45,7 @@ def get_kpis(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, tipos_inventario)
     
     with get_db() as conn:
+        archive.include(conn, "programados_ejecutados", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         query = f'''
@@ -98,7 +55,7 @@ def get_kpis(
                 COALESCE(SUM(ejecutados), 0) as total_ejecutados,
                 COALESCE(AVG(indicador_programacion), 0) as promedio_indicador
             FROM programados_ejecutados
-            WHERE {where_clause}
+            {where_clause}
         '''
         
         cursor.execute(query, params)
@@ -123,6 +80,7 @@ def get_por_sede(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, tipos_inventario)
     
     with get_db() as conn:
+        archive.include(conn, "programados_ejecutados", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         query = f'''
@@ -132,7 +90,7 @@ def get_por_sede(
                 COALESCE(SUM(ejecutados), 0) as ejecutados,
                 COALESCE(AVG(indicador_programacion), 0) as indicador
             FROM programados_ejecutados
-            WHERE {where_clause}
+            {where_clause}
             GROUP BY sede
             ORDER BY sede
         '''
@@ -159,6 +117,7 @@ def get_por_tipo(
     where_clause, params = build_where_clause(fecha_inicio, fecha_fin, sedes, tipos_inventario)
     
     with get_db() as conn:
+        archive.include(conn, "programados_ejecutados", fecha_inicio, fecha_fin)
         cursor = conn.cursor()
         
         query = f'''
@@ -168,7 +127,7 @@ def get_por_tipo(
                 COALESCE(SUM(ejecutados), 0) as ejecutados,
                 COALESCE(AVG(indicador_programacion), 0) as indicador
             FROM programados_ejecutados
-            WHERE {where_clause}
+            {where_clause}
             GROUP BY tipo_inventario
             ORDER BY tipo_inventario
         '''
@@ -0,0 +1,106 @@
+"""
+Rutas API para consultas declarativas de agregados: medidas × dimensiones ×
+filtros sobre cualquier tabla de tables.TABLES, en una sola pasada por tabla
+(o por el resumen precalculado que la cubra, ver rollups.plan; los resúmenes
+incluyen los periodos archivados). Si responde la tabla base y las fechas
+tocan periodos archivados, se adjuntan los archivos (archive.include). El
+header X-Query-Source indica qué fuente respondió
+"""
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
+from ..database import get_db
+from .. import archive, rollups, tables
+
+router = APIRouter(prefix="/api/query", tags=["Consultas"])
+
+MAX_CONSULTAS = 20
+
+
+class Consulta(BaseModel):
+    table: str
+    metrics: List[str]
+    dimensions: List[str] = []
+    filters: Dict[str, Union[str, List[str]]] = {}
+    top_n: Optional[int] = Field(default=None, ge=1, le=1000)
+
+
+class Lote(BaseModel):
+    consultas: List[Consulta] = Field(min_length=1, max_length=MAX_CONSULTAS)
+
+
+def _filtros(consulta):
+    """Listas del cuerpo JSON -> 'a,b,c' como en los parámetros de los routers"""
+    return {
+        parametro: ",".join(valor) if isinstance(valor, list) else valor
+        for parametro, valor in consulta.filters.items() if valor
+    }
+
+
+def run(conn, consulta):
+    """Ejecutar una consulta; "fuente" indica si respondió la tabla base o un resumen"""
+    if consulta.table not in tables.TABLES:
+        raise HTTPException(status_code=404, detail=f"Tabla desconocida: {consulta.table}")
+    filtros = _filtros(consulta)
+    fuente, sql, params = rollups.plan(
+        conn, consulta.table, consulta.metrics, consulta.dimensions, filtros, consulta.top_n
+    )
+    # Los resúmenes cubren también el archivo; la tabla base lo adjunta si el rango lo toca
+    if fuente == consulta.table and archive.include(conn, consulta.table, filtros.get("fecha_inicio"), filtros.get("fecha_fin")):
+        fuente = "archivo"
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    columnas = consulta.dimensions + consulta.metrics
+    return {
+        "table": consulta.table,
+        "fuente": fuente,
+        "columnas": columnas,
+        "data": [dict(zip(columnas, row)) for row in cursor.fetchall()],
+    }
+
+
+@router.get("/")
+def get_catalogo():
+    """Tablas consultables con sus filtros, dimensiones, medidas declaradas y columnas numéricas"""
+    return {
+        "funciones": list(tables.FUNCIONES),
+        "data": {
+            table: {
+                "filtros": tables.filter_params(table),
+                "dimensiones": ["mes", *dims.values()],
+                "medidas": list(medidas),
+                "numericas": tables.NUMERIC[table],
+            }
+            for table, (_, dims, medidas) in tables.TABLES.items()
+        },
+    }
+
+
+@router.post("")
+def post_query(consulta: Consulta, response: Response):
+    """Una consulta: {table, metrics, dimensions, filters, top_n}"""
+    with get_db() as conn:
+        resultado = run(conn, consulta)
+    response.headers["X-Query-Source"] = resultado["fuente"]
+    return resultado
+
+
+@router.post("/batch")
+def post_batch(lote: Lote, response: Response):
+    """Varias consultas en un solo viaje (p. ej. todos los gráficos de un tablero)"""
+    with get_db() as conn:
+        resultados = [run(conn, consulta) for consulta in lote.consultas]
+    response.headers["X-Query-Source"] = ", ".join(r["fuente"] for r in resultados)
+    return {"data": resultados}
+
+
+@router.get("/rollups")
+def get_rollups():
+    """Resúmenes declarados y consultas respondidas por cada fuente desde que arrancó la API"""
+    return {
+        "rollups": {
+            nombre: {"tabla": table, "dimensiones": ["mes", *dims]}
+            for nombre, (table, dims) in rollups.ROLLUPS.items()
+        },
+        "aciertos": rollups.hits(),
+    }
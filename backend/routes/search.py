@@ -0,0 +1,28 @@
+"""
+Rutas API para búsqueda de texto completo en descripciones de ítems de todos
+los módulos
+"""
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from ..database import get_db
+from .. import search
+
+router = APIRouter(prefix="/api/search", tags=["Búsqueda"])
+
+
+@router.get("/")
+async def search_items(
+    q: str = Query(..., min_length=1),
+    tablas: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0)
+):
+    """Buscar ítems por descripción o código en todas las tablas (o en las
+    indicadas en tablas, separadas por coma), con fragmentos y conteo por tabla"""
+    lista = tablas.split(",") if tablas else None
+    desconocidas = [t for t in lista or [] if t not in search.ITEM_SOURCES]
+    if desconocidas:
+        raise HTTPException(status_code=400, detail=f"Tablas no indexadas: {', '.join(desconocidas)}")
+    with get_db() as conn:
+        result = search.search_items(conn, q, lista, limit, offset)
+        return {"success": True, "q": q, **result}
@@ -0,0 +1,63 @@
+"""
+Rutas API para los snapshots precompilados de costos y operatividad
+(JSON columnar comprimido, versionado por generación y fecha de importación)
+"""
+import gzip
+from fastapi import APIRouter, HTTPException, Request, Response
+from ..compression import accepted_encodings
+from ..database import get_db
+from .. import snapshots
+
+router = APIRouter(prefix="/api/snapshots", tags=["Snapshots"])
+
+
+def _etag(dataset, version):
+    return f'"{dataset}-{version}"'
+
+
+@router.get("/")
+def list_snapshots():
+    """Datasets disponibles con su generación y versión actuales y los archivos publicados"""
+    with get_db() as conn:
+        versiones = {table: snapshots.version(conn, table) for table, _, _ in snapshots.DATASETS.values()}
+    data = {}
+    for dataset, (table, _, _) in snapshots.DATASETS.items():
+        generacion, version = versiones[table]
+        archivos = {
+            encoding: path.stat().st_size
+            for encoding in ("gz", "br")
+            if (path := snapshots.path_for(dataset, version, encoding)).exists()
+        }
+        data[dataset] = {
+            "tabla": table,
+            "generacion": generacion,
+            "version": version,
+            "url": f"/api/snapshots/{dataset}",
+            "bytes": archivos,
+        }
+    return {"data": data}
+
+
+@router.get("/{dataset}")
+def get_snapshot(dataset: str, request: Request):
+    """Snapshot de la versión actual: br o gzip según Accept-Encoding, 304 si el ETag coincide"""
+    if dataset not in snapshots.DATASETS:
+        raise HTTPException(status_code=404, detail=f"Dataset desconocido: {dataset}")
+    with get_db() as conn:
+        version = snapshots.current(conn, dataset)
+
+    etag = _etag(dataset, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    aceptadas = accepted_encodings(request.headers)
+    br = snapshots.path_for(dataset, version, "br")
+    gz = snapshots.path_for(dataset, version, "gz")
+    if "br" in aceptadas and br.exists():
+        content, headers["Content-Encoding"] = br.read_bytes(), "br"
+    elif "gzip" in aceptadas:
+        content, headers["Content-Encoding"] = gz.read_bytes(), "gzip"
+    else:
+        content = gzip.decompress(gz.read_bytes())
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -0,0 +1,175 @@
+"""
+Scorecard de proveedores por mes.
+
+rebuild() resume oc_descuentos y base_oc_generadas en proveedor_scorecard:
+una fila por fuente, mes y tercero con gasto, descuento, OC distintas,
+ítems y estadísticas de días de entrega, más una fila mes = 'TOTAL' por
+tercero con el acumulado de todos los meses. Los promedios se guardan como
+suma y conteo para poder combinarlos entre meses.
+
+Los top-N de proveedores leen esta tabla: sin filtro de fechas van por el
+índice (fuente, mes, medida DESC) sobre las filas TOTAL; con fechas agregan
+solo los meses pedidos. top() devuelve None si los filtros no se pueden
+responder con meses completos y el llamador debe consultar la tabla base.
+"""
+import calendar
+
+# fuente -> (tabla, columna de % de descuento)
+SOURCES = {
+    "descuentos": ("oc_descuentos", "porcentaje_descuento"),
+    "base": ("base_oc_generadas", "tasa_dcto"),
+}
+MEDIDAS = ["gasto", "descuento", "ocs", "items"]
+TOTAL = "TOTAL"
+
+_COLUMNS = '''
+    COUNT(DISTINCT documento_num), COUNT(*), SUM(COALESCE(item_cantidad, 0)),
+    SUM(COALESCE(total, 0)), SUM(COALESCE(total_dcto, 0)),
+    SUM({pct}), COUNT({pct}),
+    SUM(dias_entrega), COUNT(dias_entrega), MIN(dias_entrega), MAX(dias_entrega)
+'''
+
+
+def rebuild(conn, fuente):
+    """Reconstruir el scorecard de una fuente"""
+    table, pct_col = SOURCES[fuente]
+    columns = _COLUMNS.format(pct=pct_col)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM proveedor_scorecard WHERE fuente = ?", (fuente,))
+    insert = '''
+        INSERT INTO proveedor_scorecard
+        (fuente, mes, tercero_nombre, tercero_id, ocs, items, cantidad, gasto, descuento,
+         pct_descuento_suma, pct_descuento_n, dias_entrega_suma, dias_entrega_n,
+         dias_entrega_min, dias_entrega_max)
+    '''
+    cursor.execute(f'''{insert}
+        SELECT ?, COALESCE(substr(fecha, 1, 7), ''), tercero_nombre, MAX(tercero_id), {columns}
+        FROM {table}
+        GROUP BY 2, tercero_nombre
+    ''', (fuente,))
+    cursor.execute(f'''{insert}
+        SELECT ?, ?, tercero_nombre, MAX(tercero_id), {columns}
+        FROM {table}
+        GROUP BY tercero_nombre
+    ''', (fuente, TOTAL))
+    conn.commit()
+    cursor.execute("SELECT COUNT(*) FROM proveedor_scorecard WHERE fuente = ?", (fuente,))
+    return cursor.fetchone()[0]
+
+
+def month_range(fecha_inicio, fecha_fin):
+    """(mes inicial, mes final) si las fechas cubren meses completos, si no None.
+
+    fecha_inicio: YYYY-MM o YYYY-MM-01. fecha_fin: YYYY-MM-DD con el último día
+    del mes (fecha <= 'YYYY-MM' en la tabla base terminaría en el mes anterior,
+    así que esa forma no se acepta).
+    """
+    mes_inicio = mes_fin = None
+    if fecha_inicio:
+        if len(fecha_inicio) == 7 or (len(fecha_inicio) == 10 and fecha_inicio.endswith("-01")):
+            mes_inicio = fecha_inicio[:7]
+        else:
+            return None
+    if fecha_fin:
+        try:
+            year, month, day = (int(p) for p in fecha_fin.split("-"))
+            if day != calendar.monthrange(year, month)[1]:
+                return None
+        except ValueError:
+            return None
+        mes_fin = fecha_fin[:7]
+    return mes_inicio, mes_fin
+
+
+def top(conn, fuente, medida, limit, fecha_inicio=None, fecha_fin=None, terceros=None, excluir_nulos=False):
+    """Top-N de terceros por medida: [(tercero, gasto, descuento, ocs, items)] o None"""
+    meses = month_range(fecha_inicio, fecha_fin)
+    if meses is None:
+        return None
+    mes_inicio, mes_fin = meses
+    where = "fuente = ?"
+    params = [fuente]
+    if terceros:
+        where += f" AND tercero_nombre IN ({','.join('?' for _ in terceros)})"
+        params.extend(terceros)
+    if excluir_nulos:
+        where += " AND tercero_nombre IS NOT NULL"
+
+    cursor = conn.cursor()
+    if not mes_inicio and not mes_fin:
+        cursor.execute(f'''
+            SELECT tercero_nombre, gasto, descuento, ocs, items
+            FROM proveedor_scorecard
+            WHERE {where} AND mes = ?
+            ORDER BY {medida} DESC LIMIT ?
+        ''', params + [TOTAL, limit])
+        return cursor.fetchall()
+
+    where += " AND mes != '' AND mes != ?"
+    params.append(TOTAL)
+    if mes_inicio:
+        where += " AND mes >= ?"
+        params.append(mes_inicio)
+    if mes_fin:
+        where += " AND mes <= ?"
+        params.append(mes_fin)
+    cursor.execute(f'''
+        SELECT tercero_nombre, SUM(gasto), SUM(descuento), SUM(ocs), SUM(items)
+        FROM proveedor_scorecard
+        WHERE {where}
+        GROUP BY tercero_nombre
+        ORDER BY SUM({medida}) DESC LIMIT ?
+    ''', params + [limit])
+    return cursor.fetchall()
+
+
+def total(conn, fuente, medida):
+    """Suma de una medida sobre todos los terceros (filas TOTAL)"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT SUM({medida}) FROM proveedor_scorecard WHERE fuente = ? AND mes = ?", (fuente, TOTAL))
+    return cursor.fetchone()[0]
+
+
+def _fila(r):
+    return {
+        "ocs": r["ocs"],
+        "items": r["items"],
+        "cantidad": r["cantidad"],
+        "gasto": r["gasto"] or 0,
+        "descuento": r["descuento"] or 0,
+        "pct_descuento_promedio": r["pct_descuento_suma"] / r["pct_descuento_n"] if r["pct_descuento_n"] else None,
+        "dias_entrega_promedio": r["dias_entrega_suma"] / r["dias_entrega_n"] if r["dias_entrega_n"] else None,
+        "dias_entrega_min": r["dias_entrega_min"],
+        "dias_entrega_max": r["dias_entrega_max"],
+    }
+
+
+def detalle(conn, tercero_id):
+    """Scorecard de un tercero por fuente: total y serie mensual (None si no existe)"""
+    cursor = conn.cursor()
+    # Un tercero_id puede aparecer con varios nombres: se suman por mes
+    cursor.execute('''
+        SELECT fuente, mes, GROUP_CONCAT(DISTINCT tercero_nombre) AS nombres,
+            SUM(ocs) AS ocs, SUM(items) AS items, SUM(cantidad) AS cantidad,
+            SUM(gasto) AS gasto, SUM(descuento) AS descuento,
+            SUM(pct_descuento_suma) AS pct_descuento_suma, SUM(pct_descuento_n) AS pct_descuento_n,
+            SUM(dias_entrega_suma) AS dias_entrega_suma, SUM(dias_entrega_n) AS dias_entrega_n,
+            MIN(dias_entrega_min) AS dias_entrega_min, MAX(dias_entrega_max) AS dias_entrega_max
+        FROM proveedor_scorecard
+        WHERE tercero_id = ?
+        GROUP BY fuente, mes
+        ORDER BY fuente, mes
+    ''', (tercero_id,))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+    nombres = sorted({n for r in rows if r["nombres"] for n in r["nombres"].split(",")})
+    result = {"tercero_id": tercero_id, "nombres": nombres}
+    for fuente in SOURCES:
+        filas = [r for r in rows if r["fuente"] == fuente]
+        totales = [_fila(r) for r in filas if r["mes"] == TOTAL]
+        result[fuente] = {
+            "total": totales[0] if totales else None,
+            "meses": [{"mes": r["mes"], **_fila(r)} for r in filas if r["mes"] not in (TOTAL, "")],
+        }
+    return result
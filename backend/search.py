@@ -0,0 +1,212 @@
+"""
+Búsqueda de texto completo con FTS5.
+
+Terceros: rebuild_terceros() junta los nombres de tercero de las 3 tablas de
+compras en la tabla terceros (uno por nombre, con el número de registros) e
+indexa dos tablas FTS5 de contenido externo:
+- terceros_fts: palabras sin tildes con índice de prefijos, para el typeahead
+  ("ferr pint" encuentra "FERRETERÍA Y PINTURAS ...").
+- terceros_trigram: trigramas del nombre normalizado, para coincidencias
+  aproximadas cuando el texto tiene errores de digitación.
+
+Ítems: rebuild_items() indexa en busqueda_fts las descripciones y códigos de
+ítem de compras, indicadores, fiscal_ru, brigadas y errores (una fila por
+tabla, código y descripción, con su número de registros y periodo), para
+encontrar un material en todos los módulos con una sola consulta.
+"""
+import html
+import re
+import unicodedata
+
+# Tablas de compras con nombre de tercero: (tabla, columna, fuente)
+TERCEROS_SOURCES = [
+    ("traza_req_oc", "oc_tercero_nombre", "traza"),
+    ("oc_descuentos", "tercero_nombre", "descuentos"),
+    ("base_oc_generadas", "tercero_nombre", "base"),
+]
+
+# Fracción mínima de trigramas de la búsqueda presentes en el nombre
+MIN_SIMILARITY = 0.5
+# Candidatos por trigramas que se evalúan (sin bm25) antes de ordenar por similitud
+FUZZY_CANDIDATES = 200
+# Los trigramas presentes en más de esta fracción de terceros ("pro", "s a")
+# no se usan para buscar candidatos, solo para calcular la similitud
+COMMON_TRIGRAM_FRACTION = 0.1
+
+
+def normalizar(texto):
+    """Minúsculas sin tildes ni signos, espacios simples"""
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return " ".join(re.findall(r"\w+", texto))
+
+
+def _trigrams(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _quote(term):
+    """Término literal para una expresión MATCH de FTS5"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def rebuild_terceros(conn):
+    """Reconstruir terceros y sus índices FTS5"""
+    cursor = conn.cursor()
+    union = " UNION ALL ".join(
+        f"SELECT {column} AS nombre, '{fuente}' AS fuente FROM {table} WHERE {column} IS NOT NULL AND {column} != ''"
+        for table, column, fuente in TERCEROS_SOURCES
+    )
+    cursor.execute(f'''
+        SELECT nombre, COUNT(*), GROUP_CONCAT(DISTINCT fuente)
+        FROM ({union})
+        GROUP BY nombre
+    ''')
+    rows = [(nombre, normalizar(nombre), registros, fuentes) for nombre, registros, fuentes in cursor.fetchall()]
+
+    cursor.execute("DELETE FROM terceros")
+    cursor.executemany("INSERT INTO terceros (nombre, nombre_norm, registros, fuentes) VALUES (?, ?, ?, ?)", rows)
+    # Contenido externo: 'rebuild' vuelve a leer terceros completa
+    cursor.execute("INSERT INTO terceros_fts(terceros_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO terceros_trigram(terceros_trigram) VALUES ('rebuild')")
+    conn.commit()
+    return len(rows)
+
+
+def search_terceros(conn, q, limit=20, fuente=None):
+    """Terceros que coinciden con q, ordenados por relevancia.
+
+    Primero coincidencias por prefijo de todas las palabras (bm25 y luego
+    número de registros); solo si no hay ninguna se buscan coincidencias
+    aproximadas por trigramas (texto con errores de digitación).
+    """
+    texto = normalizar(q)
+    if not texto:
+        return []
+    cursor = conn.cursor()
+    fuente_sql = " AND t.fuentes LIKE ?" if fuente else ""
+    fuente_params = [f"%{fuente}%"] if fuente else []
+
+    match = " ".join(_quote(palabra) + "*" for palabra in texto.split())
+    cursor.execute(f'''
+        SELECT t.id, t.nombre, t.registros, t.fuentes
+        FROM terceros_fts f JOIN terceros t ON t.id = f.rowid
+        WHERE terceros_fts MATCH ?{fuente_sql}
+        ORDER BY f.rank, t.registros DESC
+        LIMIT ?
+    ''', [match, *fuente_params, limit])
+    results = [
+        {"nombre": r[1], "registros": r[2], "fuentes": r[3].split(","), "coincidencia": "prefijo", "score": 1.0}
+        for r in cursor.fetchall()
+    ]
+
+    query_trigrams = _trigrams(texto)
+    if results or not query_trigrams:
+        return results
+
+    # Candidatos solo por los trigramas poco frecuentes (como mínimo los 3 más raros)
+    cursor.execute(
+        f"SELECT term, doc FROM terceros_trigram_vocab WHERE term IN ({','.join('?' for _ in query_trigrams)})",
+        sorted(query_trigrams)
+    )
+    frecuencias = sorted(cursor.fetchall(), key=lambda r: r[1])
+    if not frecuencias:
+        return []
+    cursor.execute("SELECT MAX(id) FROM terceros")
+    maximo = COMMON_TRIGRAM_FRACTION * (cursor.fetchone()[0] or 0)
+    raros = [term for term, doc in frecuencias if doc <= maximo] or [term for term, _ in frecuencias[:3]]
+
+    match = " OR ".join(_quote(t) for t in raros)
+    cursor.execute(f'''
+        SELECT t.nombre, t.nombre_norm, t.registros, t.fuentes
+        FROM terceros_trigram g JOIN terceros t ON t.id = g.rowid
+        WHERE terceros_trigram MATCH ?{fuente_sql}
+        LIMIT ?
+    ''', [match, *fuente_params, FUZZY_CANDIDATES])
+    aproximados = []
+    for nombre, nombre_norm, registros, fuentes in cursor.fetchall():
+        score = len(query_trigrams & _trigrams(nombre_norm)) / len(query_trigrams)
+        if score >= MIN_SIMILARITY:
+            aproximados.append({
+                "nombre": nombre, "registros": registros, "fuentes": fuentes.split(","),
+                "coincidencia": "aproximada", "score": round(score, 3),
+            })
+    aproximados.sort(key=lambda r: (-r["score"], -r["registros"]))
+    return aproximados[:limit]
+
+
+# ==================== DESCRIPCIONES DE ÍTEMS ====================
+# tabla -> (columna código, columna descripción, columna fecha o None si solo tiene mes)
+ITEM_SOURCES = {
+    "traza_req_oc": ("item_codigo", "item_descripcion", "req_fecha"),
+    "oc_descuentos": ("item_codigo", "item_descripcion", "fecha"),
+    "base_oc_generadas": ("item_codigo", "item_descripcion", "fecha"),
+    "indicadores": ("codigo", "descripcion", None),
+    "fiscal_ru": ("item", "descripcion", None),
+    "brigadas": ("item_codigo", "descripcion", None),
+    "errores": ("codigo", "descripcion", "fecha"),
+}
+
+SNIPPET_TOKENS = 12
+
+
+def rebuild_items(conn, table):
+    """Reindexar en busqueda_fts las descripciones de una tabla (una fila por código y descripción)"""
+    codigo_col, descripcion_col, fecha_col = ITEM_SOURCES[table]
+    fechas = f"MIN({fecha_col}), MAX({fecha_col}), NULL" if fecha_col else "NULL, NULL, GROUP_CONCAT(DISTINCT mes)"
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM busqueda_fts WHERE tabla = ?", (table,))
+    cursor.execute(f'''
+        INSERT INTO busqueda_fts (descripcion, codigo, tabla, registros, fecha_min, fecha_max, meses)
+        SELECT {descripcion_col}, {codigo_col}, ?, COUNT(*), {fechas}
+        FROM {table}
+        WHERE {descripcion_col} IS NOT NULL AND {descripcion_col} != ''
+        GROUP BY {descripcion_col}, {codigo_col}
+    ''', (table,))
+    conn.commit()
+    return cursor.rowcount
+
+
+def search_items(conn, q, tablas=None, limit=50, offset=0):
+    """Descripciones (y códigos) que coinciden con q en todas las tablas.
+
+    Devuelve los resultados ordenados por bm25 con un fragmento resaltado con
+    <mark> (el resto del texto va escapado) y el número de coincidencias por
+    tabla. Todas las palabras deben coincidir, como prefijo.
+    """
+    palabras = normalizar(q).split()
+    if not palabras:
+        return {"total": 0, "por_tabla": {}, "data": []}
+    match = " ".join(_quote(palabra) + "*" for palabra in palabras)
+    where = "busqueda_fts MATCH ?"
+    params = [match]
+    if tablas:
+        where += f" AND tabla IN ({','.join('?' for _ in tablas)})"
+        params.extend(tablas)
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT tabla, COUNT(*) FROM busqueda_fts WHERE {where} GROUP BY tabla", params)
+    por_tabla = {r[0]: r[1] for r in cursor.fetchall()}
+
+    cursor.execute(f'''
+        SELECT tabla, codigo, descripcion, registros, fecha_min, fecha_max, meses,
+            snippet(busqueda_fts, 0, '\x02', '\x03', '…', {SNIPPET_TOKENS})
+        FROM busqueda_fts
+        WHERE {where}
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    ''', params + [limit, offset])
+    data = [
+        {
+            "tabla": r[0],
+            "codigo": r[1],
+            "descripcion": r[2],
+            "registros": r[3],
+            "fecha_min": r[4],
+            "fecha_max": r[5],
+            "meses": r[6].split(",") if r[6] else [],
+            "snippet": html.escape(r[7]).replace("\x02", "<mark>").replace("\x03", "</mark>"),
+        }
+        for r in cursor.fetchall()
+    ]
+    return {"total": sum(por_tabla.values()), "por_tabla": por_tabla, "data": data}
@@ -0,0 +1,140 @@
+"""
+Snapshots precompilados de los datasets que las páginas cargan completos.
+
+costos_mensuales.html y operatividad_vehiculos.html trabajan en el navegador
+con todas las filas de su tabla. publish() guarda, por generación de datos, un
+JSON columnar comprimido (gzip y, si está instalado el paquete brotli,
+también .br) con las columnas que usa cada página. Las columnas de texto
+repetitivo van con diccionario ({"diccionario": [...], "codigos": [...]},
+-1 = NULL), el resto como lista de valores. derived.refresh() publica los
+snapshots después de aumentar la generación, así el nombre del archivo
+corresponde a la versión de los datos.
+
+La versión es la generación más la fecha de la importación que la produjo
+(data_generations.actualizado): una BD nueva vuelve a empezar en la
+generación 1, y sin la fecha repetiría nombres de archivo y ETags de otra
+base. Los archivos van al lado de la base ({base}.snapshots/), así una BD
+sintética o de prueba no pisa los snapshots de producción.
+"""
+import gzip
+import json
+from pathlib import Path
+
+from . import database
+from .config import SNAPSHOT_DIR
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# dataset -> (tabla, columna fecha para ordenar, columnas)
+DATASETS = {
+    "costos_mensuales": ("costos_mensuales", "fecha", [
+        "fecha", "catalogo", "ciudad", "tercero", "neto", "proyecto", "descripcion",
+    ]),
+    "operatividad_vehiculos": ("operatividad_vehiculos", "fecha_ejecucion", [
+        "fecha_ejecucion", "sede", "estado_vehiculo", "placa", "vehiculos_programados",
+        "vehiculos_operativos", "dias_en_taller", "tipo_vehiculo", "brigada", "conductor",
+        "contrato", "gps", "justificacion_no_salida", "tipo_dano", "dano_inoperatividad",
+        "motivo_inoperatividad", "observacion_inoperatividad", "tipo_mantenimiento",
+        "km_mantenimiento", "propietario", "indicador",
+    ]),
+}
+
+# Generaciones que se conservan en disco por dataset (la actual y la anterior)
+KEEP_GENERATIONS = 2
+
+
+def directory():
+    """Carpeta de los snapshots (la de la base actual, también cuando synthetic_data cambia DB_PATH)"""
+    if SNAPSHOT_DIR:
+        return Path(SNAPSHOT_DIR)
+    return database.DB_PATH.parent / f"{database.DB_PATH.stem}.snapshots"
+
+
+def version(conn, table):
+    """(generación, versión 'generación-AAAAMMDDHHMMSS') de los datos actuales de la tabla"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT generacion, actualizado FROM data_generations WHERE tabla = ?", (table,))
+    row = cursor.fetchone()
+    if row is None:
+        return 0, "0"
+    sello = "".join(c for c in (row[1] or "") if c.isdigit())
+    return row[0], f"{row[0]}-{sello}" if sello else str(row[0])
+
+
+def path_for(dataset, version, encoding="gz"):
+    return directory() / f"{dataset}.{version}.json.{encoding}"
+
+
+def _encode_column(values):
+    """Texto con valores repetidos -> diccionario + códigos; lo demás, lista"""
+    texts = [v for v in values if v is not None]
+    if not texts or not all(isinstance(v, str) for v in texts):
+        return values
+    distinct = {}
+    codes = [-1 if v is None else distinct.setdefault(v, len(distinct)) for v in values]
+    if len(distinct) * 2 > len(values):
+        return values
+    return {"diccionario": list(distinct), "codigos": codes}
+
+
+def build(conn, dataset):
+    """(versión, JSON columnar en bytes sin comprimir) del dataset en la generación actual"""
+    table, fecha_col, columns = DATASETS[dataset]
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {fecha_col} DESC")
+    rows = cursor.fetchall()
+    generacion, actual = version(conn, table)
+    snapshot = {
+        "dataset": dataset,
+        "generacion": generacion,
+        "version": actual,
+        "filas": len(rows),
+        "columnas": {
+            column: _encode_column([row[i] for row in rows])
+            for i, column in enumerate(columns)
+        },
+    }
+    return actual, json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def publish(conn, dataset):
+    """Escribir el snapshot de la versión actual (.gz y .br) y borrar los viejos"""
+    actual, data = build(conn, dataset)
+    directory().mkdir(parents=True, exist_ok=True)
+    files = {"gz": gzip.compress(data, compresslevel=9)}
+    if brotli is not None:
+        files["br"] = brotli.compress(data, quality=11)
+    for encoding, content in files.items():
+        path = path_for(dataset, actual, encoding)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(content)
+        tmp.replace(path)
+    # Una variante que no se escribió ahora (p. ej. .br de antes de quitar brotli) quedaría
+    # sirviéndose con el ETag de esta versión
+    for encoding in ("gz", "br"):
+        if encoding not in files:
+            path_for(dataset, actual, encoding).unlink(missing_ok=True)
+
+    # Conservar solo las últimas versiones (por fecha de escritura: una BD nueva reinicia las generaciones)
+    versiones = {}
+    for p in directory().glob(f"{dataset}.*.json.*"):
+        v = p.name[len(dataset) + 1:].split(".json.")[0]
+        versiones[v] = max(versiones.get(v, 0), p.stat().st_mtime_ns)
+    for vieja in sorted(versiones, key=versiones.get, reverse=True)[KEEP_GENERATIONS:]:
+        if vieja != actual:
+            for p in directory().glob(f"{dataset}.{vieja}.json.*"):
+                p.unlink()
+    print(f"📦 Snapshot {dataset} (versión {actual}): {len(data):,} B -> "
+          + ", ".join(f"{enc} {len(content):,} B" for enc, content in files.items()))
+    return actual
+
+
+def current(conn, dataset):
+    """Versión del snapshot actual, publicándolo si todavía no existe"""
+    _, actual = version(conn, DATASETS[dataset][0])
+    if not path_for(dataset, actual).exists():
+        actual = publish(conn, dataset)
+    return actual
@@ -0,0 +1,632 @@
+"""
+Generador de datos sintéticos para las tablas de Logística HESEGO.
+
+Escribe filas realistas directamente en el esquema creado por init_db(),
+o como libros Excel con los encabezados que espera import_data.py, con
+volúmenes de producción multiplicados por un factor de escala, para poder
+medir importación, planes de consulta y latencias sin los Excel reales.
+
+Las tablas de almacenes llevan el año en anio/periodo; con --anios N sus
+filas se reparten entre los últimos N años (YEAR, YEAR-1...), para medir la
+poda por periodo con historia acumulada.
+
+Uso:
+    python -m backend.synthetic_data ruta/logistica_sintetica.db --scale 10
+    python -m backend.synthetic_data ruta/logistica_sintetica.db --anios 3
+    python -m backend.synthetic_data ruta/data --formato excel
+"""
+import argparse
+import math
+import random
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+
+from . import database, derived
+from .tables import periodo
+
+# Volumen aproximado de producción por tabla (escala 1×)
+PRODUCTION_ROWS = {
+    "costos_mensuales": 50000,
+    "operatividad_vehiculos": 100000,
+    "traza_req_oc": 60000,
+    "oc_descuentos": 40000,
+    "base_oc_generadas": 40000,
+    "indicadores": 20000,
+    "fiscal_ru": 20000,
+    "brigadas": 10000,
+    "errores": 5000,
+    "programados_ejecutados": 300,
+    "gestion": 300,
+}
+
+YEAR = 2025
+
+MESES = [
+    "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
+    "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
+]
+
+SEDES = ["BOGOTA", "MEDELLIN", "CALI", "BARRANQUILLA", "BUCARAMANGA", "CARTAGENA", "VILLAVICENCIO", "NEIVA"]
+CATALOGOS = ["COMBUSTIBLE", "MANTENIMIENTO", "LLANTAS", "PEAJES", "SEGUROS", "REPUESTOS", "LAVADO", "PARQUEADERO"]
+TIPOS_VEHICULO = ["CAMIONETA", "CAMION", "MOTO", "GRUA", "FURGON"]
+ESTADOS_VEHICULO = ["OPERATIVO", "EN TALLER", "INOPERATIVO", "SIN CONDUCTOR", "MANTENIMIENTO PREVENTIVO"]
+ESTADOS_REQ = ["APROBADA", "CERRADA", "PENDIENTE", "ANULADA", "PEND. APROBACION"]
+ESTADOS_OC = ["APROBADA", "CERRADA", "PENDIENTE", "ANULADA", "PENDIENTE AUTORIZACION"]
+ESTADOS_DOC = ["APROBADA", "CERRADA", "ANULADA", "PENDIENTE"]
+PROCESOS = ["TRANSPORTE", "ALMACEN", "OPERACIONES", "MANTENIMIENTO", "ADMINISTRATIVO", "HSE"]
+TIPOS_DOC = ["OC", "OS", "OCI"]
+TIPOS_INVENTARIO = ["ROTATIVO", "GENERAL", "SELECTIVO"]
+ESTADOS_INVENTARIO = ["CUADRADO", "SOBRANTE", "FALTANTE"]
+TIPOS_ERROR = ["Si", "No", "Revisar"]
+MATERIALES = [
+    "CABLE", "GUANTE", "CASCO", "BOTA", "TORNILLO", "FILTRO", "ACEITE", "LLANTA",
+    "CONECTOR", "CINTA", "BREAKER", "TUBO", "MEDIDOR", "ABRAZADERA", "BATERIA", "CHALECO"
+]
+
+# Cardinalidades a escala 1×. Sedes, meses y usuarios son fijos; placas,
+# terceros e ítems crecen con la raíz del factor de escala, como en los
+# datos reales, donde el catálogo crece más lento que el volumen.
+CARDINALIDADES = {
+    "placas": 250,
+    "terceros": 1200,
+    "items": 3000,
+}
+N_USUARIOS = 40
+
+# Límite de filas de una hoja Excel (incluye la fila de encabezados)
+EXCEL_MAX_ROWS = 1048575
+
+
+def _dia(rng, year=YEAR):
+    """Fecha aleatoria dentro del año"""
+    return date(year, 1, 1) + timedelta(days=rng.randrange(365))
+
+
+def cardinalidades(scale=1):
+    """Número de placas, terceros e ítems distintos para un factor de escala"""
+    factor = math.sqrt(scale)
+    return {k: max(int(v * factor), 1) for k, v in CARDINALIDADES.items()}
+
+
+def rows_per_table(scale=1):
+    """Filas a generar por tabla para un factor de escala"""
+    return {t: max(int(n * scale), 1) for t, n in PRODUCTION_ROWS.items()}
+
+
+def _catalogo_maestro(rng, scale=1):
+    """Dimensiones compartidas por todas las tablas"""
+    n = cardinalidades(scale)
+    letras = "ABCDEFGHJKLMNPRSTUVWXYZ"
+    placas = set()
+    while len(placas) < n["placas"]:
+        placas.add("".join(rng.choice(letras) for _ in range(3)) + f"{rng.randrange(1000):03d}")
+    placas = sorted(placas)
+    terceros = [f"PROVEEDOR {i:05d} S.A.S" for i in range(1, n["terceros"] + 1)]
+    usuarios = [f"USUARIO{i:02d}" for i in range(1, N_USUARIOS + 1)]
+    items = [
+        (100000 + i, f"{rng.choice(MATERIALES)} REF {i:06d}")
+        for i in range(n["items"])
+    ]
+    return {"placas": placas, "terceros": terceros, "usuarios": usuarios, "items": items}
+
+
+def _rows_costos_mensuales(rng, n, dims):
+    for _ in range(n):
+        yield {
+            "fecha": _dia(rng).isoformat(),
+            "catalogo": rng.choice(CATALOGOS),
+            "neto": round(rng.uniform(10000, 5000000), 2),
+            "ciudad": rng.choice(SEDES),
+            "proyecto": f"PROYECTO {rng.randrange(1, 30):02d}",
+            "tercero": rng.choice(dims["terceros"][:300]),
+            "descripcion": f"{rng.choice(CATALOGOS)} {rng.choice(dims['placas'])}",
+        }
+
+
+def _rows_operatividad_vehiculos(rng, n, dims):
+    for _ in range(n):
+        estado = rng.choice(ESTADOS_VEHICULO)
+        operativo = 1.0 if estado == "OPERATIVO" else 0.0
+        yield {
+            "fecha_ejecucion": _dia(rng).isoformat(),
+            "placa": rng.choice(dims["placas"]),
+            "tipo_vehiculo": rng.choice(TIPOS_VEHICULO),
+            "sede": rng.choice(SEDES),
+            "estado_vehiculo": estado,
+            "brigada": f"BRIGADA {rng.randrange(1, 60):02d}",
+            "conductor": f"CONDUCTOR {rng.randrange(1, 400):03d}",
+            "contrato": f"CTO-{rng.randrange(1, 12):02d}",
+            "gps": rng.choice(["SI", "NO"]),
+            "justificacion_no_salida": None if operativo else "SIN PROGRAMACION",
+            "tipo_dano": None if operativo else rng.choice(["MECANICO", "ELECTRICO", "LLANTAS"]),
+            "dano_inoperatividad": None,
+            "motivo_inoperatividad": None,
+            "observacion_inoperatividad": None,
+            "tipo_mantenimiento": rng.choice([None, "PREVENTIVO", "CORRECTIVO"]),
+            "km_mantenimiento": float(rng.randrange(0, 200000)),
+            "vehiculos_programados": 1.0,
+            "vehiculos_operativos": operativo,
+            "dias_en_taller": 0.0 if operativo else float(rng.randrange(0, 15)),
+            "propietario": rng.choice(["PROPIO", "ALQUILADO"]),
+            "indicador": operativo,
+        }
+
+
+def _rows_traza_req_oc(rng, n, dims):
+    req_numero = 10000
+    emitted = 0
+    while emitted < n:
+        req_numero += 1
+        req_fecha = _dia(rng)
+        req_estado = rng.choices(ESTADOS_REQ, weights=[50, 30, 8, 7, 5])[0]
+        aprobar = rng.randrange(0, 10)
+        tiene_oc = req_estado in ("APROBADA", "CERRADA")
+        oc_numero = 50000 + req_numero if tiene_oc else None
+        oc_estado = rng.choices(ESTADOS_OC, weights=[45, 35, 8, 7, 5])[0] if tiene_oc else None
+        generar = rng.randrange(0, 20) if tiene_oc else None
+        aprobacion = rng.randrange(0, 8) if tiene_oc else None
+        recepcion = float(rng.randrange(1, 40)) if tiene_oc and rng.random() < 0.7 else None
+        almacen = float(rng.randrange(0, 15)) if recepcion is not None and rng.random() < 0.8 else None
+        oc_fecha = req_fecha + timedelta(days=aprobar + (generar or 0))
+        tercero_idx = rng.randrange(len(dims["terceros"]))
+        for _ in range(min(rng.randrange(1, 6), n - emitted)):
+            codigo, descripcion = rng.choice(dims["items"])
+            yield {
+                "req_fecha_entrega": (req_fecha + timedelta(days=15)).isoformat(),
+                "req_fecha": req_fecha.isoformat(),
+                "req_usuario": rng.choice(dims["usuarios"]),
+                "req_fecha_autorizada": (req_fecha + timedelta(days=aprobar)).isoformat(),
+                "req_usuario_autorizador": rng.choice(dims["usuarios"][:10]),
+                "req_emp": 1,
+                "req_suc": 1,
+                "req_descripcion_tipo_doc": "REQUISICION DE COMPRA",
+                "req_tipo": "RQ",
+                "req_numero": req_numero,
+                "req_estado": req_estado,
+                "item_codigo": codigo,
+                "item_descripcion": descripcion,
+                "cotizacion_tipo": None,
+                "cotizacion_numero": None,
+                "oc_fecha": oc_fecha.isoformat() if tiene_oc else None,
+                "oc_usuario": rng.choice(dims["usuarios"][10:20]) if tiene_oc else None,
+                "oc_fecha_autorizacion": (oc_fecha + timedelta(days=aprobacion)).isoformat() if tiene_oc else None,
+                "oc_usuario_autorizacion": rng.choice(dims["usuarios"][20:25]) if tiene_oc else None,
+                "oc_tipo": "OC" if tiene_oc else None,
+                "oc_numero": oc_numero,
+                "oc_estado": oc_estado,
+                "oc_tercero_id": f"900{tercero_idx:06d}" if tiene_oc else None,
+                "oc_tercero_suc": 1 if tiene_oc else None,
+                "oc_tercero_nombre": dims["terceros"][tercero_idx] if tiene_oc else None,
+                "entrega_servicio_fecha": None,
+                "entrega_servicio_usuario": rng.choice(dims["usuarios"][25:32]) if recepcion is not None else None,
+                "entrega_servicio_tipo": None,
+                "entrega_servicio_numero": None,
+                "entrega_almacen_fecha": None,
+                "entrega_almacen_usuario": rng.choice(dims["usuarios"][32:]) if almacen is not None else None,
+                "entrega_almacen_tipo": None,
+                "entrega_almacen_numero": None,
+                "factura_compra_fecha": None,
+                "factura_compra_tipo": None,
+                "factura_compra_numero": None,
+                "devolucion_compra_fecha": None,
+                "devolucion_compra_tipo": None,
+                "devolucion_compra_numero": None,
+                "dias_aprobar_rq": aprobar,
+                "dias_generar_oc": generar,
+                "dias_aprobacion_oc": aprobacion,
+                "dias_recepcion_servicio": recepcion,
+                "dias_entrada_almacen": almacen,
+                "mes": float(req_fecha.month),
+                "suma_rq": 1,
+                "req_pendiente": database.estado_pendiente(req_estado),
+                "oc_pendiente": database.estado_pendiente(oc_estado),
+            }
+            emitted += 1
+
+
+def _rows_documentos_oc(rng, n, dims, con_proceso):
+    documento_num = 70000
+    emitted = 0
+    while emitted < n:
+        documento_num += 1
+        fecha = _dia(rng)
+        dias_entrega = rng.randrange(1, 30)
+        tercero_idx = min(int(rng.paretovariate(1.2)) - 1, len(dims["terceros"]) - 1)
+        estado = rng.choice(ESTADOS_DOC)
+        proceso = rng.choice(PROCESOS)
+        for _ in range(min(rng.randrange(1, 8), n - emitted)):
+            codigo, descripcion = rng.choice(dims["items"])
+            cantidad = float(rng.randrange(1, 100))
+            costo = round(rng.uniform(1000, 500000), 2)
+            total_item = round(cantidad * costo, 2)
+            tasa_dcto = rng.choice([0.0, 0.0, 0.0, 2.0, 5.0, 10.0])
+            total_dcto = round(total_item * tasa_dcto / 100, 2)
+            subtotal = total_item - total_dcto
+            total_iva = round(subtotal * 0.19, 2)
+            row = {
+                "fecha": fecha.isoformat(),
+                "fecha_entrega": (fecha + timedelta(days=dias_entrega)).isoformat(),
+                "dias_entrega": dias_entrega,
+                "documento_emp": 1,
+                "documento_suc": 1,
+                "documento_tipo": rng.choice(TIPOS_DOC),
+                "documento_num": documento_num,
+                "item_codigo": codigo,
+                "item_descripcion": descripcion,
+                "item_bodega": float(rng.randrange(1, 20)),
+                "item_cantidad": cantidad,
+                "talla": None,
+                "item_unidad": "UND",
+                "item_proyecto": rng.randrange(1, 30),
+                "item_solicitante": rng.choice(dims["usuarios"]),
+                "item_fecha_requ": fecha.isoformat(),
+                "tercero_id": f"900{tercero_idx:06d}",
+                "tercero_nombre": dims["terceros"][tercero_idx],
+                "costo_unitario": costo,
+                "total_item": total_item,
+                "tasa_dcto": tasa_dcto,
+                "total_dcto": total_dcto,
+                "subtotal": subtotal,
+                "tasa_iva": 19.0,
+                "total_iva": total_iva,
+                "total": round(subtotal + total_iva, 2),
+                "estado": estado,
+                "moneda": "COP",
+                "observaciones": None,
+            }
+            if con_proceso:
+                row["proceso"] = proceso
+                row["concatenado"] = f"{documento_num}-{codigo}"
+                row["porcentaje_descuento"] = tasa_dcto
+            yield row
+            emitted += 1
+
+
+def _rows_oc_descuentos(rng, n, dims):
+    return _rows_documentos_oc(rng, n, dims, con_proceso=True)
+
+
+def _rows_base_oc_generadas(rng, n, dims):
+    return _rows_documentos_oc(rng, n, dims, con_proceso=False)
+
+
+def _rows_indicadores(rng, n, dims):
+    for _ in range(n):
+        codigo, descripcion = rng.choice(dims["items"])
+        inicial = float(rng.randrange(0, 500))
+        final = max(inicial + rng.randrange(-50, 200), 0.0)
+        diferencia = float(rng.choice([0, 0, 0, rng.randrange(-10, 10)]))
+        precio = round(rng.uniform(500, 200000), 2)
+        yield {
+            "mes": rng.choice(MESES),
+            "sede": rng.choice(SEDES),
+            "responsable": f"ALMACENISTA {rng.randrange(1, 25):02d}",
+            "codigo": codigo,
+            "descripcion": descripcion,
+            "inventario_inicial": inicial,
+            "total_entregado": float(rng.randrange(0, 200)),
+            "total_consumos": float(rng.randrange(0, 200)),
+            "total_reintegros": float(rng.randrange(0, 20)),
+            "denuncio_fiscalia": 0,
+            "inventario_final": final,
+            "diferencia": diferencia,
+            "precio_unidad": precio,
+            "precio_total": round(precio * final, 2),
+            "costo_inventario_final": round(precio * final, 2),
+            "costo_diferencia": round(precio * diferencia, 2),
+            "objetivo": 0.98,
+        }
+
+
+def _rows_fiscal_ru(rng, n, dims):
+    for _ in range(n):
+        codigo, descripcion = rng.choice(dims["items"])
+        saldo = float(rng.randrange(0, 500))
+        diferencia = float(rng.choice([0, 0, 0, rng.randrange(-10, 10)]))
+        costo = round(rng.uniform(500, 200000), 2)
+        yield {
+            "mes": rng.choice(MESES),
+            "item": str(codigo),
+            "descripcion": descripcion,
+            "bodega": f"BODEGA {rng.randrange(1, 20):02d}",
+            "sede": rng.choice(SEDES),
+            "saldo_final": saldo,
+            "costo_promedio": costo,
+            "costo_total": round(costo * saldo, 2),
+            "inf_fisico": saldo + diferencia,
+            "diferencia": diferencia,
+            "estado": "CUADRADO" if diferencia == 0 else ("SOBRANTE" if diferencia > 0 else "FALTANTE"),
+            "costo_diferencia": round(costo * diferencia, 2),
+            "unidad": "UND",
+            "clasificacion": rng.choice(["A", "B", "C"]),
+            "descripcion3": None,
+            "tipo_inventario": rng.choice(TIPOS_INVENTARIO),
+            "objetivo": 0.98,
+        }
+
+
+def _rows_brigadas(rng, n, dims):
+    for _ in range(n):
+        codigo, descripcion = rng.choice(dims["items"])
+        neto = float(rng.randrange(1, 100))
+        conteo = neto + rng.choice([0, 0, 0, rng.randrange(-5, 5)])
+        costo_unit = round(rng.uniform(500, 100000), 2)
+        costo_total = round(costo_unit * neto, 2)
+        costo_diferencia = round(costo_unit * (conteo - neto), 2)
+        yield {
+            "mes": rng.choice(MESES),
+            "sede": rng.choice(SEDES),
+            "item_codigo": codigo,
+            "descripcion": descripcion,
+            "tercero_identificacion": f"10{rng.randrange(10**7):07d}",
+            "tercero_nombre": f"TECNICO {rng.randrange(1, 300):03d}",
+            "neto": neto,
+            "conteo": conteo,
+            "reconteo": conteo,
+            "diferencia": conteo - neto,
+            "estado": "CUADRADO" if conteo == neto else "DIFERENCIA",
+            "costo_unit": costo_unit,
+            "costo_total": costo_total,
+            "costo_diferencia": costo_diferencia,
+            "desviacion": (costo_diferencia / costo_total) * 100 if costo_total else 0,
+        }
+
+
+def _rows_errores(rng, n, dims):
+    for _ in range(n):
+        fecha = _dia(rng)
+        codigo, descripcion = rng.choice(dims["items"])
+        cantidad = rng.randrange(1, 50)
+        costo = round(rng.uniform(500, 100000), 2)
+        yield {
+            "mes": MESES[fecha.month - 1],
+            "sede": rng.choice(SEDES),
+            "error": rng.choices(TIPOS_ERROR, weights=[10, 80, 10])[0],
+            "bodega": f"BODEGA {rng.randrange(1, 20):02d}",
+            "doc": rng.choice(["SA", "EA", "TR"]),
+            "fecha": fecha.isoformat(),
+            "tipo_numero": f"{rng.choice(['SA', 'EA', 'TR'])}-{rng.randrange(1, 99999)}",
+            "codigo": codigo,
+            "descripcion": descripcion,
+            "tercero": rng.randrange(10**7, 10**8),
+            "nombre": f"TECNICO {rng.randrange(1, 300):03d}",
+            "cantidad": cantidad,
+            "costo": costo,
+            "total": round(costo * cantidad, 2),
+            "cuenta_doc": None,
+            "nombre_cuenta": None,
+            "observaciones": None,
+        }
+
+
+def _rows_programados_ejecutados(rng, n, dims):
+    for _ in range(n):
+        programados = float(rng.randrange(1, 20))
+        ejecutados = float(rng.randrange(0, int(programados) + 1))
+        yield {
+            "mes": rng.choice(MESES),
+            "sede": rng.choice(SEDES),
+            "tipo_inventario": rng.choice(TIPOS_INVENTARIO),
+            "programados": programados,
+            "ejecutados": ejecutados,
+            "indicador_programacion": ejecutados / programados,
+        }
+
+
+def _rows_gestion(rng, n, dims):
+    for _ in range(n):
+        ejecucion = _dia(rng)
+        dias = rng.randrange(0, 10)
+        dias_respuesta = rng.randrange(0, 10)
+        yield {
+            "mes": MESES[ejecucion.month - 1],
+            "sede": rng.choice(SEDES),
+            "tipo_inventario": rng.choice(TIPOS_INVENTARIO),
+            "almacenista": f"ALMACENISTA {rng.randrange(1, 25):02d}",
+            "fecha_ejecucion_inventario": ejecucion.isoformat(),
+            "fecha_reporte_operaciones": (ejecucion + timedelta(days=dias)).isoformat(),
+            "dias": dias,
+            "indicador_inventario": "Dentro del plazo" if dias <= 5 else "Fuera del plazo",
+            "area": rng.choice(["OPERACIONES", "CONTABILIDAD", "COMPRAS"]),
+            "responsable": f"RESPONSABLE {rng.randrange(1, 15):02d}",
+            "fecha_respuesta": (ejecucion + timedelta(days=dias + dias_respuesta)).isoformat(),
+            "dias_respuesta": dias_respuesta,
+            "indicador_respuesta": "Dentro del plazo" if dias_respuesta <= 5 else "Fuera del plazo",
+        }
+
+
+GENERATORS = {
+    "costos_mensuales": _rows_costos_mensuales,
+    "operatividad_vehiculos": _rows_operatividad_vehiculos,
+    "traza_req_oc": _rows_traza_req_oc,
+    "oc_descuentos": _rows_oc_descuentos,
+    "base_oc_generadas": _rows_base_oc_generadas,
+    "indicadores": _rows_indicadores,
+    "fiscal_ru": _rows_fiscal_ru,
+    "brigadas": _rows_brigadas,
+    "errores": _rows_errores,
+    "programados_ejecutados": _rows_programados_ejecutados,
+    "gestion": _rows_gestion,
+}
+
+
+def _tag_partitions(rows, anios, seed):
+    """Agregar anio/periodo a las filas de una tabla de almacenes (un año al azar de anios)"""
+    rng = random.Random(seed)
+    for row in rows:
+        anio = anios[0] if len(anios) == 1 else rng.choice(anios)
+        yield {**row, "anio": anio, "periodo": periodo(anio, row["mes"])}
+
+
+def _insert_rows(conn, table, rows, batch_size=5000):
+    """Insertar filas (dicts) por lotes"""
+    total = 0
+    batch = []
+    columns = None
+    for row in rows:
+        if columns is None:
+            columns = list(row.keys())
+            query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        batch.append(tuple(row[c] for c in columns))
+        if len(batch) >= batch_size:
+            conn.executemany(query, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(query, batch)
+        total += len(batch)
+    return total
+
+
+def generate_database(db_path, scale=1, seed=42, anios=1):
+    """Crear una BD sintética completa en db_path y devolver los conteos por tabla"""
+    db_path = Path(db_path)
+    if db_path.exists():
+        db_path.unlink()
+
+    database.DB_PATH = db_path
+    database.init_db()
+
+    rng = random.Random(seed)
+    dims = _catalogo_maestro(rng, scale)
+    filas = rows_per_table(scale)
+    years = [YEAR - i for i in range(anios)]
+    counts = {}
+    conn = sqlite3.connect(str(db_path))
+    try:
+        for table, generator in GENERATORS.items():
+            rows = generator(rng, filas[table], dims)
+            if table in database.PARTITIONED_TABLES:
+                rows = _tag_partitions(rows, years, seed)
+            counts[table] = _insert_rows(conn, table, rows)
+            conn.commit()
+            print(f"   {table}: {counts[table]:,} registros")
+    finally:
+        conn.close()
+    derived.refresh(counts)
+    return counts
+
+
+# Encabezados Excel de las hojas que import_data.py lee sin diccionario de columnas
+ERRORES_HEADERS = {
+    "Fecha": "fecha",
+    "Zona": "sede",
+    "Error": "error",
+    "Bodega": "bodega",
+    "DOC": "doc",
+    "Tipo numero": "tipo_numero",
+    "Codigo": "codigo",
+    "Descripcion": "descripcion",
+    "Tercero": "tercero",
+    "Nombre": "nombre",
+    "Cantidad": "cantidad",
+    "Costo": "costo",
+    "Total": "total",
+    "Codigo6": "cuenta_doc",
+    "Nombre7": "nombre_cuenta",
+    "OBS": "observaciones"
+}
+
+PROGRAMADOS_HEADERS = {
+    "FECHA PROPUESTA": "mes",
+    "SEDE": "sede",
+    "TIPO INVENTARIO ": "tipo_inventario",
+    "PROGRAMADOS": "programados",
+    "EJECUTADOS": "ejecutados",
+    "Indicador Programacion": "indicador_programacion"
+}
+
+GESTION_HEADERS = {
+    "MES": "mes",
+    "SEDE": "sede",
+    "TIPO INVENTARIO": "tipo_inventario",
+    "ALMACENISTA": "almacenista",
+    "Fecha Ejecución Invetario": "fecha_ejecucion_inventario",
+    "Fecha Reporte Operaciones": "fecha_reporte_operaciones",
+    "DIAS": "dias",
+    "Indicador Inventario": "indicador_inventario",
+    "AREA": "area",
+    "RESPONSABLE": "responsable",
+    "FECHA RESPUESTA": "fecha_respuesta",
+    "DIAS RESPUESTA": "dias_respuesta",
+    "Indicador respuesta": "indicador_respuesta"
+}
+
+
+def _excel_layout():
+    """Tabla -> (ruta del libro, hoja, encabezados Excel -> columnas BD)"""
+    from . import import_data
+    from .config import EXCEL_FILES
+
+    compras = EXCEL_FILES["compras"]
+    return {
+        "costos_mensuales": (EXCEL_FILES["costos_mensuales"]["path"], EXCEL_FILES["costos_mensuales"]["sheet"], import_data.COSTOS_MENSUALES_COLUMNS),
+        "operatividad_vehiculos": (EXCEL_FILES["operatividad_vehiculos"]["path"], EXCEL_FILES["operatividad_vehiculos"]["sheet"], import_data.OPERATIVIDAD_VEHICULOS_COLUMNS),
+        "traza_req_oc": (compras["path"], compras["sheets"]["traza_req_oc"], import_data.TRAZA_REQ_OC_COLUMNS),
+        "oc_descuentos": (compras["path"], compras["sheets"]["oc_descuentos"], import_data.OC_DESCUENTOS_COLUMNS),
+        "base_oc_generadas": (compras["path"], compras["sheets"]["base_oc_generadas"], import_data.BASE_OC_GENERADAS_COLUMNS),
+        "indicadores": (EXCEL_FILES["indicadores"]["path"], EXCEL_FILES["indicadores"]["sheet"], import_data.INDICADORES_COLUMNS),
+        "fiscal_ru": (EXCEL_FILES["fiscal_ru"]["path"], EXCEL_FILES["fiscal_ru"]["sheet"], import_data.FISCAL_RU_COLUMNS),
+        "brigadas": (EXCEL_FILES["brigadas"]["path"], EXCEL_FILES["brigadas"]["sheet"], import_data.BRIGADAS_COLUMNS),
+        "errores": (EXCEL_FILES["errores"]["path"], EXCEL_FILES["errores"]["sheet"], ERRORES_HEADERS),
+        "programados_ejecutados": (EXCEL_FILES["programados_ejecutados"]["path"], EXCEL_FILES["programados_ejecutados"]["sheet"], PROGRAMADOS_HEADERS),
+        "gestion": (EXCEL_FILES["gestion"]["path"], EXCEL_FILES["gestion"]["sheet"], GESTION_HEADERS),
+    }
+
+
+def generate_workbooks(data_dir, scale=1, seed=42):
+    """Escribir los libros Excel que lee import_data.py bajo data_dir"""
+    import pandas as pd
+    from .config import DATA_DIR
+
+    data_dir = Path(data_dir)
+    filas = rows_per_table(scale)
+    excedidas = [t for t, n in filas.items() if n > EXCEL_MAX_ROWS]
+    if excedidas:
+        raise ValueError(f"Escala {scale} supera el límite de filas de Excel en: {', '.join(excedidas)}")
+
+    rng = random.Random(seed)
+    dims = _catalogo_maestro(rng, scale)
+    libros = {}
+    counts = {}
+    for table, (path, sheet, headers) in _excel_layout().items():
+        rows = list(GENERATORS[table](rng, filas[table], dims))
+        df = pd.DataFrame([{excel: row[db] for excel, db in headers.items()} for row in rows])
+        if table == "errores":
+            # import_errores deriva el mes de la fecha y la sede de la zona
+            df["Fecha"] = pd.to_datetime(df["Fecha"])
+            df["Zona"] = df["Zona"].str.title()
+        path = Path(path)
+        destino = data_dir / path.with_name(path.name.format(anio=YEAR)).relative_to(DATA_DIR)
+        libros.setdefault(destino, []).append((sheet, df))
+        counts[table] = len(df)
+
+    for destino, hojas in libros.items():
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        with pd.ExcelWriter(destino, engine="openpyxl") as writer:
+            for sheet, df in hojas:
+                df.to_excel(writer, sheet_name=sheet, index=False)
+        print(f"   {destino}: {', '.join(sheet for sheet, _ in hojas)}")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generar datos sintéticos de Logística HESEGO")
+    parser.add_argument("destino", help="Archivo .db (formato sqlite) o carpeta data/ (formato excel)")
+    parser.add_argument("--scale", type=float, default=1, help="Factor de escala sobre el volumen de producción (1, 10, 100...)")
+    parser.add_argument("--formato", choices=["sqlite", "excel"], default="sqlite")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anios", type=int, default=1, help="Años de historia en las tablas de almacenes (solo sqlite)")
+    args = parser.parse_args(argv)
+
+    print(f"🧪 Generando datos sintéticos ({args.formato}, escala {args.scale:g}×) en {args.destino}...")
+    if args.formato == "excel":
+        generate_workbooks(args.destino, args.scale, args.seed)
+    else:
+        generate_database(args.destino, args.scale, args.seed, args.anios)
+    print("✅ Datos sintéticos generados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Capa declarativa de filtros y agregados.
+
+Cada tabla declara en TABLES su clave de fecha, sus dimensiones (parámetro de
+filtro -> columna) y sus medidas (nombre -> función(columna)). where() arma el
+WHERE de todos los routers a partir de esa declaración, así los filtros se
+interpretan igual en todas partes:
+
+- fecha_inicio/fecha_fin aceptan 'YYYY-MM' o 'YYYY-MM-DD' (el input month y
+  el input date del frontend). En tablas con fecha diaria un mes se expande al
+  primer/último día; las tablas de almacenes (mes en texto, 'ABRIL') filtran
+  por periodo 'YYYY-MM' (año del libro + mes), así el rango respeta el año y
+  usa el índice de periodo: solo se leen los meses que toca la consulta.
+  Una fecha inválida lanza FiltroInvalido (400).
+- Las listas 'a,b,c' se limpian (sin espacios ni vacíos), sin duplicados y
+  ordenadas, y las condiciones van siempre en el orden de la declaración: el
+  mismo filtro lógico produce el mismo SQL y los mismos parámetros, sin
+  importar el orden en que llegaron los valores.
+
+aggregate() arma un SELECT ... GROUP BY con medidas y dimensiones sobre la
+tabla base (rollups.plan() lo reemplaza por un resumen cuando alguno cubre la
+consulta). Las medidas son un nombre declarado ('neto') o una función sobre
+una columna permitida: count(*), count(col), count_distinct(col),
+sum/avg/min/max(col) con col numérica de NUMERIC.
+"""
+import calendar
+import re
+from datetime import date
+
+MESES = [
+    "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
+    "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
+]
+
+# Clave de fecha: (columna, "dia") para fechas 'YYYY-MM-DD'; (columna, "mes") para periodos 'YYYY-MM'
+# tabla -> (clave de fecha, {parámetro de filtro: columna}, {medida: función(columna)})
+TABLES = {
+    "costos_mensuales": (("fecha", "dia"), {
+        "catalogos": "catalogo", "ciudades": "ciudad", "terceros": "tercero",
+    }, {
+        "registros": "count(*)", "neto": "sum(neto)", "terceros": "count_distinct(tercero)",
+    }),
+    "operatividad_vehiculos": (("fecha_ejecucion", "dia"), {
+        "sedes": "sede", "estados": "estado_vehiculo", "placas": "placa",
+    }, {
+        "registros": "count(*)", "programados": "sum(vehiculos_programados)",
+        "operativos": "sum(vehiculos_operativos)", "dias_taller": "sum(dias_en_taller)",
+        "placas": "count_distinct(placa)",
+    }),
+    "traza_req_oc": (("req_fecha", "dia"), {
+        "estados_req": "req_estado", "estados_oc": "oc_estado", "terceros": "oc_tercero_nombre",
+    }, {
+        "registros": "count(*)", "rq": "count_distinct(req_numero)", "oc": "count_distinct(oc_numero)",
+        "rq_pendientes": "sum(req_pendiente)", "oc_pendientes": "sum(oc_pendiente)",
+    }),
+    "oc_descuentos": (("fecha", "dia"), {
+        "terceros": "tercero_nombre", "estados": "estado",
+    }, {
+        "registros": "count(*)", "total": "sum(total)", "descuento": "sum(total_dcto)",
+        "cantidad": "sum(item_cantidad)",
+    }),
+    "base_oc_generadas": (("fecha", "dia"), {
+        "terceros": "tercero_nombre", "tipos": "documento_tipo", "estados": "estado",
+    }, {
+        "registros": "count(*)", "total": "sum(total)", "descuento": "sum(total_dcto)",
+        "oc": "count_distinct(documento_num)",
+    }),
+    "indicadores": (("periodo", "mes"), {
+        "sedes": "sede", "responsables": "responsable",
+    }, {
+        "registros": "count(*)", "inventario_final": "sum(inventario_final)",
+        "costo_diferencia": "sum(costo_diferencia)", "items": "count_distinct(codigo)",
+    }),
+    "fiscal_ru": (("periodo", "mes"), {
+        "sedes": "sede", "estado": "estado", "tipo_inventario": "tipo_inventario",
+    }, {
+        "registros": "count(*)", "costo_total": "sum(costo_total)", "costo_diferencia": "sum(costo_diferencia)",
+    }),
+    "brigadas": (("periodo", "mes"), {
+        "sedes": "sede",
+    }, {
+        "registros": "count(*)", "costo_total": "sum(costo_total)", "costo_diferencia": "sum(costo_diferencia)",
+    }),
+    "errores": (("periodo", "mes"), {
+        "sedes": "sede", "errores": "error",
+    }, {
+        "registros": "count(*)", "total": "sum(total)", "cantidad": "sum(cantidad)",
+    }),
+    "programados_ejecutados": (("periodo", "mes"), {
+        "sedes": "sede", "tipos_inventario": "tipo_inventario",
+    }, {
+        "registros": "count(*)", "programados": "sum(programados)", "ejecutados": "sum(ejecutados)",
+    }),
+    "gestion": (("periodo", "mes"), {
+        "sedes": "sede", "tipos_inventario": "tipo_inventario", "responsables": "responsable",
+    }, {
+        "registros": "count(*)", "dias": "avg(dias)", "dias_respuesta": "avg(dias_respuesta)",
+    }),
+}
+
+# Columnas numéricas que aceptan sum/avg/min/max; count y count_distinct aceptan además las dimensiones
+NUMERIC = {
+    "costos_mensuales": ["neto"],
+    "operatividad_vehiculos": [
+        "vehiculos_programados", "vehiculos_operativos", "dias_en_taller", "km_mantenimiento", "indicador",
+    ],
+    "traza_req_oc": [
+        "dias_aprobar_rq", "dias_generar_oc", "dias_aprobacion_oc", "dias_recepcion_servicio",
+        "dias_entrada_almacen", "req_pendiente", "oc_pendiente",
+    ],
+    "oc_descuentos": [
+        "total", "total_dcto", "subtotal", "item_cantidad", "porcentaje_descuento", "dias_entrega",
+    ],
+    "base_oc_generadas": ["total", "total_dcto", "subtotal", "item_cantidad", "tasa_dcto", "dias_entrega"],
+    "indicadores": [
+        "inventario_inicial", "inventario_final", "diferencia", "precio_total",
+        "costo_inventario_final", "costo_diferencia",
+    ],
+    "fiscal_ru": ["saldo_final", "costo_total", "diferencia", "costo_diferencia"],
+    "brigadas": ["neto", "conteo", "reconteo", "diferencia", "costo_total", "costo_diferencia", "desviacion"],
+    "errores": ["cantidad", "costo", "total"],
+    "programados_ejecutados": ["programados", "ejecutados", "indicador_programacion"],
+    "gestion": ["dias", "dias_respuesta"],
+}
+
+FUNCIONES = {
+    "count": "COUNT({})",
+    "count_distinct": "COUNT(DISTINCT {})",
+    "sum": "SUM({})",
+    "avg": "AVG({})",
+    "min": "MIN({})",
+    "max": "MAX({})",
+}
+METRICA = re.compile(r"^\s*(\w+)\s*\(\s*(\*|\w+)\s*\)\s*$")
+
+
+class FiltroInvalido(ValueError):
+    """Filtro con formato inválido: la API lo responde como 400"""
+
+
+def filter_params(table):
+    """Parámetros de filtro que acepta la tabla, en orden canónico"""
+    return ["fecha_inicio", "fecha_fin", *TABLES[table][1]]
+
+
+def parse_fecha(valor, fin=False):
+    """'YYYY-MM' o 'YYYY-MM-DD' -> date (un mes solo va al primer día, o al último si fin)"""
+    if not valor:
+        return None
+    valor = valor.strip()
+    try:
+        if len(valor) == 7:
+            year, month = int(valor[:4]), int(valor[5:7])
+            if valor[4] != "-":
+                raise ValueError
+            return date(year, month, calendar.monthrange(year, month)[1] if fin else 1)
+        return date.fromisoformat(valor[:10])
+    except ValueError:
+        raise FiltroInvalido(f"Fecha inválida: {valor!r} (se espera YYYY-MM o YYYY-MM-DD)")
+
+
+def split_values(valores):
+    """'b, a,,a' -> ['a', 'b']"""
+    if not valores:
+        return []
+    return sorted({v.strip() for v in valores.split(",") if v.strip()})
+
+
+def periodo(anio, mes):
+    """(2025, 'ABRIL') -> '2025-04'; None si falta el año o el mes no es un nombre de mes"""
+    mes = mes.strip().upper() if isinstance(mes, str) else None
+    if anio is None or mes not in MESES:
+        return None
+    return f"{int(anio):04d}-{MESES.index(mes) + 1:02d}"
+
+
+def _in(columna, valores):
+    return f"{columna} IN ({','.join('?' * len(valores))})", list(valores)
+
+
+def conditions(table, fecha_inicio=None, fecha_fin=None, **filtros):
+    """Condiciones y parámetros canónicos de los filtros (sin WHERE)"""
+    (fecha_col, tipo), dims, _ = TABLES[table]
+    desconocidos = set(filtros) - set(dims)
+    if desconocidos:
+        raise FiltroInvalido(f"Filtros no válidos para {table}: {', '.join(sorted(desconocidos))}")
+    inicio, fin = parse_fecha(fecha_inicio), parse_fecha(fecha_fin, fin=True)
+
+    conds, params = [], []
+    if tipo == "dia":
+        if inicio:
+            conds.append(f"{fecha_col} >= ?")
+            params.append(inicio.isoformat())
+        if fin:
+            conds.append(f"{fecha_col} <= ?")
+            params.append(fin.isoformat())
+    else:
+        if inicio:
+            conds.append(f"{fecha_col} >= ?")
+            params.append(inicio.isoformat()[:7])
+        if fin:
+            conds.append(f"{fecha_col} <= ?")
+            params.append(fin.isoformat()[:7])
+
+    for parametro, columna in dims.items():
+        valores = split_values(filtros.get(parametro))
+        if valores:
+            cond, valores = _in(columna, valores)
+            conds.append(cond)
+            params.extend(valores)
+    return conds, params
+
+
+def where(table, fecha_inicio=None, fecha_fin=None, **filtros):
+    """'WHERE 1=1 AND ...' y parámetros; siempre empieza con WHERE para poder agregar '... AND x'"""
+    conds, params = conditions(table, fecha_inicio, fecha_fin, **filtros)
+    return " AND ".join(["WHERE 1=1", *conds]), params
+
+
+def mes_expr(table):
+    """Expresión del mes de cada fila ('YYYY-MM')"""
+    fecha_col, tipo = TABLES[table][0]
+    return f"substr({fecha_col}, 1, 7)" if tipo == "dia" else fecha_col
+
+
+def dimension_expr(table, dimension):
+    """Columna de una dimensión para GROUP BY ('mes' o una columna declarada)"""
+    if dimension == "mes":
+        return mes_expr(table)
+    if dimension in TABLES[table][1].values():
+        return dimension
+    raise FiltroInvalido(f"Dimensión no válida para {table}: {dimension}")
+
+
+def metric(table, metrica):
+    """(función, columna) de una medida: nombre declarado o función(columna) permitida"""
+    declaradas = TABLES[table][2]
+    match = METRICA.match(declaradas.get(metrica, metrica))
+    if match:
+        funcion, columna = match.group(1).lower(), match.group(2)
+        if metrica in declaradas or (funcion == "count" and columna == "*"):
+            return funcion, columna
+        permitidas = NUMERIC[table]
+        if funcion in ("count", "count_distinct"):
+            permitidas = permitidas + list(TABLES[table][1].values())
+        if funcion in FUNCIONES and columna in permitidas:
+            return funcion, columna
+    raise FiltroInvalido(f"Medida no válida para {table}: {metrica!r}")
+
+
+def validate(table, medidas, dimensiones):
+    """[(función, columna)] de las medidas y [(dimensión, expresión)] de las dimensiones"""
+    if not medidas:
+        raise FiltroInvalido(f"Medidas no válidas para {table}: (ninguna)")
+    return [metric(table, m) for m in medidas], [(d, dimension_expr(table, d)) for d in dimensiones]
+
+
+def select(dims, exprs, source, where_clause, params, top_n=None):
+    """SELECT <dims>, <exprs> FROM source ... GROUP BY/ORDER BY posicionales (o top_n por la primera medida)"""
+    columnas = [f"{expr} AS {d}" for d, expr in dims] + [f"{expr} AS m{i + 1}" for i, expr in enumerate(exprs)]
+    sql = f"SELECT {', '.join(columnas)} FROM {source} {where_clause}"
+    posiciones = ", ".join(str(i + 1) for i in range(len(dims)))
+    if dims:
+        sql += f" GROUP BY {posiciones}"
+    if top_n:
+        sql += f" ORDER BY {len(dims) + 1} DESC LIMIT ?"
+        params = params + [top_n]
+    elif dims:
+        sql += f" ORDER BY {posiciones}"
+    return sql, params
+
+
+def aggregate(table, medidas, dimensiones=(), filtros=None, top_n=None):
+    """SELECT <dimensiones>, <medidas> ... GROUP BY <dimensiones> sobre la tabla base.
+    Con top_n ordena por la primera medida descendente y limita."""
+    medidas, dims = validate(table, medidas, dimensiones)
+    where_clause, params = where(table, **(filtros or {}))
+    exprs = [FUNCIONES[funcion].format(columna) for funcion, columna in medidas]
+    return select(dims, exprs, table, where_clause, params, top_n)
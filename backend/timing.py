@@ -0,0 +1,166 @@
+"""
+Medición de tiempos por petición y por fase.
+
+Fases:
+- acquire: abrir la conexión SQLite (get_connection)
+- execute: cursor.execute / executemany
+- fetch: fetchone / fetchall / fetchmany
+- serialize: convertir la respuesta a JSON
+- app: resto del tiempo (lógica Python del endpoint, row→dict, middleware)
+
+timing_middleware agrega el header Server-Timing a cada respuesta y guarda
+las últimas peticiones de cada ruta para /api/admin/timings.
+"""
+import time
+from collections import deque
+from contextvars import ContextVar
+import sqlite3
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+PHASES = ["acquire", "execute", "fetch", "serialize"]
+
+# Peticiones recientes que se conservan por ruta
+WINDOW_SIZE = 1000
+
+# Límites superiores (ms) de los buckets del histograma
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+_current = ContextVar("request_timings", default=None)
+_history = {}
+
+
+def record(phase, seconds):
+    """Sumar tiempo a una fase de la petición en curso (si hay una)"""
+    timings = _current.get()
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor que mide execute y fetch"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record("execute", time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record("execute", time.perf_counter() - start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            record("fetch", time.perf_counter() - start)
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            record("fetch", time.perf_counter() - start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            record("fetch", time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Conexión cuyos cursores miden execute y fetch"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse que mide la serialización"""
+
+    def render(self, content):
+        start = time.perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            record("serialize", time.perf_counter() - start)
+
+
+async def timing_middleware(request: Request, call_next):
+    """Medir la petición, agregar Server-Timing y guardar la muestra por ruta"""
+    timings = {}
+    token = _current.set(timings)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    total = time.perf_counter() - start
+
+    ms = {phase: timings.get(phase, 0.0) * 1000 for phase in PHASES}
+    ms["app"] = max(total * 1000 - sum(ms.values()), 0.0)
+    ms["total"] = total * 1000
+
+    response.headers["Server-Timing"] = ", ".join(
+        f"{phase};dur={value:.2f}" for phase, value in ms.items()
+    )
+
+    route = request.scope.get("route")
+    if route is not None and request.url.path.startswith("/api/"):
+        key = f"{request.method} {route.path}"
+        _history.setdefault(key, deque(maxlen=WINDOW_SIZE)).append(ms)
+    return response
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def summary():
+    """Percentiles, promedio por fase e histograma de cada ruta"""
+    result = {}
+    for key, samples in sorted(_history.items()):
+        samples = list(samples)
+        totals = sorted(s["total"] for s in samples)
+        histogram = {f"<={limit}ms": 0 for limit in HISTOGRAM_BUCKETS_MS}
+        histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+        for value in totals:
+            for limit in HISTOGRAM_BUCKETS_MS:
+                if value <= limit:
+                    histogram[f"<={limit}ms"] += 1
+                    break
+            else:
+                histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+        result[key] = {
+            "count": len(samples),
+            "p50_ms": round(_percentile(totals, 50), 2),
+            "p95_ms": round(_percentile(totals, 95), 2),
+            "p99_ms": round(_percentile(totals, 99), 2),
+            "mean_phase_ms": {
+                phase: round(sum(s[phase] for s in samples) / len(samples), 2)
+                for phase in PHASES + ["app", "total"]
+            },
+            "histogram": histogram,
+        }
+    return result
+
+
+def reset():
+    _history.clear()
@@ -0,0 +1,21 @@
+// Recargar las páginas cuando una importación cambie la generación de datos (SSE /api/events).
+// Compartido por las páginas del dashboard: <script src="/static/generaciones.js"></script>
+
+// onChange recibe {tabla: generación} con las tablas que cambiaron
+function watchDataGenerations(tablas, onChange) {
+  if (!window.EventSource) return;
+  const API_BASE = window.location.port === "8000" ? "" : "http://localhost:8000";
+  const source = new EventSource(`${API_BASE}/api/events?tablas=${tablas.join(",")}`);
+  source.addEventListener("generation", (e) => {
+    const cambios = JSON.parse(e.data).tablas;
+    console.log("🔔 Datos actualizados por importación:", cambios);
+    onChange(cambios);
+  });
+}
+
+// Correr una vez cada recargador de las tablas que cambiaron.
+// recargadores: {tabla: [función, ...]}; una función puede depender de varias tablas
+function reloadChanged(cambios, recargadores) {
+  const funciones = new Set(Object.keys(cambios).flatMap(tabla => recargadores[tabla] || []));
+  return Promise.all([...funciones].map(fn => fn()));
+}
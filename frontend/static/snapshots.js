@@ -0,0 +1,24 @@
+// Snapshots precompilados de /api/snapshots (JSON columnar comprimido, versionado por generación de datos).
+// Compartido por costos_mensuales.html y operatividad_vehiculos.html: <script src="/static/snapshots.js"></script>
+
+// Devuelve filas con las mismas columnas que /datos; lanza error si no está disponible
+async function fetchSnapshotRows(API_BASE, dataset) {
+  const response = await fetch(`${API_BASE}/api/snapshots/${dataset}`);
+  if (!response.ok) {
+    throw new Error(`Error ${response.status}: ${response.statusText}`);
+  }
+  const snapshot = await response.json();
+  // Columnas con diccionario: {diccionario, codigos} (-1 = vacío)
+  const columnas = Object.entries(snapshot.columnas).map(([nombre, col]) => [
+    nombre,
+    Array.isArray(col) ? col : col.codigos.map(c => c < 0 ? null : col.diccionario[c])
+  ]);
+  const rows = new Array(snapshot.filas);
+  for (let i = 0; i < snapshot.filas; i++) {
+    const row = {};
+    for (const [nombre, valores] of columnas) row[nombre] = valores[i];
+    rows[i] = row;
+  }
+  console.log(`📦 Snapshot ${dataset} (versión ${snapshot.version}):`, snapshot.filas);
+  return rows;
+}